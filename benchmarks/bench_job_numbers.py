@@ -0,0 +1,103 @@
+"""
+Benchmark the compiled job number engine against the original
+extract_job_number_from_description implementation.
+
+Usage:
+    python benchmarks/bench_job_numbers.py [count]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.job_numbers import extract_job_number
+
+
+def legacy_extract_job_number_from_description(description):
+    """The per-pattern implementation previously in main_logic.py, kept as the baseline."""
+    if not description:
+        return "", description
+
+    patterns = [
+        r"\b(?:JOB|Job|job)\s*[:;#]\s*([A-Za-z]{2,4}[-\s]*\d{2,4})\b",
+        r"\b([A-Za-z]{2,4}[-\s]*\d{2,4})\b",
+        r"\b(?:JOB|Job|job)\s*[:;#]\s*(\d{2,4})\b",
+    ]
+
+    job_number = ""
+    clean_desc = description
+
+    for pattern in patterns:
+        match = re.search(pattern, clean_desc, re.IGNORECASE)
+        if match:
+            job_number = match.group(1)
+            clean_desc = re.sub(pattern, "", clean_desc, flags=re.IGNORECASE)
+            break
+
+    if not job_number:
+        parens_match = re.search(r"\(\s*(?:JOB|Job|job)\s*[:;#]?\s*([A-Za-z]{0,4}[-\s]*\d{2,4})\s*\)", clean_desc, re.IGNORECASE)
+        if parens_match:
+            job_number = parens_match.group(1)
+            clean_desc = re.sub(r"\(\s*(?:JOB|Job|job).*?\)", "", clean_desc, flags=re.IGNORECASE)
+
+    if not job_number:
+        standalone_match = re.search(r"\b([A-Za-z]{2,4}[-\s]*\d{2,4})\b", clean_desc)
+        if standalone_match:
+            job_number = standalone_match.group(1)
+            if re.match(r"^[A-Za-z]{2,4}[-\s]*\d{2,4}$", job_number):
+                clean_desc = re.sub(r"\b" + re.escape(job_number) + r"\b", "", clean_desc)
+
+    clean_desc = re.sub(r'\s+', ' ', clean_desc).strip()
+
+    return job_number, clean_desc
+
+
+def synthetic_descriptions(count, seed=42):
+    """Descriptions shaped like the fee email lines and Matrix Media markets."""
+    rng = random.Random(seed)
+    words = ["PRINT", "DESIGN", "BILLBOARD", "RADIO", "SPOT", "PRODUCTION", "FEE",
+             "DIGITAL", "POSTER", "ANNISTON", "DOTHAN", "FORT PAYNE", "RUSH"]
+    job_formats = [
+        lambda: f"JOB: TTC-{rng.randint(100, 999)}",
+        lambda: f"Job #{rng.randint(10, 9999)}",
+        lambda: f"TTC {rng.randint(100, 999)}",
+        lambda: f"(Job: ABC{rng.randint(10, 99)})",
+        lambda: "",
+    ]
+    descriptions = []
+    for _ in range(count):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(2, 8)))
+        job = rng.choice(job_formats)()
+        if rng.random() < 0.5:
+            text = f"{text} {job}"
+        else:
+            text = f"{job} {text}"
+        descriptions.append(text)
+    return descriptions
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    descriptions = synthetic_descriptions(count)
+
+    start = time.perf_counter()
+    legacy = [legacy_extract_job_number_from_description(d) for d in descriptions]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [extract_job_number(d) for d in descriptions]
+    compiled_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+
+    print(f"Descriptions:        {count}")
+    print(f"Legacy per-pattern:  {legacy_time:.3f}s")
+    print(f"Compiled single-scan: {compiled_time:.3f}s ({legacy_time / compiled_time:.1f}x)")
+    print(f"Mismatches:          {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
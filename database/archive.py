@@ -0,0 +1,214 @@
+import argparse
+import datetime
+import glob
+import logging
+import os
+import re
+import sys
+
+# Allow running as a script (python database/archive.py) as well as a module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, get_db_path, close_connection, transaction
+from database.invoice_queries import BATCH_ID_FORMAT, BATCH_ID_GLOB, get_latest_batch_id, is_valid_batch_id
+from database.migrations import ensure_schema
+
+# Closed batches are moved to one archive database per year, e.g.
+# database/archive/invoice_2024.db next to database/invoice.db
+ARCHIVE_SUBDIR = "archive"
+ARCHIVE_FILE_FORMAT = "invoice_{year}.db"
+ARCHIVE_FILE_RE = re.compile(r"invoice_(\d{4})\.db$")
+HISTORY_VIEW = "invoice_history"
+DEFAULT_KEEP_DAYS = 90
+
+CREATE_TABLE_RE = re.compile(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?\"?invoices\"?", re.IGNORECASE)
+
+
+def get_archive_dir(db_path=None):
+    """Directory holding the yearly archive databases of db_path."""
+    return os.path.join(os.path.dirname(get_db_path(db_path)), ARCHIVE_SUBDIR)
+
+
+def list_archives(db_path=None):
+    """Return {year: archive path} for the archive databases that exist."""
+    archives = {}
+    for path in sorted(glob.glob(os.path.join(get_archive_dir(db_path), "invoice_*.db"))):
+        match = ARCHIVE_FILE_RE.search(os.path.basename(path))
+        if match:
+            archives[match.group(1)] = path
+    return archives
+
+
+def _column_names(conn, schema):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(invoices)")]
+
+
+def _ensure_archive_table(conn, schema):
+    """Create the invoices table in an attached archive with the hot table's definition."""
+    create_sql = conn.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'invoices'"
+    ).fetchone()[0]
+    conn.execute(CREATE_TABLE_RE.sub(f"CREATE TABLE IF NOT EXISTS {schema}.invoices", create_sql, count=1))
+
+    # Archives created before a later migration added columns
+    archive_columns = set(_column_names(conn, schema))
+    for row in conn.execute("PRAGMA main.table_info(invoices)").fetchall():
+        name, column_type = row[1], row[2]
+        if name not in archive_columns:
+            conn.execute(f"ALTER TABLE {schema}.invoices ADD COLUMN {name} {column_type}")
+
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_invoices_batch_vendor ON invoices (batch_id, vendor, market, invoice_no)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_invoices_invoice_no ON invoices (invoice_no, batch_id)")
+
+
+def find_closed_batches(conn, keep_days=DEFAULT_KEEP_DAYS, today=None):
+    """
+    Batches that can be archived: well-formed batch IDs older than keep_days.
+
+    The latest batch is never closed, since the final document is built from it.
+    """
+    today = today or datetime.date.today()
+    cutoff = (today - datetime.timedelta(days=keep_days)).strftime(BATCH_ID_FORMAT)
+    latest = get_latest_batch_id(conn)
+    rows = conn.execute(
+        "SELECT DISTINCT batch_id FROM main.invoices WHERE batch_id GLOB ? AND batch_id < ? ORDER BY batch_id",
+        (BATCH_ID_GLOB, cutoff)
+    ).fetchall()
+    return [batch_id for (batch_id,) in rows if batch_id != latest]
+
+
+def archive_batches(batch_ids, db_path=None):
+    """
+    Move the rows of batch_ids into the yearly archive databases.
+
+    Rows keep their ids, which AUTOINCREMENT never reuses, so ids stay unique
+    across the hot and archive databases. The copy is INSERT OR IGNORE on the
+    id: with WAL a transaction spanning attached databases is atomic per file
+    only, so a run interrupted between copying and deleting is simply
+    repeated without duplicating rows.
+
+    Args:
+        batch_ids (list): Batch IDs ("%Y%m%d_%H%M%S") to archive. The latest
+            batch is skipped.
+        db_path (str, optional): Hot database. Defaults to get_db_path().
+
+    Returns:
+        dict: {year: number of rows moved}
+    """
+    ensure_schema(db_path)
+    conn = get_connection(db_path)
+    archive_dir = get_archive_dir(db_path)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    # The latest batch may still be open, as in find_closed_batches
+    latest = get_latest_batch_id(conn)
+    by_year = {}
+    for batch_id in batch_ids:
+        if not is_valid_batch_id(batch_id):
+            logging.warning(f"Not archiving batch with invalid batch_id format: {batch_id}")
+            continue
+        if batch_id == latest:
+            logging.warning(f"Not archiving the latest batch, it may still be open: {batch_id}")
+            continue
+        by_year.setdefault(batch_id[:4], []).append(batch_id)
+
+    moved = {}
+    for year, year_batches in sorted(by_year.items()):
+        schema = f"archive_{year}"
+        path = os.path.join(archive_dir, ARCHIVE_FILE_FORMAT.format(year=year))
+        # ATTACH is not allowed inside a transaction
+        conn.execute("ATTACH DATABASE ? AS " + schema, (path,))
+        try:
+            with transaction(db_path, immediate=True):
+                _ensure_archive_table(conn, schema)
+                columns = ", ".join(_column_names(conn, "main"))
+                placeholders = ",".join("?" for _ in year_batches)
+                conn.execute(
+                    f"INSERT OR IGNORE INTO {schema}.invoices ({columns}) "
+                    f"SELECT {columns} FROM main.invoices WHERE batch_id IN ({placeholders})",
+                    year_batches
+                )
+                cursor = conn.execute(
+                    f"DELETE FROM main.invoices WHERE batch_id IN ({placeholders})",
+                    year_batches
+                )
+                moved[year] = cursor.rowcount
+        finally:
+            conn.execute(f"DETACH DATABASE {schema}")
+        logging.info(f"Archived {moved[year]} invoice(s) from {len(year_batches)} batch(es) to {path}")
+    return moved
+
+
+def attach_history(conn, db_path=None):
+    """
+    Attach every archive database and create the temporary invoice_history view.
+
+    invoice_history is main.invoices UNION ALL the archive tables, with the
+    hot table's columns (NULL where an older archive lacks a column). Only
+    callers that ask for history pay for attaching the archives. SQLite
+    attaches at most 10 databases by default, i.e. 10 archive years.
+
+    Returns:
+        str: Name of the view to query instead of invoices.
+    """
+    hot_columns = _column_names(conn, "main")
+    selects = [f"SELECT {', '.join(hot_columns)} FROM main.invoices"]
+
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    for year, path in list_archives(db_path).items():
+        schema = f"archive_{year}"
+        if schema not in attached:
+            conn.execute("ATTACH DATABASE ? AS " + schema, (path,))
+        archive_columns = set(_column_names(conn, schema))
+        if not archive_columns:
+            continue
+        projected = [column if column in archive_columns else f"NULL AS {column}" for column in hot_columns]
+        selects.append(f"SELECT {', '.join(projected)} FROM {schema}.invoices")
+
+    conn.execute(f"DROP VIEW IF EXISTS temp.{HISTORY_VIEW}")
+    conn.execute(f"CREATE TEMP VIEW {HISTORY_VIEW} AS " + " UNION ALL ".join(selects))
+    return HISTORY_VIEW
+
+
+def detach_history(conn):
+    """Drop the invoice_history view and detach the archive databases."""
+    conn.execute(f"DROP VIEW IF EXISTS temp.{HISTORY_VIEW}")
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1].startswith("archive_"):
+            conn.execute(f"DETACH DATABASE {row[1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move closed invoice batches into yearly archive databases.")
+    parser.add_argument("--keep-days", type=int, default=DEFAULT_KEEP_DAYS,
+                        help="Keep batches newer than this many days in the live database.")
+    parser.add_argument("--batch_id", type=str, nargs="*", help="Archive exactly these batch IDs instead.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the batches that would be archived.")
+    parser.add_argument("--vacuum", action="store_true", help="Compact the live database afterwards.")
+    args = parser.parse_args()
+
+    ensure_schema()
+    conn = get_connection()
+    if args.batch_id:
+        latest = get_latest_batch_id(conn)
+        if latest in args.batch_id:
+            close_connection()
+            parser.error(f"{latest} is the latest batch and may still be open; it cannot be archived")
+    batch_ids = args.batch_id or find_closed_batches(conn, args.keep_days)
+    if not batch_ids:
+        print("No closed batches to archive.")
+    elif args.dry_run:
+        print(f"{len(batch_ids)} batch(es) would be archived:")
+        for batch_id in batch_ids:
+            print(f"  {batch_id}")
+    else:
+        moved = archive_batches(batch_ids)
+        for year, count in moved.items():
+            print(f"{year}: {count} invoice(s) archived")
+        if args.vacuum:
+            conn.execute("VACUUM")
+    close_connection()
+
+
+if __name__ == "__main__":
+    main()
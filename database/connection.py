@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import logging
+import threading
+import itertools
+from contextlib import contextmanager
+
+
+# Single location of the invoice database, shared by the pipeline, the GUI
+# queries and the command line tools. Override with INVOICE_DB_PATH.
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invoice.db")
+
+PRAGMAS = (
+    # Readers work from a snapshot and never block the writer (or vice versa)
+    ("journal_mode", "WAL"),
+    # Durable at checkpoints; a power loss can only drop the last commits
+    ("synchronous", "NORMAL"),
+    ("mmap_size", 256 * 1024 * 1024),
+    # Negative values are KiB: 64 MiB page cache
+    ("cache_size", -64 * 1024),
+    ("temp_store", "MEMORY"),
+    # Wait for a concurrent writer instead of failing with "database is locked"
+    ("busy_timeout", 5000),
+)
+
+_local = threading.local()
+_savepoint_ids = itertools.count()
+
+
+def get_db_path(db_path=None):
+    """Resolve the database path: explicit argument, INVOICE_DB_PATH, or database/invoice.db."""
+    path = db_path or os.getenv("INVOICE_DB_PATH") or DEFAULT_DB_PATH
+    return path if path == ":memory:" else os.path.abspath(path)
+
+
+def _is_open(conn):
+    try:
+        conn.total_changes
+        return True
+    except sqlite3.ProgrammingError:
+        return False
+
+
+def _open_connection(path):
+    # isolation_level=None: transactions are only the ones opened by transaction()
+    conn = sqlite3.connect(path, isolation_level=None)
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name}={value}")
+
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    if journal_mode.lower() != "wal" and path != ":memory:":
+        logging.warning(f"Could not enable WAL for {path}, journal_mode={journal_mode}")
+    logging.debug(f"Opened SQLite connection to {path} (thread {threading.get_ident()})")
+    return conn
+
+
+def get_connection(db_path=None):
+    """
+    Return this thread's connection to the invoice database, opening it on first use.
+
+    Connections are reused per thread and per database file, so repeated calls
+    from the pipeline do not pay for reconnecting and re-applying pragmas.
+
+    Args:
+        db_path (str, optional): Database file. Defaults to get_db_path().
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode; use transaction()
+            to group writes.
+    """
+    path = get_db_path(db_path)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None or not _is_open(conn):
+        conn = connections[path] = _open_connection(path)
+    return conn
+
+
+def close_connection(db_path=None):
+    """Close this thread's connection to db_path, if one is open."""
+    path = get_db_path(db_path)
+    connections = getattr(_local, "connections", {})
+    conn = connections.pop(path, None)
+    if conn is not None:
+        conn.close()
+
+
+@contextmanager
+def transaction(db_path=None, immediate=False):
+    """
+    Run a block of statements as one transaction on the shared connection.
+
+    Commits when the block exits normally and rolls back on an exception.
+    Nested use on the same connection becomes a SAVEPOINT.
+
+    Args:
+        db_path (str, optional): Database file. Defaults to get_db_path().
+        immediate (bool): Take the write lock up front (BEGIN IMMEDIATE) so a
+            read-then-write block cannot be invalidated by another writer.
+
+    Yields:
+        sqlite3.Connection
+    """
+    conn = get_connection(db_path)
+
+    if conn.in_transaction:
+        savepoint = f"sp_{next(_savepoint_ids)}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        conn.execute(f"RELEASE {savepoint}")
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
@@ -82,12 +82,15 @@ import logging
 import dspy
 import sqlite3
 from vendor_invoice_logic import matrix_media_dataframe
+from utils import reconcile
+from utils.llm_cache import CachedPredictor
 from datetime import datetime
 
 # Get today's date in the desired format (e.g., 'YYYY-MM-DD')
 today_date = datetime.now().strftime('%Y%m%d')
 
-dspy.configure(lm=dspy.LM('openai/gpt-4o'))
+LLM_MODEL = 'openai/gpt-4o'
+dspy.configure(lm=dspy.LM(LLM_MODEL))
 
 file_path = r"D:\Programming\Billing_PDF_Automation\output\Matrix Media Services Invoice.docx"
 
@@ -105,7 +108,8 @@ class MatchDataFrameToDatabase(dspy.Signature):
         desc="All database records"
     )
     matches: list[dict[str, str]] = dspy.OutputField(
-        desc="Best matches for each DataFrame record"
+        desc="Best match for each DataFrame record: the DataFrame record, including its record_id, "
+             "with the database market and amount, plus the database invoice_no"
     )
 
 
@@ -128,9 +132,13 @@ class CompareDataFramesForMargin(dspy.Signature):
 
 
 
-# Predict functions
-compare_data_to_db = dspy.Predict(MatchDataFrameToDatabase)
-compare_dataframes = dspy.Predict(CompareDataFramesForMargin)
+# Predict functions, answered from the persistent LLM cache when the records are unchanged
+compare_data_to_db = CachedPredictor(
+    dspy.Predict(MatchDataFrameToDatabase), "compare_data_to_db", LLM_MODEL, outputs=("matches",)
+)
+compare_dataframes = CachedPredictor(
+    dspy.Predict(CompareDataFramesForMargin), "compare_dataframes", LLM_MODEL, outputs=("unchanged_amounts",)
+)
 
 # Example DataFrame records
 df_transformed, df_original = matrix_media_dataframe.build_dataframe_from_word_document(file_path)
@@ -145,23 +153,27 @@ conn.close()
 
 print(f"Filtered database records for batch ID {today_date}: {database_records}")
 
-# Compare DataFrame to Database
-try:
-    response_db = compare_data_to_db(
-        dataframe_records=df_transformed.to_dict(orient='records'),
-        database_records=database_records
-    )
-
-    print("DSPy Database Comparison Response:", response_db)
+# Compare DataFrame to Database: match locally first, the LLM only sees what is left
+dataframe_records = df_transformed.to_dict(orient='records')
+matches, residue_dataframe, residue_database = reconcile.match_records(dataframe_records, database_records)
+logging.info(
+    f"Matched {len(matches)} of {len(dataframe_records)} records locally; "
+    f"{len(residue_dataframe)} ambiguous record(s) left for DSPy."
+)
 
-    # Extract matches and discrepancies from DB comparison
-    matches = response_db.results.get('matches', [])
-    discrepancies_db = response_db.results.get('discrepancies', [])
+def match_chunk(chunk_dataframe_records, chunk_database_records):
+    return compare_data_to_db(
+        dataframe_records=chunk_dataframe_records,
+        database_records=chunk_database_records
+    ).matches
 
-    logging.info(f"Found {len(matches)} matches and {len(discrepancies_db)} discrepancies in DB comparison.")
 
-except Exception as e:
-    logging.error(f"Error during DSPy database comparison: {e}")
+# Large residues are split into chunks that are sent to DSPy a few at a time
+llm_matches, unmatched_dataframe = reconcile.reconcile_with_llm(residue_dataframe, residue_database, match_chunk)
+matches.extend(llm_matches)
+logging.info(f"Found {len(matches)} matches; {len(unmatched_dataframe)} record(s) could not be matched.")
+for record in unmatched_dataframe:
+    print("Unmatched:", record)
 
 # Compare Transformed vs Original DataFrames
 try:
@@ -173,7 +185,7 @@ try:
     print("DSPy Margin Comparison Response:", response_margin)
 
     # Extract records with unchanged amounts
-    unchanged_amounts = response_margin.results.get('unchanged_amounts', [])
+    unchanged_amounts = response_margin.unchanged_amounts or []
 
     if unchanged_amounts:
         logging.warning(f"Found {len(unchanged_amounts)} records where margin was not applied:")
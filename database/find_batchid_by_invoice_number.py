@@ -1,31 +1,69 @@
 import sqlite3
 import argparse
 import sys
+import os
+import re
 
-def connect_db(db_path='invoices.db'):
-    """Establish a connection to the SQLite database."""
+# Allow running as a script (python database/find_batchid_by_invoice_number.py) as well as a module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import ensure_schema
+
+def connect_db(db_path=None):
+    """Return the shared connection to the SQLite database (database/invoice.db by default)."""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         return conn
     except sqlite3.Error as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
+def read_invoice_numbers(stream):
+    """Read invoice numbers separated by whitespace, commas or semicolons from a text stream."""
+    numbers = []
+    for line in stream:
+        numbers.extend(token for token in re.split(r"[\s,;]+", line) if token)
+    return numbers
+
 def find_batches_for_invoices(conn, invoice_numbers):
     """
     Query the database for each invoice number in invoice_numbers
     and return a list of tuples (invoice_no, batch_id).
+
+    The numbers are loaded into a temporary table and joined against the
+    invoice_no index in a single query, so any number of invoices (no SQLite
+    variable limit) resolves without scanning the invoices table.
     """
     cursor = conn.cursor()
-    # Use parameter substitution to safely include multiple invoice numbers in the query.
-    query = f"""
-        SELECT invoice_no, batch_id 
-        FROM invoices 
-        WHERE invoice_no IN ({','.join('?' for _ in invoice_numbers)})
-        GROUP BY invoice_no, batch_id;
-    """
-    cursor.execute(query, invoice_numbers)
-    results = cursor.fetchall()
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS lookup_invoice_numbers (invoice_no TEXT PRIMARY KEY) WITHOUT ROWID"
+    )
+    try:
+        # One savepoint around the load instead of a commit per inserted number
+        cursor.execute("SAVEPOINT load_invoice_numbers")
+        try:
+            cursor.execute("DELETE FROM temp.lookup_invoice_numbers")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO temp.lookup_invoice_numbers (invoice_no) VALUES (?)",
+                ((str(number),) for number in invoice_numbers)
+            )
+        except BaseException:
+            cursor.execute("ROLLBACK TO load_invoice_numbers")
+            raise
+        finally:
+            cursor.execute("RELEASE load_invoice_numbers")
+        # CROSS JOIN keeps the lookup table as the outer loop: one index probe per
+        # requested number instead of walking the whole invoice_no index
+        cursor.execute("""
+            SELECT DISTINCT i.invoice_no, i.batch_id
+            FROM temp.lookup_invoice_numbers AS l
+            CROSS JOIN invoices AS i ON i.invoice_no = l.invoice_no
+            ORDER BY l.invoice_no, i.batch_id;
+        """)
+        results = cursor.fetchall()
+    finally:
+        cursor.execute("DELETE FROM temp.lookup_invoice_numbers")
     return results
 
 def print_results(results):
@@ -47,15 +85,36 @@ def main():
         "invoice_numbers",
         metavar="N",
         type=str,
-        nargs="+",
+        nargs="*",
         help="List of invoice numbers to query"
     )
+    parser.add_argument(
+        "--file",
+        type=str,
+        help="Read invoice numbers from this file ('-' for standard input), e.g. a remittance export"
+    )
     args = parser.parse_args()
 
+    invoice_numbers = list(args.invoice_numbers)
+    if args.file == "-" or (not args.file and not invoice_numbers and not sys.stdin.isatty()):
+        invoice_numbers.extend(read_invoice_numbers(sys.stdin))
+    elif args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            invoice_numbers.extend(read_invoice_numbers(f))
+    if not invoice_numbers:
+        parser.error("no invoice numbers given (pass them as arguments, with --file, or on standard input)")
+
     conn = connect_db()
-    results = find_batches_for_invoices(conn, args.invoice_numbers)
-    print_results(results)
-    conn.close()
+    try:
+        ensure_schema()
+        results = find_batches_for_invoices(conn, invoice_numbers)
+        print_results(results)
+
+        missing = set(invoice_numbers) - {invoice_no for invoice_no, _ in results}
+        if missing:
+            print(f"\n{len(missing)} of {len(set(invoice_numbers))} invoice number(s) not found.")
+    finally:
+        close_connection()
 
 if __name__ == "__main__":
     main()
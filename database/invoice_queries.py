@@ -0,0 +1,118 @@
+import datetime
+import logging
+
+from utils.amount_index import AmountIndex
+
+
+# Batch IDs are generated as "%Y%m%d_%H%M%S" (see database_functions.BATCH_ID)
+BATCH_ID_FORMAT = "%Y%m%d_%H%M%S"
+BATCH_ID_GLOB = "[0-9]" * 8 + "_" + "[0-9]" * 6
+
+INVOICE_COLUMNS = (
+    "invoice_no, market, amount, batch_id, docx_file_path, "
+    "service_period, description, job_number"
+)
+
+
+def is_valid_batch_id(batch_id):
+    """Check that a batch ID parses with the timestamp format used to create it."""
+    try:
+        datetime.datetime.strptime(batch_id, BATCH_ID_FORMAT)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def get_latest_batch_id(conn):
+    """
+    Return the most recent well-formed batch ID, or None if there is none.
+
+    Batch IDs sort chronologically as strings, so the rows are walked in
+    descending batch_id order and the first valid one wins. With the
+    batch_id index this reads a handful of index entries instead of the
+    whole table.
+    """
+    cursor = conn.execute(
+        """
+        SELECT batch_id FROM invoices
+        WHERE batch_id GLOB ?
+        ORDER BY batch_id DESC
+        """,
+        (BATCH_ID_GLOB,)
+    )
+    try:
+        for (batch_id,) in cursor:
+            if is_valid_batch_id(batch_id):
+                return batch_id
+            logging.warning(f"Invalid batch_id format: {batch_id}")
+    finally:
+        cursor.close()
+    return None
+
+
+def count_invoices_by_vendor(conn, batch_id):
+    """Return {vendor: row count} for a single batch, grouped in SQL."""
+    cursor = conn.execute(
+        """
+        SELECT vendor, COUNT(*) FROM invoices
+        WHERE batch_id = ?
+        GROUP BY vendor
+        """,
+        (batch_id,)
+    )
+    return dict(cursor.fetchall())
+
+
+def iter_batch_invoices(conn, batch_id, vendor):
+    """
+    Stream the invoices of one vendor within a batch, in insertion order.
+
+    Yields tuples of (invoice_no, market, amount, batch_id, docx_file_path,
+    service_period, description, job_number), the row shape used when
+    assembling the final document.
+    """
+    cursor = conn.execute(
+        f"""
+        SELECT {INVOICE_COLUMNS} FROM invoices
+        WHERE batch_id = ? AND vendor = ?
+        ORDER BY id
+        """,
+        (batch_id, vendor)
+    )
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def load_amount_index(conn, batch_id=None):
+    """
+    Build an AmountIndex of invoice amounts (amount_cents) keyed by invoice id.
+
+    Args:
+        conn (sqlite3.Connection): Database connection.
+        batch_id (str, optional): Only this batch; all invoices by default.
+    """
+    query = "SELECT id, amount_cents FROM invoices WHERE amount_cents IS NOT NULL"
+    params = ()
+    if batch_id:
+        query += " AND batch_id = ?"
+        params = (batch_id,)
+    rows = conn.execute(query, params).fetchall()
+    return AmountIndex([cents for _, cents in rows], [row_id for row_id, _ in rows])
+
+
+def get_invoices_by_id(conn, ids):
+    """Return {id: (invoice_no, market, amount, batch_id)} for the given invoice ids."""
+    ids = list(ids)
+    invoices = {}
+    # Stay below SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cursor = conn.execute(
+            f"SELECT id, invoice_no, market, amount, batch_id FROM invoices "
+            f"WHERE id IN ({','.join('?' for _ in chunk)})",
+            chunk
+        )
+        invoices.update((row[0], row[1:]) for row in cursor.fetchall())
+    return invoices
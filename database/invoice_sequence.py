@@ -0,0 +1,81 @@
+import logging
+
+from database.connection import transaction
+from database.migrations import ensure_schema
+
+
+# Invoice numbers are shared by all vendors; only the suffix differs (see
+# database_functions.get_suffix_for_source), so there is a single sequence.
+INVOICE_SEQUENCE = "invoice_no"
+DEFAULT_START = 112535
+
+
+def _initial_value(cursor):
+    """
+    First number of a new sequence: one past the highest invoice number already
+    issued, so switching an existing database over cannot reuse a number.
+    """
+    # CAST keeps the leading digits, e.g. "112540-M" -> 112540
+    cursor.execute("SELECT MAX(CAST(invoice_no AS INTEGER)) FROM invoices")
+    highest = cursor.fetchone()[0]
+    if not highest or highest <= 0:
+        return DEFAULT_START
+    return highest + 1
+
+
+def reserve_numbers(cursor, count, name=INVOICE_SEQUENCE):
+    """
+    Reserve count consecutive numbers using the caller's write transaction.
+
+    Expects the migrated schema (database/migrations.py). The caller must hold
+    the write lock (BEGIN IMMEDIATE, e.g. transaction(immediate=True)) so the
+    read and the update of the sequence row cannot interleave with another writer.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor inside the write transaction.
+        count (int): How many numbers to reserve.
+        name (str): Sequence name.
+
+    Returns:
+        range: The reserved numbers.
+    """
+    if count < 0:
+        raise ValueError(f"Cannot reserve a negative count of numbers: {count}")
+
+    cursor.execute("SELECT next_value FROM invoice_sequence WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    if row is None:
+        start = _initial_value(cursor)
+        logging.info(f"Starting invoice sequence '{name}' at {start}")
+        cursor.execute(
+            "INSERT INTO invoice_sequence (name, next_value) VALUES (?, ?)",
+            (name, start + count)
+        )
+    else:
+        start = row[0]
+        cursor.execute(
+            "UPDATE invoice_sequence SET next_value = ? WHERE name = ?",
+            (start + count, name)
+        )
+    return range(start, start + count)
+
+
+def reserve(count, name=INVOICE_SEQUENCE, db_path=None):
+    """
+    Atomically reserve a contiguous block of count numbers.
+
+    Runs in its own BEGIN IMMEDIATE transaction, so concurrent processes or
+    worker threads each get a distinct block without scanning the invoices
+    table. Numbers of a block that ends up unused are not handed out again.
+
+    Args:
+        count (int): How many numbers to reserve.
+        name (str): Sequence name.
+        db_path (str, optional): Database file. Defaults to get_db_path().
+
+    Returns:
+        range: The reserved numbers, e.g. range(112540, 112545) for count=5.
+    """
+    ensure_schema(db_path)
+    with transaction(db_path, immediate=True) as conn:
+        return reserve_numbers(conn.cursor(), count, name)
@@ -0,0 +1,67 @@
+from utils.markets import canonical_market, market_key
+
+# Vendors whose first invoice field is a market name; for other sources (fee
+# invoices) it is a free-text description, only canonicalized on an exact alias
+# match and never stored as a market
+MARKET_SOURCES = ("Matrix Media",)
+
+
+def get_market_id(cursor, name, contains=True):
+    """Return the id of a known market, or None; never creates a market. contains as in get_market_ids."""
+    cursor.execute(
+        "SELECT market_id FROM market_aliases WHERE alias_key = ?",
+        (market_key(canonical_market(name, contains=contains)),)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def get_market_ids(cursor, names, contains=True):
+    """
+    Map market names to markets.id, creating markets that are not known yet.
+
+    Names are canonicalized (utils.markets.canonical_market) and resolved
+    through their market_key in market_aliases, so spelling variants of a
+    market share one id. A new market is stored under its canonical name
+    and registered as its own alias.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the caller's transaction.
+        names (iterable): Market names; empty names map to None.
+        contains (bool): Passed to canonical_market. False for free-text
+            descriptions (vendors not in MARKET_SOURCES), which only resolve
+            to a known market on an exact alias match.
+
+    Returns:
+        dict: {name: market_id}
+    """
+    canonical = {name: canonical_market(name, contains=contains) for name in set(names)}
+    keys = {name: market_key(canonical_name) for name, canonical_name in canonical.items()}
+    wanted = {key for key in keys.values() if key}
+
+    ids_by_key = {}
+    pending = list(wanted)
+    # Stay below SQLite's bound-parameter limit
+    for start in range(0, len(pending), 500):
+        chunk = pending[start:start + 500]
+        cursor.execute(
+            f"SELECT alias_key, market_id FROM market_aliases "
+            f"WHERE alias_key IN ({','.join('?' for _ in chunk)})",
+            chunk
+        )
+        ids_by_key.update(cursor.fetchall())
+
+    for name, key in sorted(keys.items(), key=lambda item: str(item[0])):
+        if not key or key in ids_by_key:
+            continue
+        display_name = " ".join(str(canonical[name]).split())
+        cursor.execute("INSERT OR IGNORE INTO markets (name) VALUES (?)", (display_name,))
+        cursor.execute("SELECT id FROM markets WHERE name = ?", (display_name,))
+        market_id = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT OR IGNORE INTO market_aliases (alias_key, market_id) VALUES (?, ?)",
+            (key, market_id)
+        )
+        ids_by_key[key] = market_id
+
+    return {name: ids_by_key.get(key) for name, key in keys.items()}
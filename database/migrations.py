@@ -0,0 +1,404 @@
+# Versioned schema migrations for the invoice database.
+#
+# The schema version is stored in the database file with PRAGMA user_version.
+# Each migration runs once, in order, in a write transaction together with the
+# version bump, so two processes starting at once cannot both apply a step.
+# Add a migration by appending to MIGRATIONS; never edit or reorder released ones.
+import datetime
+import logging
+import re
+import sqlite3
+import threading
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from database.connection import get_db_path, transaction
+
+# Date formats found in older rows; everything is stored as ISO YYYY-MM-DD
+LEGACY_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d", "%Y/%m/%d")
+
+# The migrations below use frozen copies of the amount and market rules
+# (utils.amounts, utils.markets, database.markets) as they were when the
+# migrations were written. The live helpers may change; a released migration
+# must keep producing the same database.
+MIGRATION_MARKET_SOURCES = ("Matrix Media",)
+MIGRATION_MARKET_SPELLINGS = {
+    "Fort Payne": ("Fort Payne", "Ft. Payne", "Ft Payne", "FortPayne", "FtPayne"),
+}
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+
+
+def _column_names(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+
+def create_invoices_table(cursor):
+    """Invoices table as created by ensure_invoices_table_exists, including job_number."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT,
+            invoice_no TEXT,
+            vendor TEXT,
+            amount TEXT,
+            date TEXT,
+            market TEXT,
+            service_period TEXT,
+            description TEXT,
+            docx_file_path TEXT,
+            job_number TEXT
+        );
+    """)
+    # Databases created before job numbers were tracked
+    if "job_number" not in _column_names(cursor, "invoices"):
+        cursor.execute("ALTER TABLE invoices ADD COLUMN job_number TEXT;")
+
+
+def create_invoice_sequence_table(cursor):
+    """Next free invoice number, see database/invoice_sequence.py."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS invoice_sequence (
+            name TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        );
+    """)
+
+
+def create_invoice_indexes(cursor):
+    """
+    Indexes for the access paths used by the pipeline and the query tools.
+
+    Index entries also carry the rowid, so rows sharing the indexed values
+    stay in insertion (id) order.
+    """
+    # Latest batch lookup, per-vendor counts and rows of a batch, and the
+    # Fort Payne lookup (vendor + batch, reads market and invoice_no from the index)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_batch_vendor
+        ON invoices (batch_id, vendor, market, invoice_no);
+    """)
+    # Batch lookup by invoice number (find_batchid_by_invoice_number.py)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_invoice_no
+        ON invoices (invoice_no, batch_id);
+    """)
+    # Vendor and market filters across batches
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_vendor_market
+        ON invoices (vendor, market);
+    """)
+
+
+def _amount_cents(amount):
+    """Amount like '$1,234.56' or '(12.50)' in integer cents, or None (frozen parse_amount_cents)."""
+    if amount is None or isinstance(amount, bool):
+        return None
+    if isinstance(amount, float):
+        amount = repr(amount)
+    text = str(amount).strip().replace("$", "").replace(",", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    if not text:
+        return None
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return None
+    if not value.is_finite():
+        return None
+    cents = int(value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+    return -cents if negative else cents
+
+
+def _market_key(name):
+    """Lowercase words separated by single spaces, punctuation dropped (frozen market_key)."""
+    if not name:
+        return ""
+    return " ".join(_NON_WORD_RE.sub(" ", str(name).lower()).split())
+
+
+def _market_aliases():
+    """Alias key -> canonical name for MIGRATION_MARKET_SPELLINGS, with and without spaces."""
+    aliases = {}
+    for canonical, names in MIGRATION_MARKET_SPELLINGS.items():
+        for name in (canonical, *names):
+            key = _market_key(name)
+            aliases[key] = canonical
+            aliases[key.replace(" ", "")] = canonical
+    return aliases
+
+
+def _canonical_market(name, aliases):
+    """Known market that name is, or contains as whole words; else name stripped (frozen canonical_market)."""
+    if not name:
+        return name
+    key = _market_key(name)
+    canonical = aliases.get(key) or aliases.get(key.replace(" ", ""))
+    if canonical:
+        return canonical
+    words = key.split()
+    max_words = max(len(alias.split()) for alias in aliases)
+    for size in range(min(max_words, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            canonical = aliases.get(" ".join(words[start:start + size]))
+            if canonical:
+                return canonical
+    return name.strip() if isinstance(name, str) else name
+
+
+def _market_ids(cursor, names):
+    """Map market names to markets.id, creating unknown markets (frozen get_market_ids)."""
+    aliases = _market_aliases()
+    canonical = {name: _canonical_market(name, aliases) for name in set(names)}
+    keys = {name: _market_key(canonical_name) for name, canonical_name in canonical.items()}
+
+    ids_by_key = {}
+    pending = sorted({key for key in keys.values() if key})
+    # Stay below SQLite's bound-parameter limit
+    for start in range(0, len(pending), 500):
+        chunk = pending[start:start + 500]
+        cursor.execute(
+            f"SELECT alias_key, market_id FROM market_aliases "
+            f"WHERE alias_key IN ({','.join('?' for _ in chunk)})",
+            chunk
+        )
+        ids_by_key.update(cursor.fetchall())
+
+    for name, key in sorted(keys.items(), key=lambda item: str(item[0])):
+        if not key or key in ids_by_key:
+            continue
+        display_name = " ".join(str(canonical[name]).split())
+        cursor.execute("INSERT OR IGNORE INTO markets (name) VALUES (?)", (display_name,))
+        cursor.execute("SELECT id FROM markets WHERE name = ?", (display_name,))
+        market_id = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT OR IGNORE INTO market_aliases (alias_key, market_id) VALUES (?, ?)",
+            (key, market_id)
+        )
+        ids_by_key[key] = market_id
+
+    return {name: ids_by_key.get(key) for name, key in keys.items()}
+
+
+def _seed_market_aliases(cursor):
+    """Register every spelling in MIGRATION_MARKET_SPELLINGS in market_aliases."""
+    for canonical, spellings in MIGRATION_MARKET_SPELLINGS.items():
+        cursor.execute("INSERT OR IGNORE INTO markets (name) VALUES (?)", (canonical,))
+        cursor.execute("SELECT id FROM markets WHERE name = ?", (canonical,))
+        market_id = cursor.fetchone()[0]
+        keys = {_market_key(name) for name in (canonical, *spellings)}
+        cursor.executemany(
+            "INSERT OR REPLACE INTO market_aliases (alias_key, market_id) VALUES (?, ?)",
+            [(key, market_id) for key in sorted(keys)]
+        )
+
+
+def to_iso_date(value):
+    """Return value as an ISO date string, or unchanged if it is not a recognised date."""
+    if not value:
+        return value
+    text = str(value).strip()
+    for date_format in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+
+def add_typed_columns_and_markets(cursor):
+    """
+    Typed storage for amounts and markets.
+
+    amount_cents holds the amount as integer cents and market_id points at a
+    row of the markets table, whose market_aliases map normalized spellings to
+    it. The display columns (amount as '$1,234.56', market as written on the
+    invoice) are kept for the document and GUI code that reads them. Existing
+    rows are backfilled and their dates rewritten as ISO YYYY-MM-DD.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS markets (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS market_aliases (
+            alias_key TEXT PRIMARY KEY,
+            market_id INTEGER NOT NULL REFERENCES markets (id)
+        ) WITHOUT ROWID;
+    """)
+    columns = _column_names(cursor, "invoices")
+    if "amount_cents" not in columns:
+        cursor.execute("ALTER TABLE invoices ADD COLUMN amount_cents INTEGER;")
+    if "market_id" not in columns:
+        cursor.execute("ALTER TABLE invoices ADD COLUMN market_id INTEGER REFERENCES markets (id);")
+
+    cursor.execute("SELECT id, amount, date, market, vendor FROM invoices")
+    rows = cursor.fetchall()
+    # Only market-bearing vendors have a market; for fee invoices the column is a description
+    market_ids = _market_ids(cursor, [market for _, _, _, market, vendor in rows if vendor in MIGRATION_MARKET_SOURCES])
+    cursor.executemany(
+        "UPDATE invoices SET amount_cents = ?, date = ?, market_id = ? WHERE id = ?",
+        [
+            (_amount_cents(amount), to_iso_date(date),
+             market_ids[market] if vendor in MIGRATION_MARKET_SOURCES else None, row_id)
+            for row_id, amount, date, market, vendor in rows
+        ]
+    )
+    logging.info(f"Backfilled typed amount, date and market columns for {len(rows)} invoice(s)")
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_market_id
+        ON invoices (market_id, batch_id);
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_invoices_amount_cents
+        ON invoices (amount_cents);
+    """)
+
+
+def canonicalize_markets(cursor):
+    """
+    Register the known market spellings (MIGRATION_MARKET_SPELLINGS) as
+    aliases and point every invoice of a market-bearing vendor at its
+    canonical market, e.g. all Fort Payne spellings at the one "Fort Payne"
+    market. Other invoices get no market, and markets made from their
+    descriptions are deleted.
+    """
+    _seed_market_aliases(cursor)
+
+    vendors = ", ".join("?" for _ in MIGRATION_MARKET_SOURCES)
+    cursor.execute(
+        f"SELECT DISTINCT market FROM invoices WHERE market IS NOT NULL AND vendor IN ({vendors})",
+        MIGRATION_MARKET_SOURCES
+    )
+    names = [name for (name,) in cursor.fetchall()]
+    market_ids = _market_ids(cursor, names)
+    cursor.executemany(
+        f"UPDATE invoices SET market_id = ? WHERE market = ? AND vendor IN ({vendors})",
+        [(market_ids[name], name, *MIGRATION_MARKET_SOURCES) for name in names]
+    )
+    # The market column of fee invoices holds a description, not a market
+    cursor.execute(
+        f"UPDATE invoices SET market_id = NULL WHERE vendor IS NULL OR vendor NOT IN ({vendors})",
+        MIGRATION_MARKET_SOURCES
+    )
+    # Spellings that were stored as markets of their own before
+    cursor.execute("""
+        DELETE FROM markets
+        WHERE id NOT IN (SELECT market_id FROM market_aliases)
+          AND id NOT IN (SELECT market_id FROM invoices WHERE market_id IS NOT NULL)
+    """)
+
+
+# Text columns indexed for full-text search, in invoices_fts column order
+SEARCH_COLUMNS = ("invoice_no", "market", "description", "job_number", "service_period")
+
+
+def create_invoice_search_index(cursor):
+    """
+    FTS5 index over the text columns of invoices, kept in sync by triggers.
+
+    invoices_fts is an external-content table: it stores only the index and
+    reads the text from invoices by id, so the data is not duplicated.
+    """
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+    try:
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS invoices_fts
+            USING fts5({columns}, content='invoices', content_rowid='id');
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite builds without FTS5: everything else works, search does not
+        logging.warning(f"Full-text search is not available in this SQLite build: {e}")
+        return
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS invoices_fts_insert AFTER INSERT ON invoices BEGIN
+            INSERT INTO invoices_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END;
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS invoices_fts_delete AFTER DELETE ON invoices BEGIN
+            INSERT INTO invoices_fts (invoices_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END;
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS invoices_fts_update AFTER UPDATE ON invoices BEGIN
+            INSERT INTO invoices_fts (invoices_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO invoices_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END;
+    """)
+    # Index the rows that already exist
+    cursor.execute("INSERT INTO invoices_fts (invoices_fts) VALUES ('rebuild')")
+
+
+# Position in this list + 1 is the schema version the migration produces
+MIGRATIONS = [
+    create_invoices_table,
+    create_invoice_sequence_table,
+    create_invoice_indexes,
+    add_typed_columns_and_markets,
+    canonicalize_markets,
+    create_invoice_search_index,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_migrated_paths = set()
+_migrate_lock = threading.Lock()
+
+
+def get_schema_version(conn):
+    """Schema version recorded in the database file (0 for a new database)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path=None):
+    """
+    Bring the database schema up to SCHEMA_VERSION.
+
+    Args:
+        db_path (str, optional): Database file. Defaults to get_db_path().
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    with transaction(db_path, immediate=True) as conn:
+        # Read under the write lock: another process may have just migrated
+        version = get_schema_version(conn)
+        if version > SCHEMA_VERSION:
+            logging.warning(
+                f"Database schema version {version} is newer than this code ({SCHEMA_VERSION})"
+            )
+            return version
+
+        cursor = conn.cursor()
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            logging.info(f"Applying database migration {number}: {migration.__name__}")
+            migration(cursor)
+            # PRAGMA does not accept bound parameters
+            cursor.execute(f"PRAGMA user_version = {number}")
+    return max(version, SCHEMA_VERSION)
+
+
+def ensure_schema(db_path=None):
+    """
+    Run pending migrations once per database file per process.
+
+    Cheap to call before every database write; after the first call for a
+    path it does not touch the database.
+    """
+    path = get_db_path(db_path)
+    if path in _migrated_paths:
+        return
+    with _migrate_lock:
+        if path in _migrated_paths:
+            return
+        migrate(path)
+        # Every connection to :memory: is a new database, so never cache it
+        if path != ":memory:":
+            _migrated_paths.add(path)
@@ -0,0 +1,205 @@
+import argparse
+import datetime
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import urllib.parse
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Allow running as a script (python database/parquet_export.py) as well as a module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.invoice_queries import BATCH_ID_GLOB
+from database.migrations import ensure_schema
+from database.archive import HISTORY_VIEW, attach_history
+
+# Export layout (hive partitioning, readable by pandas, pyarrow, DuckDB, Spark):
+#   <export dir>/vendor=Matrix%20Media/month=2024-03/batch_20240301_090000.parquet
+# vendor and month live in the directory names only, not inside the files.
+DEFAULT_EXPORT_DIR = os.path.join(os.getcwd(), "exports", "invoices_parquet")
+STATE_FILE = "_exported_batches.json"
+
+INVOICE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("batch_id", pa.string()),
+    ("invoice_no", pa.string()),
+    ("vendor", pa.string()),
+    ("market", pa.string()),
+    ("market_id", pa.int64()),
+    ("amount_cents", pa.int64()),
+    ("date", pa.date32()),
+    ("service_period", pa.string()),
+    ("description", pa.string()),
+    ("job_number", pa.string()),
+])
+EXPORT_COLUMNS = INVOICE_SCHEMA.names
+PARTITION_COLUMN = "vendor"
+UNKNOWN_VENDOR = "unknown"
+
+
+def partition_value(value):
+    """Percent-encode a vendor name for a partition directory; readers decode it back."""
+    return urllib.parse.quote(str(value or UNKNOWN_VENDOR), safe="")
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def load_exported_batches(export_dir):
+    """
+    State of the batches already exported to export_dir.
+
+    Returns:
+        dict: {batch_id: content fingerprint} as of each batch's last export.
+    """
+    try:
+        with open(os.path.join(export_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("batches", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_exported_batches(export_dir, batches):
+    """Record the exported batches and their state; written to a temp file and swapped in."""
+    path = os.path.join(export_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"batches": dict(sorted(batches.items()))}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def batch_fingerprint(rows):
+    """SHA-256 over the exported columns of a batch's rows (in id order), to detect any change."""
+    sha = hashlib.sha256()
+    for row in rows:
+        sha.update(json.dumps(row, default=str).encode("utf-8"))
+        sha.update(b"\n")
+    return sha.hexdigest()
+
+
+def batch_table(rows):
+    """Build a typed Arrow table from invoice rows in EXPORT_COLUMNS order."""
+    columns = list(zip(*rows)) if rows else [[] for _ in EXPORT_COLUMNS]
+    date_index = EXPORT_COLUMNS.index("date")
+    columns[date_index] = [_parse_date(value) for value in columns[date_index]]
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, INVOICE_SCHEMA)],
+        schema=INVOICE_SCHEMA
+    )
+
+
+def write_batch(table, export_dir, batch_id):
+    """
+    Write one batch as one Parquet file per (vendor, month) partition.
+
+    Returns:
+        list: Paths of the files written.
+    """
+    partitions = {}
+    vendors = table.column("vendor").to_pylist()
+    dates = table.column("date").to_pylist()
+    for index, (vendor, date) in enumerate(zip(vendors, dates)):
+        # Rows without a date fall back to the month in the batch ID
+        month = date.strftime("%Y-%m") if date else f"{batch_id[:4]}-{batch_id[4:6]}"
+        partitions.setdefault((partition_value(vendor), month), []).append(index)
+
+    file_table = table.drop_columns([PARTITION_COLUMN])
+    written = []
+    for (vendor, month), indices in sorted(partitions.items()):
+        directory = os.path.join(export_dir, f"vendor={vendor}", f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"batch_{batch_id}.parquet")
+        # Write then rename, so readers never see a half-written file
+        pq.write_table(file_table.take(indices), path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        written.append(path)
+    return written
+
+
+def remove_stale_files(export_dir, batch_id, written):
+    """Delete files of batch_id in partitions it no longer has rows in."""
+    pattern = os.path.join(export_dir, "vendor=*", "month=*", f"batch_{glob.escape(batch_id)}.parquet")
+    for path in glob.glob(pattern):
+        if path not in written:
+            os.remove(path)
+
+
+def export_new_batches(conn, export_dir=DEFAULT_EXPORT_DIR, table="invoices"):
+    """
+    Export every batch that is new or has changed since its last export.
+
+    A fingerprint of each batch's exported columns is recorded when it is
+    exported. A batch whose rows changed since then, because it was still
+    being written (e.g. the current BATCH_ID) or was corrected in place, is
+    exported again and its files are replaced. Finding the changed batches
+    reads every row once, one at a time; only the batches to write are
+    loaded, one at a time. A batch is recorded only after all of its files
+    are written, so an interrupted run re-exports (overwrites) only the
+    batch it was in.
+
+    Args:
+        conn (sqlite3.Connection): Database connection.
+        export_dir (str): Root directory of the partitioned dataset.
+        table (str): "invoices", or the invoice_history view from
+            archive.attach_history to include archived batches.
+
+    Returns:
+        dict: {batch_id: number of rows exported}
+    """
+    if table not in ("invoices", HISTORY_VIEW):
+        raise ValueError(f"Unknown invoice table: {table}")
+    os.makedirs(export_dir, exist_ok=True)
+    exported = load_exported_batches(export_dir)
+
+    columns = ", ".join(EXPORT_COLUMNS)
+    batch_index = EXPORT_COLUMNS.index("batch_id")
+    all_rows = conn.execute(
+        f"SELECT {columns} FROM {table} WHERE batch_id GLOB ? ORDER BY batch_id, id", (BATCH_ID_GLOB,)
+    )
+    batch_ids = [
+        batch_id for batch_id, rows in itertools.groupby(all_rows, key=lambda row: row[batch_index])
+        if exported.get(batch_id) != batch_fingerprint(rows)
+    ]
+
+    counts = {}
+    query = f"SELECT {columns} FROM {table} WHERE batch_id = ? ORDER BY id"
+    for batch_id in batch_ids:
+        rows = conn.execute(query, (batch_id,)).fetchall()
+        paths = write_batch(batch_table(rows), export_dir, batch_id)
+        if batch_id in exported:
+            remove_stale_files(export_dir, batch_id, paths)
+            logging.info(f"Batch {batch_id} changed since its last export, exporting it again")
+        # The fingerprint of the rows actually written, in case they changed meanwhile
+        exported[batch_id] = batch_fingerprint(rows)
+        save_exported_batches(export_dir, exported)
+        counts[batch_id] = len(rows)
+        logging.info(f"Exported batch {batch_id}: {len(rows)} invoice(s) in {len(paths)} file(s)")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export new invoice batches to Parquet, partitioned by vendor and month.")
+    parser.add_argument("--output", type=str, default=DEFAULT_EXPORT_DIR, help="Root directory of the Parquet dataset.")
+    parser.add_argument("--history", action="store_true", help="Also export batches moved to the yearly archive databases.")
+    args = parser.parse_args()
+
+    ensure_schema()
+    conn = get_connection()
+    table = attach_history(conn) if args.history else "invoices"
+    counts = export_new_batches(conn, args.output, table)
+    print(f"Exported {len(counts)} new batch(es), {sum(counts.values())} invoice(s) to {args.output}")
+    close_connection()
+
+
+if __name__ == "__main__":
+    main()
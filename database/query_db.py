@@ -1,115 +1,295 @@
-import sqlite3
-import argparse
-import sys
-import os
-
-def connect_db(db_path='invoice.db'):
-    """Establish a connection to the SQLite database."""
-    # Build absolute path relative to the script location
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    full_db_path = os.path.join(script_dir, db_path)
-
-    try:
-        conn = sqlite3.connect(full_db_path)
-        return conn
-    except sqlite3.Error as e:
-        print(f"Error connecting to database: {e}")
-        sys.exit(1)
-
-def read_all_invoices(conn):
-    """Query and return all invoice records."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM invoices;")  # Ensure this includes the `market` column
-    rows = cursor.fetchall()
-    return rows
-
-def read_invoices_by_batch(conn, batch_id):
-    """Query and return invoice records filtered by batch ID."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM invoices WHERE batch_id = ?;", (batch_id,))
-    rows = cursor.fetchall()
-    return rows
-
-def print_invoices(rows):
-    """Prints invoice rows in a readable format."""
-    if not rows:
-        print("No invoices found.")
-        return
-
-    # Print header with all possible columns including job_number
-    print(f"{'ID':<5} {'Batch_ID':<15} {'Invoice_No':<12} {'Vendor':<12} {'Amount':<10} {'Date':<12} {'Market':<15} {'Service Period':<15} {'Description':<20} {'Job Number':<12} {'DOCX_File_Path':<30}")
-    print("-" * 150)  # Increased width for additional column
-
-    for row in rows:
-        # Handle different numbers of columns in the result set
-        if len(row) == 8:  # Old schema
-            id, batch_id, invoice_no, vendor, amount, date, market, docx_file_path = row
-            service_period = ""
-            description = ""
-            job_number = ""
-        elif len(row) == 9:  # Missing either service_period or description
-            id, batch_id, invoice_no, vendor, amount, date, market, field8, docx_file_path = row
-            # Determine if field8 is service_period or description (this is a guess)
-            if field8 and any(word in field8.lower() for word in ['period', 'date', 'time', 'month', 'year', 'quarter']):
-                service_period = field8
-                description = ""
-            else:
-                service_period = ""
-                description = field8
-            job_number = ""
-        elif len(row) == 10:  # Schema with service_period and description but no job_number
-            id, batch_id, invoice_no, vendor, amount, date, market, service_period, description, docx_file_path = row
-            job_number = ""
-        elif len(row) == 11:  # Full new schema with job_number
-            id, batch_id, invoice_no, vendor, amount, date, market, service_period, description, docx_file_path, job_number = row
-        elif len(row) > 11:  # Extra columns
-            id, batch_id, invoice_no, vendor, amount, date, market, service_period, description, docx_file_path, job_number = row[:11]
-        else:  # Fewer columns than expected
-            fields = list(row) + [""] * (11 - len(row))
-            id, batch_id, invoice_no, vendor, amount, date, market, service_period, description, docx_file_path, job_number = fields
-            
-        # Convert None values to empty strings for all fields
-        id = str(id) if id is not None else ""
-        batch_id = str(batch_id) if batch_id is not None else ""
-        invoice_no = str(invoice_no) if invoice_no is not None else ""
-        vendor = str(vendor) if vendor is not None else ""
-        amount = str(amount) if amount is not None else ""
-        date = str(date) if date is not None else ""
-        market = str(market) if market is not None else ""
-        service_period = str(service_period) if service_period is not None else ""
-        description = str(description) if description is not None else ""
-        job_number = str(job_number) if job_number is not None else ""
-        docx_file_path = str(docx_file_path) if docx_file_path is not None else ""
-        
-        # Truncate long values for better display
-        if len(market) > 15:
-            market = market[:12] + "..."
-        if len(description) > 20:
-            description = description[:17] + "..."
-        if len(docx_file_path) > 30:
-            docx_file_path = docx_file_path[:27] + "..."
-        
-        # Print all fields including job_number
-        print(f"{id:<5} {batch_id:<15} {invoice_no:<12} {vendor:<12} {amount:<10} {date:<12} {market:<15} {service_period:<15} {description:<20} {job_number:<12} {docx_file_path:<30}")
-
-        
-def main():
-    parser = argparse.ArgumentParser(description="Query invoices from the SQLite database.")
-    parser.add_argument("--batch_id", type=str, help="Optional batch ID to filter invoices.")
-    args = parser.parse_args()
-
-    conn = connect_db()
-
-    if args.batch_id:
-        print(f"Fetching invoices for batch ID: {args.batch_id}")
-        rows = read_invoices_by_batch(conn, args.batch_id)
-    else:
-        print("Fetching all invoices:")
-        rows = read_all_invoices(conn)
-
-    print_invoices(rows)
-    conn.close()
-
-if __name__ == "__main__":
-    main()
-
+import sqlite3
+import argparse
+import sys
+import os
+import csv
+import json
+
+# Allow running as a script (python database/query_db.py) as well as a module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import ensure_schema, SEARCH_COLUMNS
+from database.archive import HISTORY_VIEW, attach_history
+
+# Columns that can be selected and exported, in table order
+INVOICE_COLUMNS = (
+    "id", "batch_id", "invoice_no", "vendor", "amount", "date", "market",
+    "service_period", "description", "docx_file_path", "job_number",
+    "amount_cents", "market_id",
+)
+# Columns printed when none are requested
+DEFAULT_COLUMNS = (
+    "id", "batch_id", "invoice_no", "vendor", "amount", "date", "market",
+    "service_period", "description", "job_number", "docx_file_path",
+)
+# Display width per column in the printed table; longer values are truncated
+COLUMN_WIDTHS = {
+    "id": 5, "batch_id": 15, "invoice_no": 12, "vendor": 12, "amount": 10,
+    "date": 12, "market": 15, "service_period": 15, "description": 20,
+    "job_number": 12, "docx_file_path": 30, "amount_cents": 12, "market_id": 9,
+    "score": 8,
+}
+DEFAULT_PAGE_SIZE = 500
+# Columns of a search result; the text columns carry the highlight markers
+SEARCH_RESULT_COLUMNS = (
+    "id", "batch_id", "invoice_no", "vendor", "amount", "market", "description", "job_number", "score",
+)
+HIGHLIGHT_MARKERS = ("[", "]")
+
+def connect_db(db_path=None):
+    """Return the shared connection to the SQLite database (database/invoice.db by default)."""
+    try:
+        conn = get_connection(db_path)
+        return conn
+    except sqlite3.Error as e:
+        print(f"Error connecting to database: {e}")
+        sys.exit(1)
+
+def parse_columns(columns):
+    """Validate a column list (or comma-separated string) against INVOICE_COLUMNS."""
+    if not columns:
+        return DEFAULT_COLUMNS
+    if isinstance(columns, str):
+        columns = [column.strip() for column in columns.split(",") if column.strip()]
+    unknown = [column for column in columns if column not in INVOICE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}. Choose from: {', '.join(INVOICE_COLUMNS)}")
+    return tuple(columns)
+
+def build_filters(batch_id=None, vendor=None, date_from=None, date_to=None):
+    """Return (WHERE clauses, parameters) for the optional filters; dates are ISO YYYY-MM-DD, inclusive."""
+    clauses = []
+    params = []
+    if batch_id:
+        clauses.append("batch_id = ?")
+        params.append(batch_id)
+    if vendor:
+        clauses.append("vendor = ?")
+        params.append(vendor)
+    if date_from:
+        clauses.append("date >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("date <= ?")
+        params.append(date_to)
+    return clauses, params
+
+def iter_invoice_pages(conn, columns=None, batch_id=None, vendor=None, date_from=None, date_to=None,
+                       page_size=DEFAULT_PAGE_SIZE, after_id=0, table="invoices"):
+    """
+    Yield pages of invoice rows in id order using keyset pagination.
+
+    Each page is fetched with "id > last id seen ... LIMIT page_size", so a page
+    costs the same no matter how deep into the table it is, and only one page
+    is held in memory at a time.
+
+    Args:
+        conn (sqlite3.Connection): Database connection.
+        columns (list or str, optional): Columns to select; defaults to DEFAULT_COLUMNS.
+        batch_id, vendor (str, optional): Exact-match filters.
+        date_from, date_to (str, optional): Inclusive ISO date range.
+        page_size (int): Rows per page.
+        after_id (int): Start after this invoice id, e.g. to resume an export.
+        table (str): "invoices", or the invoice_history view set up by
+            archive.attach_history to include archived batches.
+
+    Yields:
+        list: Tuples with the requested columns, in the requested order.
+    """
+    if table not in ("invoices", HISTORY_VIEW):
+        raise ValueError(f"Unknown invoice table: {table}")
+    columns = parse_columns(columns)
+    clauses, params = build_filters(batch_id, vendor, date_from, date_to)
+    where = "".join(f" AND {clause}" for clause in clauses)
+    # id is always selected first so the next page can continue after the last row
+    query = f"SELECT id, {', '.join(columns)} FROM {table} WHERE id > ?{where} ORDER BY id LIMIT ?"
+
+    last_id = after_id
+    while True:
+        rows = conn.execute(query, [last_id, *params, page_size]).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [row[1:] for row in rows]
+        if len(rows) < page_size:
+            return
+
+def iter_invoices(conn, columns=None, **filters):
+    """Yield invoice rows one at a time; accepts the arguments of iter_invoice_pages."""
+    for page in iter_invoice_pages(conn, columns, **filters):
+        yield from page
+
+def read_all_invoices(conn):
+    """Query and return all invoice records."""
+    return list(iter_invoices(conn, INVOICE_COLUMNS))
+
+def read_invoices_by_batch(conn, batch_id):
+    """Query and return invoice records filtered by batch ID."""
+    return list(iter_invoices(conn, INVOICE_COLUMNS, batch_id=batch_id))
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query: every word must match, in any column.
+
+    Each word is quoted as a phrase so punctuation is taken literally, e.g.
+    TTC-380 matches the tokens "ttc 380" next to each other. A trailing *
+    keeps its prefix-search meaning: "Dot*" matches Dothan.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def search_invoices(conn, text, limit=20, vendor=None, batch_id=None):
+    """
+    Full-text search over invoice numbers, markets, descriptions, job numbers
+    and service periods, best matches first (BM25).
+
+    Matches in the market, description and job number are wrapped in
+    HIGHLIGHT_MARKERS.
+
+    Args:
+        conn (sqlite3.Connection): Database connection.
+        text (str): Words to search for, see build_match_query.
+        limit (int): Maximum number of results.
+        vendor, batch_id (str, optional): Exact-match filters.
+
+    Returns:
+        list: Tuples with SEARCH_RESULT_COLUMNS; score is the BM25 rank (lower is better).
+    """
+    match_query = build_match_query(text)
+    if not match_query:
+        return []
+
+    start, end = HIGHLIGHT_MARKERS
+    highlight = {
+        column: f"highlight(invoices_fts, {SEARCH_COLUMNS.index(column)}, '{start}', '{end}')"
+        for column in ("market", "description", "job_number")
+    }
+    clauses, params = build_filters(batch_id=batch_id, vendor=vendor)
+    where = "".join(f" AND i.{clause}" for clause in clauses)
+    query = f"""
+        SELECT i.id, i.batch_id, i.invoice_no, i.vendor, i.amount,
+               {highlight['market']}, {highlight['description']}, {highlight['job_number']},
+               round(bm25(invoices_fts), 3)
+        FROM invoices_fts
+        JOIN invoices AS i ON i.id = invoices_fts.rowid
+        WHERE invoices_fts MATCH ?{where}
+        ORDER BY rank
+        LIMIT ?
+    """
+    return conn.execute(query, [match_query, *params, limit]).fetchall()
+
+def print_invoices(rows, columns=DEFAULT_COLUMNS, out=None):
+    """Prints invoice rows in a readable format as they arrive."""
+    out = out or sys.stdout
+    widths = [COLUMN_WIDTHS.get(column, 15) for column in columns]
+
+    header = " ".join(f"{column.replace('_', ' ').title():<{width}}" for column, width in zip(columns, widths))
+    count = 0
+    for row in rows:
+        if count == 0:
+            print(header, file=out)
+            print("-" * len(header), file=out)
+        values = []
+        for value, width in zip(row, widths):
+            # Convert None values to empty strings and truncate long values for better display
+            text = str(value) if value is not None else ""
+            if len(text) > width:
+                text = text[:width - 3] + "..."
+            values.append(f"{text:<{width}}")
+        print(" ".join(values), file=out)
+        count += 1
+
+    if count == 0:
+        print("No invoices found.", file=out)
+
+def write_csv(rows, columns, out):
+    """Write rows as CSV with a header line; returns the number of rows written."""
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(rows, columns, out):
+    """Write one JSON object per row; returns the number of rows written."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Query invoices from the SQLite database.")
+    parser.add_argument("--batch_id", type=str, help="Optional batch ID to filter invoices.")
+    parser.add_argument("--vendor", type=str, help="Only invoices of this vendor, e.g. 'Matrix Media'.")
+    parser.add_argument("--date-from", type=str, help="Only invoices dated on or after this ISO date (YYYY-MM-DD).")
+    parser.add_argument("--date-to", type=str, help="Only invoices dated on or before this ISO date (YYYY-MM-DD).")
+    parser.add_argument("--columns", type=str, help=f"Comma-separated columns to show. Available: {', '.join(INVOICE_COLUMNS)}")
+    parser.add_argument("--after-id", type=int, default=0, help="Start after this invoice id (resume a previous export).")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Rows fetched per query.")
+    parser.add_argument("--format", choices=("table", "csv", "jsonl"), default="table", help="Output format.")
+    parser.add_argument("--output", type=str, help="Write to this file instead of standard output.")
+    parser.add_argument("--history", action="store_true", help="Include batches moved to the yearly archive databases.")
+    parser.add_argument("--search", type=str, help="Full-text search in invoice numbers, markets, descriptions and job numbers.")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of search results.")
+    args = parser.parse_args()
+
+    try:
+        columns = parse_columns(args.columns)
+    except ValueError as e:
+        parser.error(str(e))
+
+    conn = connect_db()
+    try:
+        ensure_schema()
+        if args.search:
+            try:
+                rows = search_invoices(conn, args.search, args.limit, vendor=args.vendor, batch_id=args.batch_id)
+            except sqlite3.OperationalError as e:
+                print(f"Search failed: {e}")
+                sys.exit(1)
+            columns = SEARCH_RESULT_COLUMNS
+        else:
+            # Archives are only attached when history is asked for
+            table = attach_history(conn) if args.history else "invoices"
+            rows = iter_invoices(
+                conn, columns,
+                batch_id=args.batch_id, vendor=args.vendor,
+                date_from=args.date_from, date_to=args.date_to,
+                page_size=args.page_size, after_id=args.after_id, table=table,
+            )
+
+        out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+        try:
+            if args.format == "csv":
+                count = write_csv(rows, columns, out)
+            elif args.format == "jsonl":
+                count = write_jsonl(rows, columns, out)
+            else:
+                if args.search:
+                    print(f"Searching invoices for: {args.search}", file=out)
+                elif args.batch_id:
+                    print(f"Fetching invoices for batch ID: {args.batch_id}", file=out)
+                else:
+                    print("Fetching all invoices:", file=out)
+                print_invoices(rows, columns, out)
+                count = None
+        finally:
+            if args.output:
+                out.close()
+
+        if count is not None and args.output:
+            print(f"Exported {count} invoice(s) to {args.output}")
+    finally:
+        close_connection()
+
+if __name__ == "__main__":
+    main()
@@ -26,5 +26,6 @@ from .shutterstock_crop import (
 from .vision_payments import (
     analyze_image_with_openai,
     encode_image,
-    parse_plaintext_to_dataframe
+    parse_plaintext_to_dataframe,
+    confirm_payments
 )
\ No newline at end of file
@@ -1,95 +1,141 @@
-
-import os
-import base64
-import json
-import re
-from PIL import Image
-import pandas as pd
-from openai import OpenAI
-from invoice_processor import process_invoice  # Import the invoice processing function
-
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
-
-def analyze_image_with_openai(image_path):
-    client = OpenAI()
-    base64_image = encode_image(image_path)
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": "Please provide the following columns from the table: invoice # and net invoice amount. Please ensure it is formatted like this example:- 112401: $1,300.00",
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/png;base64,{base64_image}",
-                            "detail": "high",
-                        },
-                    },
-                ],
-            }],
-            max_tokens=1000,
-        )
-
-        result = response.choices[0].message.content
-        print("Chat Completions Output:\n", result)
-        return result
-    except Exception as e:
-        print(f"Error analyzing image with OpenAI Vision API: {e}")
-        return None
-
-def parse_plaintext_to_dataframe(text):
-    # Use regex to find lines with pattern: "- <invoice>: $<amount>"
-    pattern = r"-\s*(\d+):\s*\$(.*)"
-    entries = re.findall(pattern, text)
-    
-    # Build list of dictionaries from entries
-    data = []
-    for invoice, amount in entries:
-        data.append({"invoice #": int(invoice), "net invoice amount": amount.strip()})
-    
-    # Create DataFrame
-    df = pd.DataFrame(data, columns=["invoice #", "net invoice amount"])
-    return df
-
-
-
-if __name__ == "__main__":
-    # Run the invoice processing to create the cropped image
-    cropped_image_path = process_invoice()
-
-    # Verify that the cropped image was created
-    if not os.path.exists(cropped_image_path):
-        print(f"Input file does not exist: {cropped_image_path}")
-    else:
-        analysis_result = analyze_image_with_openai(cropped_image_path)
-
-        if analysis_result:
-            try:
-                data = json.loads(analysis_result)
-                df = pd.DataFrame(data, columns=["invoice #", "net invoice amount"])
-            except json.JSONDecodeError:
-                df = parse_plaintext_to_dataframe(analysis_result)
-
-            if df is not None and not df.empty:
-                df["invoice #"] = pd.to_numeric(df["invoice #"], errors='coerce')
-                df = df.sort_values(by="invoice #")
-                df.set_index("invoice #", inplace=True)
-                full_range = range(int(df.index.min()), int(df.index.max()) + 1)
-                df = df.reindex(full_range)
-                df.reset_index(inplace=True)
-                df.rename(columns={"index": "invoice #"}, inplace=True)
-                df["net invoice amount"] = df["net invoice amount"].fillna("")
-
-                print(df)
-                df.to_csv("output.csv", index=False)
-                print("Saved analysis to output.csv")
-            else:
-                print("No data was parsed into a DataFrame.")
+
+import os
+import base64
+import json
+import re
+from PIL import Image
+import pandas as pd
+from openai import OpenAI
+from invoice_processor import process_invoice  # Import the invoice processing function
+from database.connection import get_connection, close_connection
+from database.invoice_queries import get_invoices_by_id, load_amount_index
+from utils.amounts import parse_amount_cents
+from utils.llm_cache import cached_chat_completion
+
+# A payment confirms an invoice whose amount is within this many cents of it
+PAYMENT_TOLERANCE_CENTS = 100
+
+def encode_image(image_path):
+    with open(image_path, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode("utf-8")
+
+def analyze_image_with_openai(image_path):
+    client = OpenAI()
+    base64_image = encode_image(image_path)
+
+    try:
+        # The image is part of the cache key, so only a re-run on the same crop is a hit
+        result = cached_chat_completion(
+            client, "vision_payments",
+            model="gpt-4o",
+            messages=[{
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": "Please provide the following columns from the table: invoice # and net invoice amount. Please ensure it is formatted like this example:- 112401: $1,300.00",
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/png;base64,{base64_image}",
+                            "detail": "high",
+                        },
+                    },
+                ],
+            }],
+            max_tokens=1000,
+        )
+
+        print("Chat Completions Output:\n", result)
+        return result
+    except Exception as e:
+        print(f"Error analyzing image with OpenAI Vision API: {e}")
+        return None
+
+def parse_plaintext_to_dataframe(text):
+    # Use regex to find lines with pattern: "- <invoice>: $<amount>"
+    pattern = r"-\s*(\d+):\s*\$(.*)"
+    entries = re.findall(pattern, text)
+    
+    # Build list of dictionaries from entries
+    data = []
+    for invoice, amount in entries:
+        data.append({"invoice #": int(invoice), "net invoice amount": amount.strip()})
+    
+    # Create DataFrame
+    df = pd.DataFrame(data, columns=["invoice #", "net invoice amount"])
+    return df
+
+def confirm_payments(df, conn, tolerance_cents=PAYMENT_TOLERANCE_CENTS):
+    """
+    Check each payment line against the invoices with a nearby amount.
+
+    Candidates come from a sorted amount index of the invoices table, so each
+    payment costs a binary search instead of a scan of every invoice.
+    Adds a "status" column (confirmed / amount mismatch / not found) and an
+    "amount matches" column listing the invoice numbers within tolerance.
+    """
+    index = load_amount_index(conn)
+    payment_cents = [parse_amount_cents(amount) for amount in df["net invoice amount"]]
+    candidate_ids = [
+        index.within(cents, tolerance_cents).tolist() if cents is not None else []
+        for cents in payment_cents
+    ]
+    invoices = get_invoices_by_id(conn, {row_id for ids in candidate_ids for row_id in ids})
+
+    statuses = []
+    amount_matches = []
+    for invoice, ids in zip(df["invoice #"], candidate_ids):
+        numbers = [invoices[row_id][0] for row_id in ids if row_id in invoices]
+        # Invoice numbers are stored with vendor suffixes, e.g. 112401-M
+        paid = str(int(invoice)) if pd.notna(invoice) else ""
+        if paid and any(str(number).split("-")[0] == paid for number in numbers):
+            statuses.append("confirmed")
+        elif numbers:
+            statuses.append("amount mismatch")
+        else:
+            statuses.append("not found")
+        amount_matches.append(", ".join(str(number) for number in numbers))
+
+    df["status"] = statuses
+    df["amount matches"] = amount_matches
+    return df
+
+
+
+if __name__ == "__main__":
+    # Run the invoice processing to create the cropped image
+    cropped_image_path = process_invoice()
+
+    # Verify that the cropped image was created
+    if not os.path.exists(cropped_image_path):
+        print(f"Input file does not exist: {cropped_image_path}")
+    else:
+        analysis_result = analyze_image_with_openai(cropped_image_path)
+
+        if analysis_result:
+            try:
+                data = json.loads(analysis_result)
+                df = pd.DataFrame(data, columns=["invoice #", "net invoice amount"])
+            except json.JSONDecodeError:
+                df = parse_plaintext_to_dataframe(analysis_result)
+
+            if df is not None and not df.empty:
+                df["invoice #"] = pd.to_numeric(df["invoice #"], errors='coerce')
+                df = df.sort_values(by="invoice #")
+                df.set_index("invoice #", inplace=True)
+                full_range = range(int(df.index.min()), int(df.index.max()) + 1)
+                df = df.reindex(full_range)
+                df.reset_index(inplace=True)
+                df.rename(columns={"index": "invoice #"}, inplace=True)
+                df["net invoice amount"] = df["net invoice amount"].fillna("")
+
+                df = confirm_payments(df, get_connection())
+                close_connection()
+
+                print(df)
+                df.to_csv("output.csv", index=False)
+                print("Saved analysis to output.csv")
+            else:
+                print("No data was parsed into a DataFrame.")
@@ -11,6 +11,7 @@ import invoice
 import fitz  # PyMuPDF
 import logging
 import win32com.client as win32
+from utils.llm_cache import cached_chat_completion
 from pdf_to_docx import PDFConverter
 
 
@@ -107,14 +108,16 @@ def process_selected_word_document(file_path):
 
 
 def get_gpt_response(user_input):
-    response = client.chat.completions.create(
+    # Identical table prompts are answered from the persistent LLM cache
+    content = cached_chat_completion(
+        client, "select_word.extract_data_with_openai",
         model="gpt-4o",
         messages=[
             {"role": "system", "content": "You are here to help extract data from tables."},
             {"role": "user", "content": user_input}
         ]
     )
-    return response.choices[0].message.content.strip()
+    return content.strip()
 
 def extract_data_with_openai(table_data):
     prompt = (
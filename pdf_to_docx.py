@@ -23,6 +23,7 @@ from adobe.pdfservices.operation.pdfjobs.result.create_pdf_result import CreateP
 from openai import OpenAI
 from PyQt5.QtWidgets import QFileDialog, QApplication, QMessageBox
 import win32com.client as win32
+from utils.llm_cache import cached_chat_completion
 
 logging.basicConfig(level=logging.INFO)
 
@@ -138,14 +139,16 @@ def read_word_file(docx_path):
 
 def get_gpt_response(user_input):
     client = OpenAI()
-    response = client.chat.completions.create(
+    # Identical table prompts are answered from the persistent LLM cache
+    content = cached_chat_completion(
+        client, "pdf_to_docx.extract_data_with_openai",
         model="gpt-4o",
         messages=[
             {"role": "system", "content": "You are here to help extract data from tables."},
             {"role": "user", "content": user_input}
         ]
     )
-    return response.choices[0].message.content.strip()
+    return content.strip()
 
 def extract_data_with_openai(table_data):
     prompt = (
@@ -12,6 +12,7 @@ import fitz  # PyMuPDF
 from pdf_to_docx import PDFConverter
 import logging
 import win32com.client as win32
+from utils.llm_cache import cached_chat_completion
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -86,14 +87,16 @@ def read_word_file(docx_path):
     return table_data
 
 def get_gpt_response(user_input):
-    response = client.chat.completions.create(
+    # Identical table prompts are answered from the persistent LLM cache
+    content = cached_chat_completion(
+        client, "process_document.extract_data_with_openai",
         model="gpt-4o",
         messages=[
             {"role": "system", "content": "You are here to help extract data from tables."},
             {"role": "user", "content": user_input}
         ]
     )
-    return response.choices[0].message.content.strip()
+    return content.strip()
 
 def extract_data_with_openai(table_data):
     prompt = (
@@ -15,6 +15,7 @@ import dspy
 import invoice  # Ensure your invoice template module is imported
 
 from pdf_to_docx_ import PDFConverter
+from utils.llm_cache import CachedPredictor
 
 load_dotenv()
 logging.basicConfig(level=logging.DEBUG)
@@ -38,7 +39,8 @@ def get_user_date():
 desired_date_format = get_user_date()
 
 # Configure DSPy with your OpenAI API key
-dspy.configure(lm=dspy.LM('openai/gpt-4o'))
+LLM_MODEL = 'openai/gpt-4o'
+dspy.configure(lm=dspy.LM(LLM_MODEL))
 
 
 def refine_city_name(market):
@@ -66,7 +68,9 @@ class ExtractInvoiceInfo(dspy.Signature):
 
 
 # Initialize the DSPy prediction module for extracting invoice info
-invoice_extractor = dspy.Predict(ExtractInvoiceInfo)
+invoice_extractor = CachedPredictor(
+    dspy.Predict(ExtractInvoiceInfo), "testing_invoice_extractor", LLM_MODEL, outputs=("invoices",)
+)
 
 
 
@@ -77,7 +81,7 @@ class ExtractCityOnly(dspy.Signature):
     text: str = dspy.InputField()
     city: str = dspy.OutputField(desc="City name extracted from market field")
 
-city_extractor = dspy.Predict(ExtractCityOnly)
+city_extractor = CachedPredictor(dspy.Predict(ExtractCityOnly), "city_extractor", LLM_MODEL, outputs=("city",))
 
 
 
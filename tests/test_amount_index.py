@@ -0,0 +1,54 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.invoice_queries import load_amount_index
+from database.migrations import migrate
+from utils.amount_index import AmountIndex
+
+
+class TestAmountIndex(unittest.TestCase):
+
+    def test_range_queries(self):
+        index = AmountIndex([500, 100, None, 300, 300, 1000], ids=[10, 11, 12, 13, 14, 15])
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.between(100, 300).tolist(), [11, 13, 14])
+        self.assertEqual(index.within(400, 100).tolist(), [13, 14, 10])
+        self.assertEqual(index.within(700, 50).tolist(), [])
+        self.assertEqual(index.within(-5, 0).tolist(), [])
+
+    def test_vectorized_bounds(self):
+        index = AmountIndex.from_records([{"amount": "$3.00"}, {"amount": "$1.00"}, {"amount": "bad"}])
+        starts, ends = index.bounds([0, 250, 1000], [150, 300, 2000])
+        ranges = [index.ids[start:end].tolist() for start, end in zip(starts, ends)]
+        self.assertEqual(ranges, [[1], [0], []])
+
+    def test_empty_index(self):
+        index = AmountIndex([])
+        self.assertEqual(index.within(100, 100).tolist(), [])
+
+    def test_load_from_database(self):
+        tmp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(tmp_dir, "invoice.db")
+        try:
+            migrate(db_path)
+            conn = get_connection(db_path)
+            conn.executemany(
+                "INSERT INTO invoices (batch_id, invoice_no, amount_cents) VALUES (?, ?, ?)",
+                [("20240301_090000", "1", 100300), ("20240301_090000", "2", None), ("20240401_090000", "3", 100250)]
+            )
+            self.assertEqual(load_amount_index(conn).within(100280, 50).tolist(), [3, 1])
+            self.assertEqual(load_amount_index(conn, "20240301_090000").within(100280, 50).tolist(), [1])
+        finally:
+            close_connection(db_path)
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.amounts import parse_amount_cents
+
+
+class TestParseAmountCents(unittest.TestCase):
+
+    def test_amount_formats(self):
+        self.assertEqual(parse_amount_cents("$1,234.56"), 123456)
+        self.assertEqual(parse_amount_cents("1234.5"), 123450)
+        self.assertEqual(parse_amount_cents(99), 9900)
+        self.assertEqual(parse_amount_cents(0.1 + 0.2), 30)
+        self.assertEqual(parse_amount_cents("($12.00)"), -1200)
+        self.assertEqual(parse_amount_cents("2.675"), 268)
+
+    def test_not_an_amount(self):
+        for value in (None, "", "$", "N/A", "nan", True):
+            self.assertIsNone(parse_amount_cents(value), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import migrate
+from database.archive import archive_batches, attach_history, detach_history, find_closed_batches, list_archives
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        migrate(self.db_path)
+        self.conn = get_connection(self.db_path)
+        self.conn.executemany(
+            "INSERT INTO invoices (batch_id, invoice_no, vendor) VALUES (?, ?, ?)",
+            [
+                ("20231115_090000", "112535", "FEE INVOICE"),
+                ("20240301_090000", "112536-M", "Matrix Media"),
+                ("20240301_090000", "112537-M", "Matrix Media"),
+                ("20240601_090000", "112538", "FEE INVOICE"),
+            ]
+        )
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def count(self, table="invoices"):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_closed_batches_exclude_recent_and_latest(self):
+        closed = find_closed_batches(self.conn, keep_days=90, today=datetime.date(2024, 7, 1))
+        self.assertEqual(closed, ["20231115_090000", "20240301_090000"])
+
+        # Even when everything is old, the latest batch stays
+        closed = find_closed_batches(self.conn, keep_days=0, today=datetime.date(2030, 1, 1))
+        self.assertNotIn("20240601_090000", closed)
+
+    def test_archive_and_history_view(self):
+        moved = archive_batches(["20231115_090000", "20240301_090000"], db_path=self.db_path)
+        self.assertEqual(moved, {"2023": 1, "2024": 2})
+        self.assertEqual(sorted(list_archives(self.db_path)), ["2023", "2024"])
+        self.assertEqual(self.count(), 1)
+
+        view = attach_history(self.conn, db_path=self.db_path)
+        self.assertEqual(self.count(view), 4)
+        ids = [row[0] for row in self.conn.execute(f"SELECT id FROM {view} ORDER BY id")]
+        self.assertEqual(ids, [1, 2, 3, 4])
+        detach_history(self.conn)
+
+        # Archiving the same batches again moves nothing and duplicates nothing
+        self.assertEqual(archive_batches(["20240301_090000"], db_path=self.db_path), {"2024": 0})
+        view = attach_history(self.conn, db_path=self.db_path)
+        self.assertEqual(self.count(view), 4)
+        detach_history(self.conn)
+
+    def test_latest_batch_is_never_archived(self):
+        moved = archive_batches(["20240301_090000", "20240601_090000"], db_path=self.db_path)
+        self.assertEqual(moved, {"2024": 2})
+        self.assertEqual(
+            self.conn.execute("SELECT DISTINCT batch_id FROM invoices ORDER BY batch_id").fetchall(),
+            [("20231115_090000",), ("20240601_090000",)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
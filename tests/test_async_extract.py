@@ -0,0 +1,134 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.async_extract import AdaptiveLimiter, extract_all, extract_many, is_rate_limited, retry_after_seconds
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class TestRateLimitDetection(unittest.TestCase):
+
+    def test_is_rate_limited(self):
+        self.assertTrue(is_rate_limited(RateLimitError("slow down")))
+        error = Exception("too many requests")
+        error.response = type("Response", (), {"status_code": 429})()
+        self.assertTrue(is_rate_limited(error))
+        self.assertFalse(is_rate_limited(ValueError("bad input")))
+
+    def test_retry_after(self):
+        error = RateLimitError()
+        error.response = FakeResponse({"retry-after": "2"})
+        self.assertEqual(retry_after_seconds(error), 2.0)
+        self.assertIsNone(retry_after_seconds(RateLimitError()))
+
+
+class TestExtractMany(unittest.TestCase):
+
+    def test_results_in_input_order(self):
+        async def extract(item):
+            # Later items finish first
+            await asyncio.sleep(0.001 * (20 - item))
+            return item * 10
+
+        self.assertEqual(asyncio.run(extract_many(range(20), extract, concurrency=5)), [i * 10 for i in range(20)])
+
+    def test_concurrency_cap_and_throughput(self):
+        in_flight = 0
+        peak = 0
+
+        async def extract(item):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return item
+
+        start = time.perf_counter()
+        results = asyncio.run(extract_many(list(range(20)), extract, concurrency=10))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(results, list(range(20)))
+        self.assertEqual(peak, 10)
+        # Two round trips instead of twenty
+        self.assertLess(elapsed, 0.5)
+
+    def test_blocking_function_runs_in_threads(self):
+        threads = set()
+
+        def extract(item):
+            threads.add(threading.get_ident())
+            time.sleep(0.02)
+            return item.upper()
+
+        self.assertEqual(extract_all(["a", "b", "c", "d"], extract, concurrency=4), ["A", "B", "C", "D"])
+        self.assertGreater(len(threads), 1)
+
+    def test_rate_limit_backoff_and_retry(self):
+        calls = {}
+        limiter = AdaptiveLimiter(8, base_backoff=0.01, max_backoff=0.05)
+
+        async def extract(item):
+            calls[item] = calls.get(item, 0) + 1
+            await asyncio.sleep(0.001)
+            # Half of the first burst of requests is rate limited
+            if calls[item] == 1 and item < 8 and item % 2 == 0:
+                raise RateLimitError("429 Too Many Requests")
+            return item
+
+        with self.assertLogs(level="WARNING") as logs:
+            results = asyncio.run(extract_many(list(range(16)), extract, limiter=limiter))
+        self.assertEqual(results, list(range(16)))
+        self.assertEqual(limiter.rate_limited, 4)
+        self.assertEqual([calls[item] for item in range(8)], [2, 1] * 4)
+        # The 429s of requests started together cut the limit once
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("concurrency lowered to 4", logs.output[0])
+
+    def test_limit_recovers_after_successes(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(4, base_backoff=0.001)
+            token = await limiter.acquire()
+            await limiter.release(token, rate_limited=True)
+            self.assertEqual(limiter.limit, 2)
+            for _ in range(10):
+                await limiter.release(await limiter.acquire())
+            return limiter.limit
+
+        self.assertEqual(asyncio.run(scenario()), 4)
+
+    def test_failures_are_none(self):
+        async def extract(item):
+            if item == 1:
+                raise ValueError("bad response")
+            return item
+
+        self.assertEqual(asyncio.run(extract_many([0, 1, 2], extract)), [0, None, 2])
+
+    def test_gives_up_after_max_retries(self):
+        async def extract(item):
+            raise RateLimitError()
+
+        limiter = AdaptiveLimiter(2, base_backoff=0.001, max_backoff=0.002)
+        self.assertEqual(asyncio.run(extract_many([0], extract, max_retries=2, limiter=limiter)), [None])
+        self.assertEqual(limiter.rate_limited, 3)
+
+    def test_empty(self):
+        self.assertEqual(extract_all([], lambda item: item), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.attachment_store import AttachmentStore, file_sha256, unique_files
+
+
+class TestAttachmentStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.incoming = os.path.join(self.tmp_dir, "incoming")
+        self.working = os.path.join(self.tmp_dir, "working")
+        os.makedirs(self.incoming)
+        self.store = AttachmentStore(os.path.join(self.tmp_dir, "store"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def incoming_file(self, name, data):
+        path = os.path.join(self.incoming, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_each_content_is_placed_once(self):
+        first = self.store.collect([self.incoming_file("invoice.pdf", b"A")], self.working)
+        second = self.store.collect(
+            [self.incoming_file("invoice copy.pdf", b"A"), self.incoming_file("invoice.pdf", b"B")],
+            self.working
+        )
+
+        self.assertEqual(first, [os.path.join(self.working, "invoice.pdf")])
+        self.assertEqual(second, [os.path.join(self.working, "invoice.pdf"), os.path.join(self.working, "invoice (2).pdf")])
+        self.assertEqual(sorted(os.listdir(self.working)), ["invoice (2).pdf", "invoice.pdf"])
+        self.assertEqual(self.store.duplicates, 1)
+        self.assertEqual(os.listdir(self.incoming), [])
+
+        # Blobs are addressed by content; the index maps names to the latest content
+        digest_b = self.store.digest_for("invoice.pdf")
+        self.assertIn(digest_b, self.store)
+        with open(self.store.blob_path(digest_b), "rb") as f:
+            self.assertEqual(f.read(), b"B")
+        self.assertEqual(self.store.digest_for("invoice copy.pdf"), file_sha256(first[0]))
+
+    def test_index_and_working_directory_survive_restart(self):
+        self.store.collect([self.incoming_file("invoice.pdf", b"A")], self.working)
+
+        store = AttachmentStore(self.store.root)
+        self.assertEqual(store.digest_for("invoice.pdf"), self.store.digest_for("invoice.pdf"))
+        store.collect([self.incoming_file("resent.pdf", b"A")], self.working)
+        self.assertEqual(os.listdir(self.working), ["invoice.pdf"])
+
+    def test_unique_files(self):
+        paths = [self.incoming_file(name, data) for name, data in (("a.pdf", b"1"), ("b.pdf", b"1"), ("c.pdf", b"2"))]
+        self.assertEqual([os.path.basename(p) for p in unique_files(paths)], ["a.pdf", "c.pdf"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection, transaction
+
+
+class TestConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        conn = get_connection(self.db_path)
+        conn.execute("CREATE TABLE invoices (id INTEGER PRIMARY KEY, invoice_no TEXT)")
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_connection_is_reused_per_thread_with_wal(self):
+        conn = get_connection(self.db_path)
+        self.assertIs(conn, get_connection(self.db_path))
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_connection(self.db_path)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+    def test_closed_connection_is_reopened(self):
+        conn = get_connection(self.db_path)
+        conn.close()
+        self.assertIsNot(get_connection(self.db_path), conn)
+
+    def test_transaction_commits_and_rolls_back(self):
+        with transaction(self.db_path) as conn:
+            conn.execute("INSERT INTO invoices (invoice_no) VALUES ('112535')")
+
+        with self.assertRaises(RuntimeError):
+            with transaction(self.db_path) as conn:
+                conn.execute("INSERT INTO invoices (invoice_no) VALUES ('112536')")
+                raise RuntimeError("boom")
+
+        rows = get_connection(self.db_path).execute("SELECT invoice_no FROM invoices").fetchall()
+        self.assertEqual(rows, [("112535",)])
+
+    def test_nested_transaction_uses_savepoint(self):
+        with transaction(self.db_path) as conn:
+            conn.execute("INSERT INTO invoices (invoice_no) VALUES ('1')")
+            with self.assertRaises(ValueError):
+                with transaction(self.db_path) as inner:
+                    inner.execute("INSERT INTO invoices (invoice_no) VALUES ('2')")
+                    raise ValueError
+        rows = get_connection(self.db_path).execute("SELECT invoice_no FROM invoices").fetchall()
+        self.assertEqual(rows, [("1",)])
+
+    def test_reader_is_not_blocked_by_open_write_transaction(self):
+        result = []
+
+        def read():
+            conn = get_connection(self.db_path)
+            result.append(conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0])
+            close_connection(self.db_path)
+
+        with transaction(self.db_path, immediate=True) as conn:
+            conn.execute("INSERT INTO invoices (invoice_no) VALUES ('112535')")
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(timeout=2)
+
+        self.assertEqual(result, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
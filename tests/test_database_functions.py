@@ -0,0 +1,115 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.database_functions import insert_invoices, normalize_invoice_items
+from database.invoice_sequence import DEFAULT_START
+from database.migrations import migrate
+
+
+class TestNormalizeInvoiceItems(unittest.TestCase):
+
+    def test_matrix_media_markets_are_canonicalized(self):
+        items = [("Ft. Payne - Hwy 35", "$100.00"), (" Dothan ", "$50.00", "JAN 2024")]
+        self.assertEqual(normalize_invoice_items(items, "Matrix Media"), [
+            ("Fort Payne", "$100.00"),
+            ("Dothan", "$50.00", "JAN 2024", ""),
+        ])
+
+    def test_fee_descriptions_are_kept(self):
+        items = [("BILLBOARD DESIGN FOR FT PAYNE LOCATION", "450.00", "TTC-380"), ("Ft Payne", "10.00")]
+        self.assertEqual(normalize_invoice_items(items, "FEE INVOICES"), [
+            ("BILLBOARD DESIGN FOR FT PAYNE LOCATION", "450.00", "TTC-380", ""),
+            ("Fort Payne", "10.00"),
+        ])
+
+
+
+class TestInsertInvoices(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        migrate(self.db_path)
+        self.conn = get_connection(self.db_path)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def stored(self):
+        return self.conn.execute(
+            "SELECT invoice_no, market, amount, amount_cents, job_number, description FROM invoices ORDER BY id"
+        ).fetchall()
+
+    def test_numbering_and_job_number_lookup(self):
+        enhanced = insert_invoices(
+            self.cursor,
+            [("RADIO SPOT", "1,250.00", "TTC 380"), ("BILLBOARD DESIGN", "$450", "")],
+            "batch_1", "FEE INVOICES"
+        )
+        # Sorted by description, numbered from one contiguous block
+        self.assertEqual([(item[0], item[2]) for item in enhanced], [
+            ("BILLBOARD DESIGN", str(DEFAULT_START)),
+            ("RADIO SPOT", str(DEFAULT_START + 1)),
+        ])
+        self.assertEqual(self.stored(), [
+            (str(DEFAULT_START), "BILLBOARD DESIGN", "$450.00", 45000, "", ""),
+            (str(DEFAULT_START + 1), "RADIO SPOT", "$1,250.00", 125000, "TTC-380", ""),
+        ])
+
+        # The next call continues the sequence, with the vendor's suffix
+        enhanced = insert_invoices(self.cursor, [("Dothan", "$50")], "batch_1", "Matrix Media")
+        self.assertEqual(enhanced[0][2], f"{DEFAULT_START + 2}-M")
+
+    def test_fort_payne_shares_one_number_per_batch(self):
+        period = "01/01/24-01/31/24"
+        enhanced = insert_invoices(
+            self.cursor,
+            [("Ft. Payne", "$100.00", period, ""), ("Dothan", "$50", period, ""),
+             ("Fort Payne - Hwy 35", "$25.5", period, "")],
+            "batch_1", "Matrix Media"
+        )
+        numbers = {item[0]: item[2] for item in enhanced}
+        self.assertEqual([item[0] for item in enhanced], ["Dothan", "Fort Payne", "Fort Payne"])
+        self.assertEqual(enhanced[1][2], enhanced[2][2])
+        self.assertNotEqual(numbers["Dothan"], numbers["Fort Payne"])
+
+        # A later Matrix Media call in the same batch reuses the number; another batch does not
+        again = insert_invoices(self.cursor, [("Ft Payne", "$10")], "batch_1", "Matrix Media")
+        self.assertEqual(again[0][2], numbers["Fort Payne"])
+        other_batch = insert_invoices(self.cursor, [("Ft Payne", "$10")], "batch_2", "Matrix Media")
+        self.assertEqual(other_batch[0][2], f"{DEFAULT_START + 2}-M")
+
+    def test_job_number_moved_out_of_stored_description(self):
+        insert_invoices(
+            self.cursor, [("Ft. Payne", "$100.00", "01/01/24-01/31/24", "Install TTC 350 banner")],
+            "batch_1", "Matrix Media"
+        )
+        self.assertEqual(self.stored(), [
+            (f"{DEFAULT_START}-M", "Fort Payne", "$100.00", 10000, "TTC-350", "Install banner"),
+        ])
+
+    def test_fee_description_is_not_filed_under_a_market(self):
+        insert_invoices(self.cursor, [("Ft. Payne", "$100.00")], "batch_1", "Matrix Media")
+        insert_invoices(self.cursor, [("BILLBOARD DESIGN FOR FT PAYNE LOCATION", "450.00", "")],
+                        "batch_1", "FEE INVOICES")
+        rows = self.conn.execute("SELECT market, market_id FROM invoices ORDER BY id").fetchall()
+        self.assertEqual(rows[1], ("BILLBOARD DESIGN FOR FT PAYNE LOCATION", None))
+        self.assertIsNotNone(rows[0][1])
+
+    def test_fee_descriptions_are_not_stored_as_markets(self):
+        insert_invoices(self.cursor, [("PRINT AD", "$50.00", "")], "batch_1", "FEE INVOICES")
+        self.assertEqual(self.conn.execute("SELECT market_id FROM invoices").fetchall(), [(None,)])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM markets WHERE name = 'PRINT AD'").fetchone(), (0,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.email_text import estimate_tokens, log_payload_reduction, minimize_email, segment_email
+from utils.fee_email import parse_fee_email
+
+
+class TestMinimizeEmail(unittest.TestCase):
+
+    def test_reply_signature_and_disclaimer_removed(self):
+        text = (
+            "Hi Sam,\n"
+            "\n"
+            "Please bill the following:\n"
+            "- Radio spot production - $1,250.00 - Job: TTC-380\n"
+            "- Billboard design: $450 (Job #212)\n"
+            "\n"
+            "Thanks,\n"
+            "Pat Jones\n"
+            "Account Manager | 555-0100\n"
+            "\n"
+            "CONFIDENTIALITY NOTICE: This message is intended only for the named recipient.\n"
+            "\n"
+            "Sent from my iPhone\n"
+            "\n"
+            "On Mon, Mar 4, 2024 at 9:00 AM Sam <sam@example.com> wrote:\n"
+            "> Old item $99.00\n"
+            "> Another old item $10.00\n"
+        )
+        cleaned, stats = minimize_email(text)
+        self.assertEqual(cleaned, (
+            "Hi Sam,\n"
+            "\n"
+            "Please bill the following:\n"
+            "- Radio spot production - $1,250.00 - Job: TTC-380\n"
+            "- Billboard design: $450 (Job #212)"
+        ))
+        self.assertLess(stats["tokens_after"], stats["tokens_before"])
+        self.assertEqual(stats["chars_after"], len(cleaned))
+        # The cleaned body is a standard fee email for the rules
+        invoices, problems = parse_fee_email(cleaned)
+        self.assertEqual(problems, [])
+        self.assertEqual([invoice["JobNumber"] for invoice in invoices], ["TTC-380", "212"])
+
+    def test_outlook_history_removed(self):
+        text = (
+            "Invoice for March: Billboard rental $900.00\n"
+            "________________________________\n"
+            "From: Sam <sam@example.com>\n"
+            "Sent: Monday, March 4, 2024 9:00 AM\n"
+            "Subject: RE: March\n"
+            "Can you send the March invoice?\n"
+        )
+        self.assertEqual(minimize_email(text)[0], "Invoice for March: Billboard rental $900.00")
+
+        without_rule = text.replace("________________________________\n", "")
+        self.assertEqual(minimize_email(without_rule)[0], "Invoice for March: Billboard rental $900.00")
+
+    def test_quoted_section_with_invoices_kept(self):
+        text = (
+            "Please bill this one.\n"
+            "-----Original Message-----\n"
+            "From: Vendor <billing@vendor.example>\n"
+            "Sent: Monday, March 4, 2024 9:00 AM\n"
+            "Subject: March\n"
+            "\n"
+            "Billboard rental $800.00\n"
+        )
+        self.assertEqual(minimize_email(text)[0], "Please bill this one.\n\nBillboard rental $800.00")
+
+    def test_forwarded_invoice_kept(self):
+        text = (
+            "FYI see below\n"
+            "\n"
+            "Thanks,\n"
+            "Sam\n"
+            "\n"
+            "---------- Forwarded message ---------\n"
+            "From: Vendor <billing@vendor.example>\n"
+            "Date: Mon, Mar 4, 2024 at 9:00 AM\n"
+            "Subject: Invoice 1042\n"
+            "To: <billing@example.com>\n"
+            "\n"
+            "Job: 12345\n"
+            "Billboard design $450.00\n"
+            "\n"
+            "Regards,\n"
+            "Vendor Billing\n"
+        )
+        self.assertEqual(minimize_email(text)[0], "FYI see below\n\nJob: 12345\nBillboard design $450.00")
+
+    def test_html_leftovers(self):
+        text = (
+            "<html><head><style>p { color: red; }</style></head><body>"
+            "<p>Radio&nbsp;spot &amp; jingle: <b>$300.00</b></p>"
+            "<table><tr><td>Print ad</td><td>$120.00</td></tr></table>"
+            "</body></html>"
+        )
+        cleaned, _ = minimize_email(text)
+        self.assertEqual(cleaned, "Radio spot & jingle: $300.00\nPrint ad $120.00")
+
+    def test_sign_off_kept_when_invoices_follow(self):
+        text = "Thanks for the quick turnaround!\n\nRadio spot $50.00\n"
+        self.assertEqual(minimize_email(text)[0], "Thanks for the quick turnaround!\n\nRadio spot $50.00")
+
+    def test_empty_body(self):
+        self.assertEqual(minimize_email(None), ("", {
+            "chars_before": 0, "chars_after": 0, "tokens_before": 0, "tokens_after": 0,
+        }))
+
+
+class TestSegmentEmail(unittest.TestCase):
+
+    def test_short_email_is_one_segment(self):
+        self.assertEqual(segment_email("Radio spot $50.00", max_chars=100), ["Radio spot $50.00"])
+
+    def test_long_email_keeps_invoice_paragraphs(self):
+        chatter = "We loved the campaign and the board meeting went well. " * 3
+        paragraphs = []
+        for index in range(6):
+            paragraphs.append(chatter)
+            paragraphs.append(f"Item {index} production - ${index + 1}00.00 - Job: TTC-{index}")
+        segments = segment_email("\n\n".join(paragraphs), max_chars=120)
+
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(len(segment) <= 120 for segment in segments))
+        joined = "\n\n".join(segments)
+        self.assertNotIn("campaign", joined)
+        self.assertEqual(
+            [line for line in joined.split("\n") if line],
+            [f"Item {index} production - ${index + 1}00.00 - Job: TTC-{index}" for index in range(6)]
+        )
+
+    def test_long_paragraph_split_between_lines(self):
+        lines = [f"Spot {index} $10.00" for index in range(20)]
+        segments = segment_email("\n".join(lines), max_chars=60)
+        self.assertTrue(all(len(segment) <= 60 for segment in segments))
+        self.assertEqual("\n".join(segments).replace("\n\n", "\n").split("\n"), lines)
+
+    def test_no_invoice_paragraph_returns_text(self):
+        text = "Just checking in about next month. " * 10
+        self.assertEqual(segment_email(text, max_chars=50), [text])
+
+
+class TestPayloadLog(unittest.TestCase):
+
+    def test_reduction_written_to_performance_log(self):
+        self.assertEqual(estimate_tokens("abcdefghi"), 3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats = {"chars_before": 4000, "chars_after": 1000, "tokens_before": 1000, "tokens_after": 250}
+            log_payload_reduction("march.eml", stats, output_dir=temp_dir)
+            with open(os.path.join(temp_dir, "performance.log")) as f:
+                line = f.read()
+        self.assertTrue(line.startswith("PERF: "))
+        self.assertIn("march.eml | Tokens: 1000 -> 250 (-75%) | Chars: 4000 -> 1000", line)
+
+
+if __name__ == '__main__':
+    unittest.main()
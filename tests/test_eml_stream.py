@@ -0,0 +1,118 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.eml_stream import ingest_eml
+
+
+class TestEmlStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.attachment_dir = os.path.join(self.tmp_dir, "attachments")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_eml(self, msg):
+        path = os.path.join(self.tmp_dir, "message.eml")
+        with open(path, "wb") as f:
+            f.write(msg.as_bytes(policy=policy.default.clone(linesep="\r\n")))
+        return path
+
+    def test_body_and_attachments_match_email_package(self):
+        pdf = os.urandom(300000)
+        msg = EmailMessage()
+        msg["Subject"] = "Fee invoices"
+        msg.set_content("Install at Dothan – $1,003.00\nJob: TTC-380\n", cte="quoted-printable")
+        msg.add_alternative("<p>Install at Dothan</p>", subtype="html")
+        msg.add_attachment(pdf, maintype="application", subtype="pdf", filename="Matrix Media.pdf")
+        msg.add_attachment(b"a,b\r\n1,2", maintype="text", subtype="csv", filename="../rates.csv")
+        path = self.write_eml(msg)
+
+        result = ingest_eml(path, self.attachment_dir)
+
+        with open(path, "rb") as f:
+            expected = BytesParser(policy=policy.default).parse(f)
+        self.assertEqual(result["subject"], "Fee invoices")
+        self.assertEqual(result["body"], expected.get_body(("plain",)).get_content())
+        self.assertEqual(
+            [os.path.basename(p) for p in result["attachments"]], ["Matrix Media.pdf", "rates.csv"]
+        )
+        with open(result["attachments"][0], "rb") as f:
+            self.assertEqual(f.read(), pdf)
+        with open(result["attachments"][1], "rb") as f:
+            self.assertEqual(f.read(), b"a,b\r\n1,2")
+        self.assertEqual(sorted(os.listdir(self.attachment_dir)), ["Matrix Media.pdf", "rates.csv"])
+
+    def test_single_part_message(self):
+        msg = EmailMessage()
+        msg["Subject"] = "Plain"
+        msg.set_content("Banner at Albany $450.00\n")
+        result = ingest_eml(self.write_eml(msg), self.attachment_dir)
+        self.assertEqual(result["body"], "Banner at Albany $450.00\n")
+        self.assertEqual(result["attachments"], [])
+
+    def test_attachments_of_forwarded_email(self):
+        inner = EmailMessage()
+        inner["Subject"] = "Invoice 1042"
+        inner.set_content("Billboard design $450.00\n")
+        inner.add_attachment(b"%PDF-1.4 inner", maintype="application", subtype="pdf", filename="inv.pdf")
+        msg = EmailMessage()
+        msg["Subject"] = "Fwd: Invoice 1042"
+        msg.set_content("See the forwarded invoice.\n")
+        msg.add_attachment(inner, filename="forwarded.eml")
+        msg.add_attachment(b"%PDF-1.4 outer", maintype="application", subtype="pdf", filename="outer.pdf")
+        path = self.write_eml(msg)
+
+        result = ingest_eml(path, self.attachment_dir)
+
+        with open(path, "rb") as f:
+            expected = BytesParser(policy=policy.default).parse(f)
+        expected_names = [part.get_filename() for part in expected.walk()
+                          if part.get_content_disposition() == "attachment" and part.get_content_maintype() != "message"]
+        self.assertEqual(expected_names, ["inv.pdf", "outer.pdf"])
+        self.assertEqual([os.path.basename(p) for p in result["attachments"]], expected_names)
+        with open(result["attachments"][0], "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 inner")
+        with open(result["attachments"][1], "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 outer")
+        self.assertEqual(result["body"], "See the forwarded invoice.\n")
+
+    def test_corrupt_attachments_keep_the_message(self):
+        parts = []
+        for filename, encoded in (("bad.pdf", b"JVBE\r\nRi0x\r\nQU=D\r\nQUJD"), ("cut.pdf", b"JVBERi0x\r\nX")):
+            parts.append(
+                b"Content-Type: application/pdf\r\nContent-Transfer-Encoding: base64\r\n"
+                b"Content-Disposition: attachment; filename=\"" + filename.encode() + b"\"\r\n\r\n" + encoded
+            )
+        parts.append(b"Content-Type: text/plain; charset=utf-8\r\n\r\nBillboard design $450.00")
+        raw = (b"Subject: Invoice\r\nMIME-Version: 1.0\r\nContent-Type: multipart/mixed; boundary=\"XX\"\r\n\r\n"
+               + b"".join(b"--XX\r\n" + part + b"\r\n" for part in parts) + b"--XX--\r\n")
+        path = os.path.join(self.tmp_dir, "message.eml")
+        with open(path, "wb") as f:
+            f.write(raw)
+
+        with self.assertLogs(level="WARNING"):
+            result = ingest_eml(path, self.attachment_dir)
+
+        self.assertEqual(result["body"], "Billboard design $450.00")
+        contents = []
+        for attachment in result["attachments"]:
+            with open(attachment, "rb") as f:
+                contents.append(f.read())
+        # Decoded up to the bad group; a lone final character holds no whole byte
+        self.assertEqual(contents, [b"%PDF-1", b"%PDF-1"])
+        self.assertEqual(sorted(os.listdir(self.attachment_dir)), ["bad.pdf", "cut.pdf"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.fee_email import parse_fee_email
+
+
+class TestFeeEmail(unittest.TestCase):
+
+    def test_standard_fee_email(self):
+        text = (
+            "Hi Sam,\n"
+            "\n"
+            "Please bill the following:\n"
+            "- Radio spot production - $1,250.00 - Job: TTC-380\n"
+            "- Billboard design: $450 (Job #212)\n"
+            "Rush fee $25.5\n"
+            "Total: $1,725.50\n"
+            "\n"
+            "Thanks,\nPat\n"
+            "> On Monday you wrote: old item $99.00\n"
+        )
+        invoices, problems = parse_fee_email(text)
+        self.assertEqual(problems, [])
+        self.assertEqual(invoices, [
+            {"Description": "Radio spot production", "Amount": "$1,250.00", "JobNumber": "TTC-380"},
+            {"Description": "Billboard design", "Amount": "$450.00", "JobNumber": "212"},
+            {"Description": "Rush fee", "Amount": "$25.50", "JobNumber": ""},
+        ])
+
+    def test_credit_lines_are_negative(self):
+        text = (
+            "Radio spot production - $1,250.00 - Job: TTC-380\n"
+            "Discount -$100.00 Job: TTC-381\n"
+            "Credit for overbilling - ($200.00) - Job: TTC-380\n"
+            "Total: $950.00\n"
+        )
+        invoices, problems = parse_fee_email(text)
+        self.assertEqual(problems, [])
+        self.assertEqual(invoices, [
+            {"Description": "Radio spot production", "Amount": "$1,250.00", "JobNumber": "TTC-380"},
+            {"Description": "Discount", "Amount": "-$100.00", "JobNumber": "TTC-381"},
+            {"Description": "Credit for overbilling", "Amount": "-$200.00", "JobNumber": "TTC-380"},
+        ])
+
+    def test_unrecognized_layouts_report_problems(self):
+        cases = {
+            "Radio spot $100.00 and design $200.00\n": "more than one amount",
+            "Radio spot production 1,250.00\n": "amount without a dollar sign",
+            "Radio spot production\nJob: TTC-380\n$1,250.00\n": "job number on a line without an amount",
+            "Radio spot $100.00\nDesign $200.00\nTotal $350.00\n": "email total is $350.00",
+            "See the attached invoice.\n": "no invoice lines found",
+        }
+        for text, problem in cases.items():
+            _, problems = parse_fee_email(text)
+            self.assertTrue(any(problem in found for found in problems), (text, problems))
+
+    def test_prose_with_one_amount_is_not_trusted(self):
+        cases = {
+            "Attached is the Matrix Media statement. The balance due is $4,500.00\n":
+                "reads like a sentence",
+            "Budget approved: $12,000\n": "no job numbers",
+            "Please pay the retainer balance $300.00 Job: TTC-1\n": "reads like a sentence",
+            "Billboard design $450.00 was approved by the client yesterday\n": "text after the amount",
+            (
+                "Hi Sam, hope the week is going well so far.\n"
+                "We met with the client about the spring campaign today.\n"
+                "They would like to move the launch to the first of April.\n"
+                "Let me know if the production schedule can handle that.\n"
+                "Radio spot production - $1,250.00 - Job: TTC-380\n"
+            ): "lines of prose",
+        }
+        for text, problem in cases.items():
+            _, problems = parse_fee_email(text)
+            self.assertTrue(any(problem in found for found in problems), (text, problems))
+
+    def test_minimum_share_of_invoice_lines(self):
+        text = "\n".join(["Hi Sam,", "Quick update", "Radio spot $50.00 Job: TTC-1", "Talk soon", "Pat", "555-0100",
+                          "Account Manager", "Acme Media", "Atlanta GA", "acme.example"])
+        _, problems = parse_fee_email(text)
+        self.assertIn("only 1 of 10 lines are invoice lines", problems)
+
+
+if __name__ == '__main__':
+    unittest.main()
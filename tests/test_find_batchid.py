@@ -0,0 +1,48 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import migrate
+from database.find_batchid_by_invoice_number import find_batches_for_invoices, read_invoice_numbers
+
+
+class TestFindBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        migrate(self.db_path)
+        self.conn = get_connection(self.db_path)
+        self.conn.executemany(
+            "INSERT INTO invoices (batch_id, invoice_no) VALUES (?, ?)",
+            [("20240101_090000", "112535"), ("20240101_090000", "112535"),
+             ("20240201_090000", "112535"), ("20240201_090000", "112536-M")]
+        )
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_bulk_lookup_beyond_variable_limit(self):
+        numbers = [str(n) for n in range(200000, 240000)] + ["112536-M", "112535", "112535"]
+        self.assertEqual(
+            find_batches_for_invoices(self.conn, numbers),
+            [("112535", "20240101_090000"), ("112535", "20240201_090000"), ("112536-M", "20240201_090000")]
+        )
+        # The temp table is emptied for the next lookup
+        self.assertEqual(find_batches_for_invoices(self.conn, ["112536-M"]), [("112536-M", "20240201_090000")])
+
+    def test_read_invoice_numbers(self):
+        stream = io.StringIO("112535, 112536-M\n\n112537;112538\t112539\n")
+        self.assertEqual(read_invoice_numbers(stream), ["112535", "112536-M", "112537", "112538", "112539"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import sqlite3
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.invoice_queries import (
+    get_latest_batch_id,
+    count_invoices_by_vendor,
+    iter_batch_invoices,
+)
+
+
+class TestInvoiceQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("""
+            CREATE TABLE invoices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT, invoice_no TEXT, vendor TEXT, amount TEXT, date TEXT,
+                market TEXT, service_period TEXT, description TEXT,
+                docx_file_path TEXT, job_number TEXT
+            )
+        """)
+        rows = [
+            ("20240101_090000", "112535", "FEE INVOICES", "$10.00", "AD", ""),
+            ("20240301_090000", "112540-M", "Matrix Media", "$200.00", "Dothan", ""),
+            ("20240301_090000", "112541", "FEE INVOICES", "$30.00", "PRINT", "TTC-380"),
+            ("20240301_090000", "112542-M", "Matrix Media", "$100.00", "Anniston", ""),
+            ("manual_batch", "1", "FEE INVOICES", "$1.00", "X", ""),
+        ]
+        self.conn.executemany(
+            "INSERT INTO invoices (batch_id, invoice_no, vendor, amount, market, job_number) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_latest_batch_ignores_malformed_ids(self):
+        self.assertEqual(get_latest_batch_id(self.conn), "20240301_090000")
+
+        self.conn.execute(
+            "INSERT INTO invoices (batch_id, vendor) VALUES ('20241399_000000', 'FEE INVOICES')"
+        )
+        self.assertEqual(get_latest_batch_id(self.conn), "20240301_090000")
+
+    def test_latest_batch_empty_table(self):
+        self.conn.execute("DELETE FROM invoices")
+        self.assertIsNone(get_latest_batch_id(self.conn))
+
+    def test_counts_and_rows_for_one_batch(self):
+        counts = count_invoices_by_vendor(self.conn, "20240301_090000")
+        self.assertEqual(counts, {"FEE INVOICES": 1, "Matrix Media": 2})
+
+        rows = list(iter_batch_invoices(self.conn, "20240301_090000", "Matrix Media"))
+        self.assertEqual([row[0] for row in rows], ["112540-M", "112542-M"])
+        self.assertEqual(len(rows[0]), 8)
+
+        fee_rows = list(iter_batch_invoices(self.conn, "20240301_090000", "FEE INVOICES"))
+        self.assertEqual(fee_rows[0][7], "TTC-380")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.invoice_sequence import reserve, DEFAULT_START
+from database.migrations import migrate
+
+
+class TestInvoiceSequence(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_blocks_are_contiguous(self):
+        self.assertEqual(reserve(3, db_path=self.db_path), range(DEFAULT_START, DEFAULT_START + 3))
+        self.assertEqual(reserve(0, db_path=self.db_path), range(DEFAULT_START + 3, DEFAULT_START + 3))
+        self.assertEqual(reserve(2, db_path=self.db_path), range(DEFAULT_START + 3, DEFAULT_START + 5))
+
+    def test_starts_after_highest_existing_invoice(self):
+        migrate(self.db_path)
+        conn = get_connection(self.db_path)
+        conn.executemany(
+            "INSERT INTO invoices (invoice_no) VALUES (?)",
+            [("112600-M",), ("112612",), ("112601-P",)]
+        )
+        self.assertEqual(reserve(1, db_path=self.db_path), range(112613, 112614))
+
+    def test_concurrent_writers_get_distinct_numbers(self):
+        reserved = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(20):
+                block = reserve(5, db_path=self.db_path)
+                with lock:
+                    reserved.extend(block)
+            close_connection(self.db_path)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(reserved), 400)
+        self.assertEqual(sorted(reserved), list(range(DEFAULT_START, DEFAULT_START + 400)))
+
+
+if __name__ == '__main__':
+    unittest.main()
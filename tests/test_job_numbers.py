@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.job_numbers import extract_job_number
+
+
+class TestJobNumbers(unittest.TestCase):
+
+    def test_labeled_job_number(self):
+        self.assertEqual(extract_job_number("PRINT AD JOB: TTC-380"), ("TTC-380", "PRINT AD"))
+        self.assertEqual(extract_job_number("Job; ttc 380 poster"), ("ttc 380", "poster"))
+
+    def test_labeled_takes_priority_over_earlier_bare_match(self):
+        # The bare "AB 12" comes first in the text but the labeled format wins
+        job_number, clean_desc = extract_job_number("AB 12 DESIGN JOB: TTC-380")
+        self.assertEqual(job_number, "TTC-380")
+        self.assertEqual(clean_desc, "AB 12 DESIGN")
+
+    def test_bare_job_number_removes_every_bare_match(self):
+        self.assertEqual(extract_job_number("TTC-380 RADIO FOR 2024"), ("TTC-380", "RADIO"))
+
+    def test_numeric_job_number(self):
+        self.assertEqual(extract_job_number("BILLBOARD Job #380"), ("380", "BILLBOARD"))
+
+    def test_parenthesized_fallback(self):
+        self.assertEqual(extract_job_number("DESIGN (JOB:-12) FEE"), ("-12", "DESIGN FEE"))
+
+    def test_no_job_number(self):
+        self.assertEqual(extract_job_number("  PRODUCTION   FEE "), ("", "PRODUCTION FEE"))
+        self.assertEqual(extract_job_number(""), ("", ""))
+        self.assertEqual(extract_job_number(None), ("", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
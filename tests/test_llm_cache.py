@@ -0,0 +1,97 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.llm_cache import CachedPredictor, LLMCache, cached_chat_completion
+
+
+class FakePredictor:
+    """Stands in for dspy.Predict: counts calls and echoes its input."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return SimpleNamespace(invoices=[{"Description": text.upper(), "Amount": "$1.00"}], extra="ignored")
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        content = request["messages"][-1]["content"][::-1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = LLMCache(os.path.join(self.tmp_dir, "llm_cache.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_predictor_responses_are_cached_per_input(self):
+        predictor = FakePredictor()
+        extractor = CachedPredictor(predictor, "invoice_extractor", "openai/gpt-4o", ("invoices",), cache=self.cache)
+
+        first = extractor(text="banner $1.00")
+        second = extractor(text="banner $1.00")
+        extractor(text="other email")
+
+        self.assertEqual(first.invoices, second.invoices)
+        self.assertFalse(hasattr(second, "extra"))
+        self.assertEqual(predictor.calls, 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["sites"]["invoice_extractor"]["hit_rate"], 0.333)
+
+    def test_chat_completion_key_covers_model_and_messages(self):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        messages = [{"role": "user", "content": "abc"}]
+        self.assertEqual(cached_chat_completion(client, "tables", cache=self.cache, model="gpt-4o", messages=messages), "cba")
+        cached_chat_completion(client, "tables", cache=self.cache, model="gpt-4o", messages=messages)
+        cached_chat_completion(client, "tables", cache=self.cache, model="gpt-4o-mini", messages=messages)
+        self.assertEqual(client.chat.completions.calls, 2)
+
+        # Persisted: a new cache object on the same file still has the entry
+        reopened = LLMCache(self.cache.path)
+        cached_chat_completion(client, "tables", cache=reopened, model="gpt-4o", messages=messages)
+        self.assertEqual(client.chat.completions.calls, 2)
+        reopened.close()
+
+    def test_ttl_and_size_bound(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "x" * 100
+
+        expired = LLMCache(self.cache.path, ttl_seconds=0)
+        expired.cached("site", "m", "p", 1, compute)
+        expired.cached("site", "m", "p", 1, compute)
+        self.assertEqual(len(calls), 2)
+        expired.close()
+
+        small = LLMCache(self.cache.path, max_bytes=250)
+        for inputs in range(5):
+            small.cached("site", "m", "p", inputs, compute)
+        stats = small.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["bytes"], 250)
+        small.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import shutil
+import mailbox
+import tempfile
+import unittest
+from email.message import EmailMessage
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.mailbox_ingest import ingest_mailbox
+
+
+def make_message(body, attachments):
+    msg = EmailMessage()
+    msg["From"] = "billing@example.com"
+    msg["Subject"] = body.split()[0]
+    msg.set_content(body)
+    for filename, data in attachments:
+        msg.add_attachment(data, maintype="application", subtype="pdf", filename=filename)
+    return msg
+
+
+class TestMailboxIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.attachment_dir = os.path.join(self.tmp_dir, "downloaded files email")
+        self.messages = [
+            make_message("First\nFrom the vendor: Dothan $1,003.00\n", [("Matrix Media.pdf", b"%PDF-1 same")]),
+            make_message("Second resend\n", [("Matrix Media copy.pdf", b"%PDF-1 same")]),
+            make_message("Third\n", [("Matrix Media.pdf", b"%PDF-1 different")]),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def working_files(self):
+        return sorted(
+            name for name in os.listdir(self.attachment_dir)
+            if os.path.isfile(os.path.join(self.attachment_dir, name))
+        )
+
+    def check_results(self, results):
+        self.assertEqual([result["subject"] for result in results], ["First", "Second", "Third"])
+        self.assertEqual(results[0]["body"], "First\nFrom the vendor: Dothan $1,003.00\n")
+        # The resent PDF points at the file saved for the first email
+        self.assertEqual(results[1]["attachments"], results[0]["attachments"])
+        self.assertEqual(self.working_files(), ["Matrix Media (2).pdf", "Matrix Media.pdf"])
+        with open(results[2]["attachments"][0], "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1 different")
+
+    def test_mbox(self):
+        path = os.path.join(self.tmp_dir, "inbox.mbox")
+        box = mailbox.mbox(path)
+        for msg in self.messages:
+            box.add(msg)
+        box.close()
+        results = ingest_mailbox(path, self.attachment_dir, workers=2)
+        self.check_results(results)
+        self.assertEqual([result["source"] for result in results], [f"{path}#{index}" for index in (1, 2, 3)])
+
+    def test_maildir_and_eml_folder(self):
+        box = mailbox.Maildir(os.path.join(self.tmp_dir, "Maildir"))
+        eml_dir = os.path.join(self.tmp_dir, "emails")
+        os.makedirs(eml_dir)
+        for index, msg in enumerate(self.messages):
+            box.add(msg)
+            with open(os.path.join(eml_dir, f"{index}.eml"), "wb") as f:
+                f.write(msg.as_bytes())
+
+        results = ingest_mailbox(eml_dir, self.attachment_dir, workers=2)
+        self.check_results(results)
+
+        # A second run finds everything already there
+        maildir_results = ingest_mailbox(os.path.join(self.tmp_dir, "Maildir"), self.attachment_dir, workers=1)
+        self.assertEqual(sorted(result["subject"] for result in maildir_results), ["First", "Second", "Third"])
+        self.assertEqual(len(self.working_files()), 2)
+
+    def test_single_message_without_eml_extension(self):
+        path = os.path.join(self.tmp_dir, "invoice.msg.txt")
+        with open(path, "wb") as f:
+            f.write(self.messages[0].as_bytes())
+        results = ingest_mailbox(path, self.attachment_dir, workers=1)
+        self.assertEqual([(result["subject"], result["source"]) for result in results], [("First", path)])
+        self.assertEqual(self.working_files(), ["Matrix Media.pdf"])
+
+        empty = os.path.join(self.tmp_dir, "empty.txt")
+        open(empty, "wb").close()
+        self.assertEqual([result["subject"] for result in ingest_mailbox(empty, self.attachment_dir, workers=1)],
+                         [None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.markets import canonical_market, is_fort_payne, market_key
+
+
+class TestMarkets(unittest.TestCase):
+
+    def test_fort_payne_spellings(self):
+        for name in ("Fort Payne", "Ft. Payne", "ft payne", " FT  PAYNE ", "FortPayne",
+                     "Ft.Payne", "Ft. Payne - Hwy 35", "Fort Payne/Rainsville"):
+            self.assertEqual(canonical_market(name), "Fort Payne", name)
+            self.assertTrue(is_fort_payne(name), name)
+
+    def test_other_markets_are_only_stripped(self):
+        self.assertEqual(canonical_market("  Dothan "), "Dothan")
+        self.assertEqual(canonical_market("Paynesville"), "Paynesville")
+        self.assertFalse(is_fort_payne("Fort Walton"))
+        self.assertFalse(is_fort_payne(""))
+        self.assertFalse(is_fort_payne(None))
+
+    def test_exact_match_only(self):
+        self.assertEqual(canonical_market("Ft. Payne", contains=False), "Fort Payne")
+        self.assertEqual(canonical_market(" BILLBOARD DESIGN FOR FT PAYNE LOCATION ", contains=False),
+                         "BILLBOARD DESIGN FOR FT PAYNE LOCATION")
+
+    def test_market_key(self):
+        self.assertEqual(market_key("Ft.  Payne"), "ft payne")
+        self.assertEqual(market_key(None), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import migrate, get_schema_version, SCHEMA_VERSION
+from utils.markets import MARKET_ALIASES
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        self.conn = get_connection(self.db_path)
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_new_database_is_created_at_current_version(self):
+        self.assertEqual(migrate(self.db_path), SCHEMA_VERSION)
+        self.assertEqual(get_schema_version(self.conn), SCHEMA_VERSION)
+
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"invoices", "invoice_sequence"} <= tables)
+
+        # Running again is a no-op
+        self.assertEqual(migrate(self.db_path), SCHEMA_VERSION)
+
+    def test_legacy_table_gets_job_number_and_keeps_rows(self):
+        self.conn.execute("""
+            CREATE TABLE invoices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT, invoice_no TEXT, vendor TEXT, amount TEXT, date TEXT,
+                market TEXT, service_period TEXT, description TEXT, docx_file_path TEXT
+            )
+        """)
+        self.conn.execute("INSERT INTO invoices (batch_id, invoice_no) VALUES ('20240101_090000', '112535')")
+
+        migrate(self.db_path)
+
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(invoices)")]
+        self.assertIn("job_number", columns)
+        self.assertEqual(self.conn.execute("SELECT invoice_no FROM invoices").fetchall(), [("112535",)])
+
+    def test_legacy_rows_are_backfilled_with_typed_columns(self):
+        self.conn.execute("""
+            CREATE TABLE invoices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT, invoice_no TEXT, vendor TEXT, amount TEXT, date TEXT,
+                market TEXT, service_period TEXT, description TEXT, docx_file_path TEXT
+            )
+        """)
+        self.conn.executemany(
+            "INSERT INTO invoices (invoice_no, vendor, amount, date, market) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("112535-M", "Matrix Media", "$1,234.56", "03/01/2024", "Ft. Payne"),
+                ("112536-M", "Matrix Media", "$20.00", "2024-03-01", "FT PAYNE"),
+                ("112537-M", "Matrix Media", "", "not a date", "Dothan"),
+                ("112538", "FEE INVOICES", "$450.00", "2024-03-01", "PRINT AD"),
+            ]
+        )
+
+        migrate(self.db_path)
+
+        rows = self.conn.execute(
+            "SELECT amount_cents, date, market_id FROM invoices ORDER BY id"
+        ).fetchall()
+        self.assertEqual([row[0] for row in rows], [123456, 2000, None, 45000])
+        self.assertEqual([row[1] for row in rows], ["2024-03-01", "2024-03-01", "not a date", "2024-03-01"])
+        self.assertEqual(rows[0][2], rows[1][2])
+        self.assertNotEqual(rows[0][2], rows[2][2])
+        # Fee descriptions are not markets
+        self.assertIsNone(rows[3][2])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM markets WHERE name = 'PRINT AD'").fetchone(), (0,))
+
+        fort_payne = self.conn.execute("SELECT name FROM markets WHERE id = ?", (rows[0][2],)).fetchone()
+        self.assertEqual(fort_payne, ("Fort Payne",))
+
+    def test_fee_descriptions_get_no_market(self):
+        migrate(self.db_path)
+        self.conn.execute("PRAGMA user_version = 4")
+        self.conn.executemany(
+            "INSERT INTO invoices (vendor, market) VALUES (?, ?)",
+            [("Matrix Media", "Ft. Payne - Hwy 35"), ("FEE INVOICES", "BILLBOARD DESIGN FOR FT PAYNE LOCATION")]
+        )
+
+        migrate(self.db_path)
+
+        rows = self.conn.execute(
+            "SELECT m.name FROM invoices AS i LEFT JOIN markets AS m ON m.id = i.market_id ORDER BY i.id"
+        ).fetchall()
+        self.assertEqual(rows, [("Fort Payne",), (None,)])
+
+    def test_migrations_do_not_follow_live_market_rules(self):
+        self.conn.execute("""
+            CREATE TABLE invoices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT, invoice_no TEXT, vendor TEXT, amount TEXT, date TEXT,
+                market TEXT, service_period TEXT, description TEXT, docx_file_path TEXT
+            )
+        """)
+        self.conn.execute("INSERT INTO invoices (vendor, amount, market) VALUES ('Matrix Media', '$5', 'Dothan')")
+
+        # A spelling added to utils.markets later must not change what the released migrations did
+        with mock.patch.dict(MARKET_ALIASES, {"dothan": "Fort Payne"}):
+            migrate(self.db_path)
+
+        self.assertEqual(self.conn.execute(
+            "SELECT m.name FROM invoices AS i JOIN markets AS m ON m.id = i.market_id"
+        ).fetchall(), [("Dothan",)])
+
+    def test_batch_and_invoice_lookups_use_indexes(self):
+        migrate(self.db_path)
+
+        plan = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT invoice_no FROM invoices "
+            "WHERE market = 'Fort Payne' AND vendor = 'Matrix Media' AND batch_id = '20240101_090000'"
+        ).fetchall()
+        self.assertIn("COVERING INDEX idx_invoices_batch_vendor", plan[0][3])
+
+        plan = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT invoice_no, batch_id FROM invoices WHERE invoice_no IN ('1', '2')"
+        ).fetchall()
+        self.assertIn("COVERING INDEX idx_invoices_invoice_no", plan[0][3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+
+import pyarrow.parquet as pq
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import migrate
+from database.parquet_export import export_new_batches, load_exported_batches, partition_value
+
+
+class TestParquetExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        self.export_dir = os.path.join(self.tmp_dir, "parquet")
+        migrate(self.db_path)
+        self.conn = get_connection(self.db_path)
+        self.insert([
+            ("20240301_090000", "112535", "FEE INVOICE", "2024-03-01", 150000),
+            ("20240301_090000", "112536-M", "Matrix Media", "2024-02-28", 4567),
+            ("20240301_090000", "112537-M", "Matrix Media", None, 100),
+        ])
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def insert(self, rows):
+        self.conn.executemany(
+            "INSERT INTO invoices (batch_id, invoice_no, vendor, date, amount_cents) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        self.conn.commit()
+
+    def test_partitions_and_types(self):
+        counts = export_new_batches(self.conn, self.export_dir)
+        self.assertEqual(counts, {"20240301_090000": 3})
+
+        fee_file = os.path.join(self.export_dir, "vendor=FEE%20INVOICE", "month=2024-03", "batch_20240301_090000.parquet")
+        table = pq.read_table(fee_file)
+        self.assertEqual(str(table.schema.field("amount_cents").type), "int64")
+        self.assertEqual(table.column("date").to_pylist(), [datetime.date(2024, 3, 1)])
+
+        # One Matrix Media row is dated February, the undated one falls back to the batch month
+        february = pq.read_table(os.path.join(self.export_dir, "vendor=Matrix%20Media", "month=2024-02"))
+        march = pq.read_table(os.path.join(self.export_dir, "vendor=Matrix%20Media", "month=2024-03"))
+        self.assertEqual(february.column("invoice_no").to_pylist(), ["112536-M"])
+        self.assertEqual(march.column("invoice_no").to_pylist(), ["112537-M"])
+
+    def test_only_new_batches_are_exported(self):
+        export_new_batches(self.conn, self.export_dir)
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {})
+
+        self.insert([("20240401_090000", "112538", "FEE INVOICE", "2024-04-01", 99)])
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {"20240401_090000": 1})
+        self.assertEqual(sorted(load_exported_batches(self.export_dir)), ["20240301_090000", "20240401_090000"])
+
+        # Read back as one dataset, with vendor and month from the partition directories
+        dataset = pq.read_table(self.export_dir)
+        self.assertEqual(dataset.num_rows, 4)
+        self.assertEqual(
+            sorted(zip(dataset.column("vendor").to_pylist(), dataset.column("month").to_pylist())),
+            [("FEE INVOICE", "2024-03"), ("FEE INVOICE", "2024-04"), ("Matrix Media", "2024-02"), ("Matrix Media", "2024-03")]
+        )
+
+    def test_batch_still_being_written_is_exported_again(self):
+        export_new_batches(self.conn, self.export_dir)
+
+        # More rows for the same (current) batch after its first export
+        self.insert([("20240301_090000", "112538", "FEE INVOICE", "2024-04-02", 500)])
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {"20240301_090000": 4})
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {})
+        dataset = pq.read_table(self.export_dir)
+        self.assertEqual(sorted(dataset.column("invoice_no").to_pylist()), ["112535", "112536-M", "112537-M", "112538"])
+
+        # A partition the batch no longer has rows in loses its file
+        self.conn.execute("DELETE FROM invoices WHERE invoice_no = '112536-M'")
+        self.conn.commit()
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {"20240301_090000": 3})
+        self.assertFalse(os.path.exists(os.path.join(self.export_dir, "vendor=Matrix%20Media", "month=2024-02",
+                                                     "batch_20240301_090000.parquet")))
+        self.assertEqual(pq.read_table(self.export_dir).num_rows, 3)
+
+    def test_batch_corrected_in_place_is_exported_again(self):
+        export_new_batches(self.conn, self.export_dir)
+
+        # Same rows, same ids: only a value changes
+        self.conn.execute("UPDATE invoices SET amount_cents = 160000 WHERE invoice_no = '112535'")
+        self.conn.commit()
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {"20240301_090000": 3})
+        self.assertEqual(export_new_batches(self.conn, self.export_dir), {})
+        dataset = pq.read_table(self.export_dir)
+        self.assertIn(160000, dataset.column("amount_cents").to_pylist())
+
+    def test_partition_value(self):
+        self.assertEqual(partition_value("Matrix Media"), "Matrix%20Media")
+        self.assertEqual(partition_value("A/B"), "A%2FB")
+        self.assertEqual(partition_value(None), "unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
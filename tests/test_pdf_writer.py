@@ -0,0 +1,76 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import fitz  # PyMuPDF
+from docx.shared import Inches
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.pdf_writer import MARGIN_LEFT, PdfBillingDocument
+
+
+class TestPdfBillingDocument(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.tmp_dir, "backup.png")
+        Image.new("RGB", (200, 100), "red").save(self.image_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_pages_text_and_images(self):
+        output_path = os.path.join(self.tmp_dir, "out", "billing.pdf")
+        doc = PdfBillingDocument()
+        doc.add_paragraph("INVOICE 112535", alignment="center")
+        doc.add_paragraph("Radio spot production   $1,250.00")
+        doc.add_picture(self.image_path, width=Inches(3))
+        doc.add_page_break()
+        doc.add_paragraph("INVOICE 112536", alignment="right")
+        doc.add_picture(self.image_path)
+        # A trailing break does not leave an empty last page
+        doc.add_page_break()
+        doc.save(output_path)
+        self.assertEqual((doc.images_embedded, doc.images_reused), (1, 1))
+        doc.close()
+
+        with fitz.open(output_path) as pdf:
+            self.assertEqual(pdf.page_count, 2)
+            first, second = pdf[0].get_text(), pdf[1].get_text()
+            self.assertEqual(first.split("\n")[:2], ["INVOICE 112535", "Radio spot production   $1,250.00"])
+            self.assertIn("INVOICE 112536", second)
+            self.assertNotIn("INVOICE 112536", first)
+
+            # Centered and right-aligned lines start right of the left margin
+            words = {word[4]: word[0] for word in pdf[0].get_text("words")}
+            self.assertGreater(words["INVOICE"], MARGIN_LEFT + 10)
+            self.assertAlmostEqual(words["Radio"], MARGIN_LEFT, delta=1)
+
+            # The identical image is stored once and placed on both pages
+            xrefs = [[image[0] for image in page.get_images()] for page in pdf]
+            self.assertEqual(len(xrefs[0]), 1)
+            self.assertEqual(xrefs[0], xrefs[1])
+            # Inches(3) wide on the first page
+            self.assertAlmostEqual(pdf[0].get_image_rects(xrefs[0][0])[0].width, 216, delta=1)
+
+    def test_double_break_leaves_blank_page(self):
+        output_path = os.path.join(self.tmp_dir, "blank.pdf")
+        doc = PdfBillingDocument()
+        doc.add_paragraph("Page one")
+        doc.add_page_break()
+        doc.add_page_break()
+        doc.add_paragraph("Page three")
+        doc.save(output_path)
+        doc.close()
+
+        with fitz.open(output_path) as pdf:
+            self.assertEqual([page.get_text().strip() for page in pdf], ["Page one", "", "Page three"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.connection import get_connection, close_connection
+from database.migrations import migrate
+from database.query_db import (
+    build_match_query,
+    iter_invoice_pages,
+    iter_invoices,
+    parse_columns,
+    print_invoices,
+    search_invoices,
+    write_jsonl,
+)
+
+
+class TestQueryDb(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("""
+            CREATE TABLE invoices (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT, invoice_no TEXT, vendor TEXT, amount TEXT, date TEXT,
+                market TEXT, service_period TEXT, description TEXT,
+                docx_file_path TEXT, job_number TEXT, amount_cents INTEGER, market_id INTEGER
+            )
+        """)
+        self.conn.executemany(
+            "INSERT INTO invoices (batch_id, invoice_no, vendor, date) VALUES (?, ?, ?, ?)",
+            [
+                (f"2024010{day}_090000", str(112535 + day), vendor, f"2024-01-0{day}")
+                for day in range(1, 8)
+                for vendor in ("Matrix Media", "FEE INVOICE")
+            ]
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_keyset_pages_cover_all_rows_once(self):
+        pages = list(iter_invoice_pages(self.conn, ["invoice_no"], page_size=4))
+        self.assertEqual([len(page) for page in pages], [4, 4, 4, 2])
+        self.assertEqual(sum(pages, []), list(iter_invoices(self.conn, "invoice_no")))
+
+        resumed = list(iter_invoices(self.conn, "id", after_id=12))
+        self.assertEqual(resumed, [(13,), (14,)])
+
+    def test_filters_and_projection(self):
+        rows = list(iter_invoices(
+            self.conn, "invoice_no,date", vendor="Matrix Media",
+            date_from="2024-01-03", date_to="2024-01-05", page_size=2
+        ))
+        self.assertEqual(rows, [("112538", "2024-01-03"), ("112539", "2024-01-04"), ("112540", "2024-01-05")])
+
+        with self.assertRaises(ValueError):
+            parse_columns("invoice_no; DROP TABLE invoices")
+
+    def test_output_formats(self):
+        rows = iter_invoices(self.conn, ["invoice_no", "vendor"], batch_id="20240101_090000")
+        out = io.StringIO()
+        write_jsonl(rows, ("invoice_no", "vendor"), out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(lines[0], {"invoice_no": "112536", "vendor": "Matrix Media"})
+        self.assertEqual(len(lines), 2)
+
+        out = io.StringIO()
+        print_invoices(iter([]), ("invoice_no",), out)
+        self.assertEqual(out.getvalue().strip(), "No invoices found.")
+
+
+class TestInvoiceSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "invoice.db")
+        migrate(self.db_path)
+        self.conn = get_connection(self.db_path)
+        self.conn.executemany(
+            "INSERT INTO invoices (batch_id, invoice_no, vendor, market, description, job_number) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("20240101_090000", "112535", "FEE INVOICE", "PRINT", "Brochure printing for spring event", "TTC-380"),
+                ("20240101_090000", "112536-M", "Matrix Media", "Dothan", "Billboard rotary", ""),
+                ("20240201_090000", "112537", "FEE INVOICE", "AD", "Spring radio spot, spring promo", "TTC-381"),
+            ]
+        )
+
+    def tearDown(self):
+        close_connection(self.db_path)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_ranked_and_highlighted(self):
+        results = search_invoices(self.conn, "spring")
+        self.assertEqual([row[2] for row in results], ["112537", "112535"])
+        self.assertIn("[Spring]", results[0][6])
+
+        results = search_invoices(self.conn, "TTC-380")
+        self.assertEqual([row[2] for row in results], ["112535"])
+        self.assertEqual(results[0][7], "[TTC-380]")
+
+        self.assertEqual([row[2] for row in search_invoices(self.conn, "Dot*")], ["112536-M"])
+        self.assertEqual(search_invoices(self.conn, "spring", vendor="Matrix Media"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.conn.execute("UPDATE invoices SET description = 'Summer radio spot' WHERE invoice_no = '112537'")
+        self.conn.execute("DELETE FROM invoices WHERE invoice_no = '112535'")
+        self.assertEqual(search_invoices(self.conn, "spring"), [])
+        self.assertEqual([row[2] for row in search_invoices(self.conn, "summer")], ["112537"])
+
+    def test_match_query_quotes_terms(self):
+        self.assertEqual(build_match_query('TTC-380 "x" Dot*'), '"TTC-380" """x""" "Dot"*')
+        self.assertEqual(build_match_query("  * "), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+
+from utils.reconcile import RECORD_ID_FIELD, market_similarity, match_records, plan_chunks, reconcile_with_llm
+
+
+class TestReconcile(unittest.TestCase):
+
+    def setUp(self):
+        self.database_records = [
+            {"id": 1, "invoice_no": "112535-M", "market": "Dothan", "amount": "$1,003.00"},
+            {"id": 2, "invoice_no": "112536-M", "market": "Fort Payne", "amount": "$2,500.00"},
+            {"id": 3, "invoice_no": "112537-M", "market": "Conyers", "amount": "$800.00"},
+            {"id": 4, "invoice_no": "112538-M", "market": "Conyers", "amount": "$800.00"},
+            {"id": 5, "invoice_no": "112539-M", "market": "Albany", "amount": "$450.00"},
+        ]
+
+    def test_market_similarity(self):
+        self.assertEqual(market_similarity("Ft. Payne", "Fort Payne"), 1.0)
+        self.assertEqual(market_similarity("DOTHAN ", "Dothan"), 1.0)
+        self.assertGreater(market_similarity("Dothn", "Dothan"), 0.8)
+        self.assertLess(market_similarity("Albany", "Dothan"), 0.5)
+        self.assertEqual(market_similarity(None, "Dothan"), 0.0)
+
+    def test_clear_matches_take_database_values(self):
+        dataframe_records = [
+            {"Market": "Ft Payne", "Amount": 2500.0, "ServicePeriod": "March"},
+            {"Market": "Dothan", "Amount": 1003.4, "ServicePeriod": "March"},
+        ]
+        matches, residue_df, residue_db = match_records(dataframe_records, self.database_records)
+
+        self.assertEqual([match["invoice_no"] for match in matches], ["112536-M", "112535-M"])
+        self.assertEqual(matches[0]["Market"], "Fort Payne")
+        self.assertEqual(matches[1]["Amount"], "$1,003.00")
+        self.assertEqual(matches[1]["ServicePeriod"], "March")
+        self.assertEqual(residue_df, [])
+        self.assertEqual([record["id"] for record in residue_db], [3, 4, 5])
+
+    def test_ambiguous_and_distant_records_are_residue(self):
+        dataframe_records = [
+            # Two identical database rows: the LLM has to decide
+            {"Market": "Conyers", "Amount": 800.0},
+            # No database amount anywhere near it
+            {"Market": "Albany", "Amount": 9000.0},
+            # Right amount, unknown market
+            {"Market": "Tuscaloosa", "Amount": 450.0},
+        ]
+        matches, residue_df, residue_db = match_records(dataframe_records, self.database_records)
+
+        self.assertEqual(matches, [])
+        self.assertEqual(residue_df, dataframe_records)
+        self.assertEqual(len(residue_db), 5)
+
+    def test_deterministic(self):
+        dataframe_records = [{"Market": "Conyers", "Amount": 800.0}, {"Market": "Conyers", "Amount": 800.0}]
+        first = match_records(dataframe_records, self.database_records)
+        self.assertEqual(first, match_records(dataframe_records, self.database_records))
+
+
+    def test_chunks_group_markets_and_bound_size(self):
+        dataframe_records = [{"Market": "Conyers", "Amount": 800.0}] * 3 + [{"Market": "Albany", "Amount": 450.0}]
+        chunks = plan_chunks(dataframe_records, self.database_records, chunk_size=2)
+        self.assertEqual([df_indices for df_indices, _ in chunks], [[3], [0, 1], [2]])
+        # Albany's chunk holds the Albany row; Conyers chunks hold both Conyers rows
+        self.assertEqual(chunks[0][1], [4])
+        self.assertEqual(chunks[1][1], [2, 3])
+
+    def test_llm_chunks_run_concurrently_and_conflicts_are_resolved(self):
+        dataframe_records = [
+            {"Market": "Conyers", "Amount": 800.0},
+            {"Market": "Conyers", "Amount": 790.0},
+            {"Market": "Albany", "Amount": 450.0},
+        ]
+        in_flight = []
+        lock = threading.Lock()
+        active = [0]
+
+        def match_chunk(chunk_df, chunk_db):
+            with lock:
+                active[0] += 1
+                in_flight.append(active[0])
+            try:
+                # A careless matcher: every record claims the first candidate
+                return [
+                    {**record, "invoice_no": chunk_db[0]["invoice_no"], "Market": chunk_db[0]["market"]}
+                    for record in chunk_df
+                ]
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        matches, unmatched = reconcile_with_llm(dataframe_records, self.database_records, match_chunk,
+                                                chunk_size=1, max_workers=2)
+
+        self.assertLessEqual(max(in_flight), 2)
+        # Both Conyers records claimed 112537-M; the closer amount keeps it
+        self.assertEqual(sorted(match["invoice_no"] for match in matches), ["112537-M", "112539-M"])
+        self.assertTrue(all(RECORD_ID_FIELD not in match for match in matches))
+        self.assertEqual(unmatched, [dataframe_records[1]])
+
+    def test_untraced_matches_are_deduplicated(self):
+        dataframe_records = [
+            {"Market": "Dothan", "Amount": 1003.0, "Description": "Digital posters"},
+            {"Market": "Albany", "Amount": 450.0, "Description": "Install"},
+        ]
+
+        def match_chunk(chunk_df, chunk_db):
+            # The matcher drops the record ids, and both chunks return the Dothan line
+            return [
+                {"Market": "Dothan", "Amount": 1003.0, "Description": "Digital  posters",
+                 "invoice_no": "112535-M", "job_number": "TTC-380"},
+                {"Market": "Dothan", "Amount": 1003.0, "Description": "Digital posters",
+                 "invoice_no": "112535-M", "job_number": "TTC-381"},
+            ]
+
+        matches, _ = reconcile_with_llm(dataframe_records, self.database_records, match_chunk, chunk_size=1)
+
+        # Same description and amount, but a different job number is a different line
+        self.assertEqual([match["job_number"] for match in matches], ["TTC-380", "TTC-381"])
+
+    def test_failed_chunk_leaves_records_unmatched(self):
+        def match_chunk(chunk_df, chunk_db):
+            raise RuntimeError("rate limited")
+
+        dataframe_records = [{"Market": "Albany", "Amount": 450.0}]
+        self.assertEqual(reconcile_with_llm(dataframe_records, self.database_records, match_chunk),
+                         ([], dataframe_records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+import docx
+from docx.shared import Inches
+from lxml import etree
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.section_cache import SectionCache, fingerprint_section
+
+
+class TestSectionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.tmp_dir, "invoices.docx.sections.json")
+        self.fragment_dir = os.path.join(self.tmp_dir, "fragments")
+        self.images = {}
+        for name, color in (("a", "red"), ("b", "green"), ("c", "blue")):
+            self.images[name] = os.path.join(self.tmp_dir, f"{name}.png")
+            Image.new("RGB", (20, 10), color).save(self.images[name])
+        self.sections = [(name, f"Invoice {name.upper()} $100.00", self.images[name]) for name in ("a", "b", "c")]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def build(self, sections, template=("header",), use_cache=True):
+        """Build the document the way main_logic does: reuse cached sections, rebuild and store the rest."""
+        doc = docx.Document()
+        cache = SectionCache(self.manifest_path, self.fragment_dir, template) if use_cache else None
+        for key, text, image in sections:
+            fingerprint = fingerprint_section((text,), [image])
+            if cache and cache.append_cached(doc, key, fingerprint):
+                continue
+            start = cache.start_section(doc) if cache else None
+            doc.add_paragraph(text)
+            doc.add_picture(image, width=Inches(1))
+            doc.add_page_break()
+            if cache:
+                cache.store(doc, key, fingerprint, start, [image])
+        if cache:
+            cache.save()
+        path = os.path.join(self.tmp_dir, "invoices.docx")
+        doc.save(path)
+        return docx.Document(path), cache
+
+    def body_xml(self, doc):
+        return etree.tostring(doc.element.body)
+
+    def fragments(self):
+        return sorted(os.listdir(self.fragment_dir))
+
+    def test_cached_build_equals_full_build(self):
+        full, _ = self.build(self.sections, use_cache=False)
+        self.build(self.sections)
+        cached, cache = self.build(self.sections)
+
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+        self.assertEqual(self.body_xml(cached), self.body_xml(full))
+        self.assertEqual(
+            sorted(part.blob for part in cached.part.package.image_parts),
+            sorted(part.blob for part in full.part.package.image_parts)
+        )
+
+    def test_changed_inputs_are_rebuilt(self):
+        self.build(self.sections)
+
+        changed = list(self.sections)
+        changed[1] = ("b", "Invoice B $250.00", self.images["b"])
+        doc, cache = self.build(changed)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertIn("Invoice B $250.00", [p.text for p in doc.paragraphs])
+
+        # New image content under the same path
+        Image.new("RGB", (20, 10), "black").save(self.images["c"])
+        _, cache = self.build(changed)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        # A template change invalidates every section
+        _, cache = self.build(changed, template=("new header",))
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+    def test_stale_fragments_are_removed(self):
+        self.build(self.sections)
+        self.assertEqual(len(self.fragments()), 3)
+
+        _, cache = self.build([self.sections[0], self.sections[2]])
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest["sections"]), ["a", "c"])
+        self.assertEqual(self.fragments(), sorted(entry["fragment"] for entry in manifest["sections"].values()))
+
+    def test_fragment_failing_partway_leaves_no_duplicate(self):
+        full, _ = self.build(self.sections, use_cache=False)
+        self.build(self.sections)
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            fragment_path = os.path.join(self.fragment_dir, json.load(f)["sections"]["b"]["fragment"])
+        with open(fragment_path, "r", encoding="utf-8") as f:
+            fragment = json.load(f)
+        # The paragraph before the picture is fine; the picture's image is gone
+        fragment["images"] = [os.path.join(self.tmp_dir, "missing.png")]
+        with open(fragment_path, "w", encoding="utf-8") as f:
+            json.dump(fragment, f)
+
+        doc, cache = self.build(self.sections)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(self.body_xml(doc), self.body_xml(full))
+
+    def test_missing_fragment_is_rebuilt(self):
+        self.build(self.sections)
+        for filename in self.fragments():
+            os.remove(os.path.join(self.fragment_dir, filename))
+        doc, cache = self.build(self.sections)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(len(doc.inline_shapes), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
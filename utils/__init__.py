@@ -1,3 +1,3 @@
-"""
-Utility functions and decorators for the Billing PDF Automation project.
+"""
+Utility functions and decorators for the Billing PDF Automation project.
 """
\ No newline at end of file
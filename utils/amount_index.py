@@ -0,0 +1,76 @@
+"""
+Sorted index of invoice amounts for range lookups.
+
+Amounts are kept as a sorted NumPy array of integer cents next to the row
+id of each amount. "Rows within X cents of this amount" is then two binary
+searches (numpy.searchsorted) and a slice, instead of a scan of every row.
+Many lookups can be answered in one vectorized call.
+"""
+import numpy as np
+
+from utils.amounts import parse_amount_cents
+
+
+class AmountIndex:
+    """
+    Amounts in integer cents, sorted, with the id of the row each came from.
+
+    Args:
+        cents (iterable): Amounts in integer cents; None entries are skipped.
+        ids (iterable, optional): Row id per amount. Defaults to the position
+            of the amount in cents.
+    """
+
+    def __init__(self, cents, ids=None):
+        cents = list(cents)
+        ids = list(range(len(cents))) if ids is None else list(ids)
+        if len(ids) != len(cents):
+            raise ValueError("cents and ids must have the same length")
+
+        kept = [(amount, row_id) for amount, row_id in zip(cents, ids) if amount is not None]
+        amounts = np.array([amount for amount, _ in kept], dtype=np.int64)
+        row_ids = np.array([row_id for _, row_id in kept], dtype=np.int64)
+        # Stable sort, so equal amounts keep their input order
+        order = np.argsort(amounts, kind="stable")
+        self.cents = amounts[order]
+        self.ids = row_ids[order]
+
+    @classmethod
+    def from_records(cls, records, amount_field="amount", id_field=None):
+        """
+        Build an index from dicts with an amount such as '$1,234.56'.
+
+        Args:
+            records (list): Records to index.
+            amount_field (str): Key of the amount; parsed with parse_amount_cents.
+            id_field (str, optional): Key of the row id. Defaults to the
+                position of the record in records.
+        """
+        cents = [parse_amount_cents(record.get(amount_field)) for record in records]
+        ids = None if id_field is None else [record.get(id_field) for record in records]
+        return cls(cents, ids)
+
+    def __len__(self):
+        return len(self.cents)
+
+    def between(self, low, high):
+        """Ids of the amounts in [low, high] cents, in amount order."""
+        start = np.searchsorted(self.cents, low, side="left")
+        end = np.searchsorted(self.cents, high, side="right")
+        return self.ids[start:end]
+
+    def within(self, cents, tolerance):
+        """Ids of the amounts at most tolerance cents away from cents."""
+        return self.between(cents - tolerance, cents + tolerance)
+
+    def bounds(self, lows, highs):
+        """
+        Vectorized between(): positions of every [low, high] range at once.
+
+        Returns:
+            tuple: (starts, ends) arrays; range i is self.ids[starts[i]:ends[i]]
+                and self.cents[starts[i]:ends[i]].
+        """
+        starts = np.searchsorted(self.cents, np.asarray(lows, dtype=np.int64), side="left")
+        ends = np.searchsorted(self.cents, np.asarray(highs, dtype=np.int64), side="right")
+        return starts, ends
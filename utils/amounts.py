@@ -0,0 +1,44 @@
+"""
+Parsing of invoice amounts into integer cents.
+
+Amounts arrive as '$1,234.56' strings, plain numbers or floats. They are
+stored as integer cents so sums and comparisons are exact integer math.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal("0.01")
+
+
+def parse_amount_cents(amount):
+    """
+    Parse an amount like '$1,234.56', '1234.5', 99 or 12.3 into integer cents.
+
+    Args:
+        amount: Amount as a string or number.
+
+    Returns:
+        int: Amount in cents, or None if the value is empty or not a number.
+    """
+    if amount is None or isinstance(amount, bool):
+        return None
+    if isinstance(amount, float):
+        # repr() gives the shortest string that round-trips, e.g. 0.1 -> "0.1"
+        amount = repr(amount)
+
+    text = str(amount).strip().replace("$", "").replace(",", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    if not text:
+        return None
+
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return None
+    if not value.is_finite():
+        return None
+
+    cents = int(value.quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+    return -cents if negative else cents
+
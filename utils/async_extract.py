@@ -0,0 +1,183 @@
+"""
+Concurrent LLM extraction with asyncio.
+
+Many email bodies (or body segments) are sent to the extractor at once
+instead of one round trip after another. The number of requests in flight
+is capped, and the cap adapts to the API: a 429 (rate limited) response
+halves it and pauses new requests with exponential backoff, and a run of
+successes raises it again, one slot at a time, back to the configured
+concurrency. Results come back in the order of the inputs.
+"""
+import asyncio
+import inspect
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 5
+# First pause after a 429, doubled on each further 429 without a success in between
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def is_rate_limited(error):
+    """True for a 429 / rate limit error from the OpenAI client, LiteLLM (DSPy) or an HTTP library."""
+    for candidate in (error, getattr(error, "response", None)):
+        if getattr(candidate, "status_code", None) == 429 or getattr(candidate, "status", None) == 429:
+            return True
+    return "RateLimit" in type(error).__name__
+
+
+def retry_after_seconds(error):
+    """The Retry-After header of a rate limit error in seconds, or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency cap for requests to a rate-limited API.
+
+    Args:
+        limit (int): Maximum number of requests in flight.
+        base_backoff (float): First pause after a 429, in seconds.
+        max_backoff (float): Longest pause, in seconds.
+    """
+
+    def __init__(self, limit=DEFAULT_CONCURRENCY, base_backoff=BASE_BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS):
+        self.max_limit = max(1, limit)
+        self.limit = self.max_limit
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.active = 0
+        self.peak_active = 0
+        self.rate_limited = 0
+        self._backoff = 0.0
+        self._successes = 0
+        # Bumped on every cut, so the 429s of one burst of requests cut the limit once
+        self._generation = 0
+        self._resume_at = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a free slot (and for any backoff pause to end); returns a token for release()."""
+        loop = asyncio.get_running_loop()
+        async with self._condition:
+            while True:
+                pause = self._resume_at - loop.time()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.active < self.limit:
+                    self.active += 1
+                    self.peak_active = max(self.peak_active, self.active)
+                    return self._generation
+                await self._condition.wait()
+
+    async def release(self, token, rate_limited=False, retry_after=None):
+        """
+        Free a slot and adapt the limit to the outcome of the request.
+
+        Args:
+            token: The value acquire() returned for this request.
+            rate_limited (bool): The request got a 429.
+            retry_after (float, optional): Pause requested by the API, in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._condition:
+            self.active -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self._successes = 0
+                if token == self._generation:
+                    self._generation += 1
+                    self.limit = max(1, self.limit // 2)
+                    self._backoff = min(self.max_backoff, self._backoff * 2 if self._backoff else self.base_backoff)
+                    # Jitter, so the waiting requests do not all return in the same instant
+                    pause = retry_after if retry_after is not None else self._backoff * random.uniform(0.75, 1.0)
+                    self._resume_at = max(self._resume_at, loop.time() + pause)
+                    logging.warning(f"Rate limited: concurrency lowered to {self.limit}, pausing {pause:.1f}s")
+            else:
+                self._backoff = 0.0
+                self._successes += 1
+                if self.limit < self.max_limit and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+async def extract_many(items, extract, concurrency=DEFAULT_CONCURRENCY, max_retries=DEFAULT_MAX_RETRIES,
+                       limiter=None):
+    """
+    Run extract(item) for every item concurrently; results are in the order of items.
+
+    Args:
+        items (list): Inputs, e.g. email bodies.
+        extract (callable): A coroutine function, or a blocking function that is
+            run in a thread pool (e.g. a DSPy predictor call).
+        concurrency (int): Maximum number of calls in flight.
+        max_retries (int): Retries of a call that was rate limited.
+        limiter (AdaptiveLimiter, optional): Shared limiter; one per call by default.
+
+    Returns:
+        list: extract's result for each item, or None where the call failed
+            (the error is logged).
+    """
+    items = list(items)
+    if not items:
+        return []
+    limiter = limiter or AdaptiveLimiter(concurrency)
+    is_coroutine = inspect.iscoroutinefunction(extract)
+    executor = None if is_coroutine else ThreadPoolExecutor(max_workers=min(limiter.max_limit, len(items)))
+    loop = asyncio.get_running_loop()
+
+    async def call(item):
+        if is_coroutine:
+            return await extract(item)
+        return await loop.run_in_executor(executor, extract, item)
+
+    async def run(index, item):
+        for attempt in range(max_retries + 1):
+            token = await limiter.acquire()
+            try:
+                result = await call(item)
+            except Exception as e:
+                if is_rate_limited(e):
+                    await limiter.release(token, rate_limited=True, retry_after=retry_after_seconds(e))
+                    if attempt < max_retries:
+                        continue
+                    logging.error(f"Extraction of item {index + 1} still rate limited after {max_retries} retries")
+                    return None
+                await limiter.release(token)
+                logging.error(f"Extraction of item {index + 1} failed: {e}")
+                return None
+            await limiter.release(token)
+            return result
+
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Extracted {len(items)} item(s) in {elapsed:.2f}s ({len(items) / elapsed if elapsed else 0:.1f}/s), "
+        f"up to {limiter.peak_active} in flight, {limiter.rate_limited} rate-limited response(s), "
+        f"{sum(result is None for result in results)} failure(s)"
+    )
+    return results
+
+
+def extract_all(items, extract, **kwargs):
+    """Blocking wrapper of extract_many for callers without an event loop."""
+    return asyncio.run(extract_many(items, extract, **kwargs))
@@ -0,0 +1,176 @@
+"""
+Content-addressed store for email attachments.
+
+Every attachment is stored once, as a blob named by the SHA-256 of its
+bytes, with an index from attachment filename to hash. The working
+directory that the PDF steps read from gets one file per distinct content,
+so a PDF that arrives in several emails, or under several names, is
+classified, converted and rendered once.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+HASH_CHUNK_SIZE = 1 << 20
+INDEX_FILE = "index.json"
+OBJECTS_SUBDIR = "objects"
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def unique_path(directory, filename):
+    """Path for filename in directory that does not exist yet: "name.pdf", "name (2).pdf", ..."""
+    base, ext = os.path.splitext(filename)
+    path = os.path.join(directory, filename)
+    counter = 2
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{base} ({counter}){ext}")
+        counter += 1
+    return path
+
+
+def unique_files(paths):
+    """Drop files whose content equals an earlier file in paths; order is kept."""
+    seen = {}
+    unique = []
+    for path in paths:
+        digest = file_sha256(path)
+        if digest in seen:
+            logging.info(f"Skipping {os.path.basename(path)}: same content as {os.path.basename(seen[digest])}")
+            continue
+        seen[digest] = path
+        unique.append(path)
+    return unique
+
+
+class AttachmentStore:
+    """
+    Blobs keyed by SHA-256 under root/objects/, plus a filename -> hash index.
+
+    Args:
+        root (str): Store directory; created if missing.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        os.makedirs(os.path.join(root, OBJECTS_SUBDIR), exist_ok=True)
+        self.names = self._load_index()
+        # Working directory -> {hash: file placed there}
+        self.placed = {}
+        self.duplicates = 0
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("names", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable attachment index {self.index_path}: {e}")
+            return {}
+
+    def save(self):
+        """Write the filename index (temp file swapped into place)."""
+        with open(self.index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"names": self.names}, f, indent=2, sort_keys=True)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def blob_path(self, digest):
+        """Path of the blob with this hash (two-character fan-out directories)."""
+        return os.path.join(self.root, OBJECTS_SUBDIR, digest[:2], digest)
+
+    def __contains__(self, digest):
+        return os.path.exists(self.blob_path(digest))
+
+    def digest_for(self, filename):
+        """Hash of the content last stored under filename, or None."""
+        return self.names.get(filename)
+
+    def add_file(self, path, filename=None):
+        """
+        Move a file into the store; if its content is already stored the file is just removed.
+
+        Args:
+            path (str): File to store.
+            filename (str, optional): Name to index it under; defaults to its basename.
+
+        Returns:
+            str: SHA-256 hex digest of the content.
+        """
+        digest = file_sha256(path)
+        blob = self.blob_path(digest)
+        if os.path.exists(blob):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(path, blob)
+        self.names[filename or os.path.basename(path)] = digest
+        return digest
+
+    def _placed_in(self, directory):
+        placed = self.placed.get(directory)
+        if placed is None:
+            # Files already in the working directory, e.g. from an earlier run
+            placed = {}
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                if os.path.isfile(path):
+                    placed.setdefault(file_sha256(path), path)
+            self.placed[directory] = placed
+        return placed
+
+    def materialize(self, digest, directory, filename):
+        """
+        Put the blob into directory once, under filename (or "filename (2)" if taken).
+
+        Returns:
+            tuple: (path in directory, True if it was placed by this call).
+        """
+        placed = self._placed_in(directory)
+        path = placed.get(digest)
+        if path and os.path.exists(path):
+            return path, False
+
+        path = unique_path(directory, filename)
+        try:
+            # A hard link costs no copy; blobs are never modified
+            os.link(self.blob_path(digest), path)
+        except OSError:
+            shutil.copyfile(self.blob_path(digest), path)
+        placed[digest] = path
+        return path, True
+
+    def collect(self, paths, directory):
+        """
+        Store downloaded attachment files and place each distinct content in directory once.
+
+        Args:
+            paths (list): Freshly saved attachment files; they are moved into the store.
+            directory (str): Working directory the PDF steps read from.
+
+        Returns:
+            list: Paths in directory for the attachments, without repeats.
+        """
+        os.makedirs(directory, exist_ok=True)
+        collected = []
+        for incoming_path in paths:
+            filename = os.path.basename(incoming_path)
+            digest = self.add_file(incoming_path, filename)
+            path, placed = self.materialize(digest, directory, filename)
+            if not placed:
+                self.duplicates += 1
+                logging.info(f"Skipping duplicate attachment {filename} (same as {os.path.basename(path)})")
+            if path not in collected:
+                collected.append(path)
+        self.save()
+        return collected
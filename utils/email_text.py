@@ -0,0 +1,252 @@
+"""
+Prompt payload minimization for email bodies.
+
+Before an email body goes to invoice extraction, everything that cannot
+carry an invoice line is removed: HTML markup, quoted reply history
+without invoice lines, forward and reply header blocks, signatures,
+sign-offs and legal disclaimers. Long emails are then split
+into segments made of their invoice-bearing paragraphs only, so each
+extraction prompt stays small.
+"""
+import html
+import math
+import re
+from datetime import datetime
+
+from utils.decorators import write_performance_log
+
+# Rough size of a GPT token for English text, used for the savings report
+CHARS_PER_TOKEN = 4
+# Emails longer than this (after cleanup) are segmented
+SEGMENT_CHARS = 4000
+PERFORMANCE_LOG_DIR = "logs/performance"
+
+HTML_TAG_RE = re.compile(r"<\s*/?\s*(?:html|head|body|div|p|br|span|table|tr|td|th|font|b|i|u|a|img|style|meta)\b", re.IGNORECASE)
+HTML_DROP_RE = re.compile(r"<(style|script|head)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+HTML_BREAK_RE = re.compile(r"<\s*(?:br\s*/?|/p|/div|/tr|/li|/h\d)\s*>", re.IGNORECASE)
+HTML_CELL_RE = re.compile(r"<\s*/t[dh]\s*>", re.IGNORECASE)
+ANY_TAG_RE = re.compile(r"<[^>]+>")
+
+# Start of a forwarded message: its header block is dropped, its body kept
+FORWARD_HEADER_RES = (
+    re.compile(r"^-{2,}\s*Forwarded message\s*-{2,}", re.IGNORECASE),
+    re.compile(r"^Begin forwarded message:\s*$", re.IGNORECASE),
+)
+# Start of the quoted history of a reply: kept only if it carries invoice lines
+REPLY_HEADER_RES = (
+    re.compile(r"^On\b.{0,200}\bwrote:\s*$", re.IGNORECASE),
+    re.compile(r"^-{2,}\s*Original Message\s*-{2,}", re.IGNORECASE),
+    re.compile(r"^_{10,}\s*$"),
+)
+OUTLOOK_FROM_RE = re.compile(r"^\*?From:\*?\s", re.IGNORECASE)
+OUTLOOK_HEADER_RE = re.compile(r"^\*?(?:Sent|Date|To|Cc|Subject):\*?\s", re.IGNORECASE)
+SIGNATURE_DELIMITER_RE = re.compile(r"^--\s?$")
+SIGN_OFF_RE = re.compile(
+    r"^(?:thanks|thank you|many thanks|best|best regards|kind regards|regards|sincerely|cheers|respectfully)\b[\w\s,!.]{0,30}$",
+    re.IGNORECASE
+)
+MOBILE_FOOTER_RE = re.compile(r"^(?:sent from my|get outlook for)\b", re.IGNORECASE)
+DISCLAIMER_RE = re.compile(
+    r"\b(?:confidential(?:ity)?|intended recipient|privileged|disclaimer|unsubscribe|virus)\b", re.IGNORECASE
+)
+# What an invoice line needs: an amount or a job number
+INVOICE_MARKER_RE = re.compile(r"\$\s*\d|\b\d{1,3}(?:,\d{3})*\.\d{2}\b|\bjob\s*(?:[:;#]|number)", re.IGNORECASE)
+
+
+def estimate_tokens(text):
+    """Approximate token count of text (CHARS_PER_TOKEN characters per token)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def strip_html(text):
+    """Turn HTML (or HTML leftovers in a text part) into plain text lines."""
+    if not HTML_TAG_RE.search(text):
+        return html.unescape(text) if "&" in text else text
+    text = HTML_DROP_RE.sub("", text)
+    text = HTML_BREAK_RE.sub("\n", text)
+    text = HTML_CELL_RE.sub(" ", text)
+    text = ANY_TAG_RE.sub("", text)
+    return html.unescape(text).replace("\xa0", " ")
+
+
+def _section_start(lines, index):
+    """"forward" or "reply" if a quoted or forwarded section starts at lines[index], else None."""
+    stripped = lines[index].strip()
+    if any(pattern.match(stripped) for pattern in FORWARD_HEADER_RES):
+        return "forward"
+    if any(pattern.match(stripped) for pattern in REPLY_HEADER_RES):
+        return "reply"
+    # "On Mon, Mar 4, 2024 at 9:00 AM Pat <pat@example.com>" + "wrote:" on the next line
+    if stripped.lower().startswith("on ") and index + 1 < len(lines) and lines[index + 1].strip().lower().endswith("wrote:"):
+        return "reply"
+    # Outlook: "From: ..." followed by "Sent:/To:/Subject:" lines
+    if OUTLOOK_FROM_RE.match(stripped) and any(
+        OUTLOOK_HEADER_RE.match(following.strip()) for following in lines[index + 1:index + 4]
+    ):
+        return "reply"
+    return None
+
+
+def _is_header_line(line):
+    """Blank, "... wrote:" or "From:/Sent:/To:/Subject:" lines of a header block."""
+    stripped = line.strip()
+    return (not stripped or stripped.lower().endswith("wrote:")
+            or OUTLOOK_FROM_RE.match(stripped) or OUTLOOK_HEADER_RE.match(stripped))
+
+
+def strip_quoted(lines):
+    """
+    Drop quoted reply history, keeping forwarded messages and quoted invoices.
+
+    The body is split at every reply or forward header. Header blocks
+    ("From:", "Sent:", "Subject:" ...) and ">" quoted lines are dropped
+    everywhere. A forwarded message (e.g. a vendor invoice sent on to the
+    billing inbox) is kept; the quoted history of a reply is kept only if it
+    has an amount or a job number. Each section loses its own signature.
+    """
+    sections = [["top", []]]
+    index = 0
+    while index < len(lines):
+        kind = _section_start(lines, index)
+        if kind:
+            index += 1
+            while index < len(lines) and _is_header_line(lines[index]):
+                index += 1
+            sections.append([kind, []])
+            continue
+        if not lines[index].strip().startswith(">"):
+            sections[-1][1].append(lines[index])
+        index += 1
+
+    kept = []
+    for kind, section_lines in sections:
+        section_lines = strip_signature(section_lines)
+        if kind == "reply" and not any(INVOICE_MARKER_RE.search(line) for line in section_lines):
+            continue
+        if kept:
+            kept.append("")
+        kept.extend(section_lines)
+    return kept
+
+
+def strip_signature(lines):
+    """Drop the signature: after a "-- " line, or after a sign-off with no invoice lines below it."""
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if SIGNATURE_DELIMITER_RE.match(stripped):
+            return lines[:index]
+        if SIGN_OFF_RE.match(stripped) and not any(INVOICE_MARKER_RE.search(rest) for rest in lines[index + 1:]):
+            return lines[:index]
+    return lines
+
+
+def _paragraphs(lines):
+    paragraph = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line.rstrip())
+        elif paragraph:
+            yield paragraph
+            paragraph = []
+    if paragraph:
+        yield paragraph
+
+
+def minimize_email(text):
+    """
+    Strip markup, quoted history, signatures and boilerplate from an email body.
+
+    Args:
+        text (str): Email body (plain text, possibly with HTML leftovers).
+
+    Returns:
+        tuple: (cleaned text, stats) where stats has chars_before, chars_after,
+            tokens_before and tokens_after.
+    """
+    original = text or ""
+    lines = strip_html(original.replace("\r\n", "\n")).split("\n")
+    lines = strip_quoted(lines)
+
+    paragraphs = []
+    for paragraph in _paragraphs(lines):
+        joined = "\n".join(paragraph)
+        if MOBILE_FOOTER_RE.match(joined.strip()):
+            continue
+        # Legal notices, unless they happen to carry an amount
+        if DISCLAIMER_RE.search(joined) and not INVOICE_MARKER_RE.search(joined):
+            continue
+        paragraphs.append("\n".join(" ".join(line.split()) for line in paragraph))
+
+    cleaned = "\n\n".join(paragraphs)
+    stats = {
+        "chars_before": len(original),
+        "chars_after": len(cleaned),
+        "tokens_before": estimate_tokens(original),
+        "tokens_after": estimate_tokens(cleaned),
+    }
+    return cleaned, stats
+
+
+def segment_email(text, max_chars=SEGMENT_CHARS):
+    """
+    Split a long (cleaned) email into segments of its invoice-bearing paragraphs.
+
+    Short emails come back whole. In a long one, only paragraphs with an
+    amount or a job number are kept, packed in order into segments of at
+    most max_chars; a paragraph longer than that is split between lines.
+    If no paragraph looks like an invoice, the text is returned whole for
+    the extractor to judge.
+
+    Returns:
+        list: Text segments.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    blocks = []
+    for paragraph in _paragraphs(text.split("\n")):
+        if any(INVOICE_MARKER_RE.search(line) for line in paragraph):
+            blocks.append("\n".join(paragraph))
+    if not blocks:
+        return [text]
+
+    # Break oversized paragraphs into pieces of whole lines
+    pieces = []
+    for block in blocks:
+        if len(block) <= max_chars:
+            pieces.append(block)
+            continue
+        piece = ""
+        for line in block.split("\n"):
+            if piece and len(piece) + 1 + len(line) > max_chars:
+                pieces.append(piece)
+                piece = ""
+            piece = f"{piece}\n{line}" if piece else line
+        pieces.append(piece)
+
+    segments = []
+    for piece in pieces:
+        if segments and len(segments[-1]) + 2 + len(piece) <= max_chars:
+            segments[-1] += "\n\n" + piece
+        else:
+            segments.append(piece)
+    return segments
+
+
+def log_payload_reduction(label, stats, output_dir=PERFORMANCE_LOG_DIR):
+    """
+    Record the prompt size saved on one email in the performance log.
+
+    Args:
+        label (str): Which email, e.g. the message file name.
+        stats (dict): The stats returned by minimize_email.
+        output_dir (str, optional): Directory of performance.log.
+    """
+    before = stats["tokens_before"]
+    after = stats["tokens_after"]
+    saved = 1 - after / before if before else 0.0
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_message = (f"PERF: {timestamp} | email_text.minimize_email | {label} | "
+                   f"Tokens: {before} -> {after} (-{saved:.0%}) | "
+                   f"Chars: {stats['chars_before']} -> {stats['chars_after']}")
+    write_performance_log(log_message, output_dir, log_to_console=False)
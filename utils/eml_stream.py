@@ -0,0 +1,291 @@
+"""
+Streaming ingestion of .eml files.
+
+The message is read line by line and never held in memory as a whole. Only
+the headers of each MIME part are parsed with the email package;
+attachment bodies are decoded (base64 / quoted-printable) a line at a time
+and written straight to disk, and the plain-text body is collected in the
+same single pass over the file.
+"""
+import binascii
+import logging
+import os
+from email import policy
+from email.parser import BytesHeaderParser
+
+# Longest line read at once; longer lines (binary parts) are read in pieces
+LINE_LIMIT = 1 << 16
+# Plain-text bodies longer than this are cut off, they are invoice emails
+MAX_BODY_BYTES = 8 << 20
+# Parts whose body is another email (forwarded as attachment)
+EMBEDDED_MESSAGE_TYPES = ("message/rfc822", "message/global")
+
+_header_parser = BytesHeaderParser(policy=policy.default)
+
+
+class _DiscardSink:
+    """Body sink for parts that are not kept."""
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+class _BytesSink:
+    """Collects a (small) body in memory, up to limit bytes."""
+
+    def __init__(self, limit=MAX_BODY_BYTES):
+        self.chunks = []
+        self.size = 0
+        self.limit = limit
+
+    def write(self, data):
+        if self.size < self.limit:
+            data = data[:self.limit - self.size]
+            self.chunks.append(data)
+            self.size += len(data)
+
+    def close(self):
+        pass
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+
+class _FileSink:
+    """Writes a body to path, via a temporary file renamed into place on close."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.file = open(self.tmp_path, "wb")
+        self.size = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        logging.info(f"Attachment {os.path.basename(self.path)} saved to {os.path.dirname(self.path)}.")
+
+
+class _Base64Decoder:
+    """
+    Decodes base64 a line at a time, carrying incomplete 4-character groups over.
+
+    A corrupt or truncated part is decoded up to the first group that cannot
+    be decoded; the rest of it is dropped with a warning, like
+    get_payload(decode=True) would, and the message is still read to the end.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.pending = b""
+        self.failed = False
+
+    def _decode(self, data):
+        try:
+            self.sink.write(binascii.a2b_base64(data))
+            return
+        except binascii.Error:
+            pass
+        # Keep the whole groups before the bad one
+        for start in range(0, len(data), 4):
+            try:
+                self.sink.write(binascii.a2b_base64(data[start:start + 4]))
+            except binascii.Error as e:
+                self.failed = True
+                name = os.path.basename(getattr(self.sink, "path", "")) or "message body"
+                logging.warning(f"Invalid base64 in {name}, dropping the rest of the part: {e}")
+                return
+
+    def write(self, line):
+        if self.failed:
+            return
+        data = self.pending + b"".join(line.split())
+        usable = len(data) - len(data) % 4
+        self.pending = data[usable:]
+        if usable:
+            self._decode(data[:usable])
+
+    def close(self):
+        data = self.pending.rstrip(b"=")
+        if data and not self.failed:
+            # Truncated final group: pad it rather than drop the bytes (one character holds no whole byte)
+            self._decode(data + b"=" * (-len(data) % 4))
+        self.sink.close()
+
+
+class _QuotedPrintableDecoder:
+    """Decodes quoted-printable a line at a time (soft line breaks included)."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write(self, line):
+        self.sink.write(binascii.a2b_qp(line))
+
+    def close(self):
+        self.sink.close()
+
+
+def _decoder(headers, sink):
+    encoding = (headers.get("Content-Transfer-Encoding") or "").strip().lower()
+    if isinstance(sink, _DiscardSink):
+        return sink
+    if encoding == "base64":
+        return _Base64Decoder(sink)
+    if encoding == "quoted-printable":
+        return _QuotedPrintableDecoder(sink)
+    return sink
+
+
+def _read_headers(fp):
+    lines = []
+    while True:
+        line = fp.readline(LINE_LIMIT)
+        if not line or line in (b"\r\n", b"\n"):
+            break
+        lines.append(line)
+    return _header_parser.parsebytes(b"".join(lines))
+
+
+def _match_boundary(line, delimiters):
+    """Return (delimiter, closing) if line is a boundary line of an enclosing multipart."""
+    if not line.startswith(b"--"):
+        return None
+    stripped = line.rstrip(b"\r\n \t")
+    for delimiter in reversed(delimiters):
+        if stripped == delimiter:
+            return delimiter, False
+        if stripped == delimiter + b"--":
+            return delimiter, True
+    return None
+
+
+def _copy_body(fp, delimiters, sink):
+    """
+    Copy lines into sink until a boundary line of an enclosing multipart.
+
+    The line break before a boundary belongs to the boundary, so each line
+    is held back until the next one shows whether it is the last.
+
+    Returns:
+        tuple: (delimiter, closing) of the boundary that ended the body, or
+            None at the end of the file.
+    """
+    pending = None
+    at_line_start = True
+    while True:
+        line = fp.readline(LINE_LIMIT)
+        if not line:
+            if pending is not None:
+                sink.write(pending)
+            sink.close()
+            return None
+        boundary = _match_boundary(line, delimiters) if at_line_start else None
+        if boundary:
+            if pending is not None:
+                sink.write(pending[:-2] if pending.endswith(b"\r\n") else pending.rstrip(b"\n"))
+            sink.close()
+            return boundary
+        if pending is not None:
+            sink.write(pending)
+        pending = line
+        at_line_start = line.endswith(b"\n")
+
+
+def _walk(fp, headers, delimiters, open_sink):
+    """Consume the body of one part described by headers, recursing into multiparts and embedded emails."""
+    encoding = (headers.get("Content-Transfer-Encoding") or "").strip().lower()
+    if headers.get_content_type() in EMBEDDED_MESSAGE_TYPES and encoding not in ("base64", "quoted-printable"):
+        # A forwarded or attached email: its body is a whole message, walk its parts too
+        return _walk(fp, _read_headers(fp), delimiters, open_sink)
+
+    boundary = headers.get_boundary() if headers.get_content_maintype() == "multipart" else None
+    if not boundary:
+        return _copy_body(fp, delimiters, _decoder(headers, open_sink(headers)))
+
+    delimiter = b"--" + boundary.encode("ascii", "replace")
+    inner = delimiters + [delimiter]
+    # Preamble up to the first boundary
+    ended = _copy_body(fp, inner, _DiscardSink())
+    while ended and ended[0] == delimiter and not ended[1]:
+        ended = _walk(fp, _read_headers(fp), inner, open_sink)
+    if ended and ended[0] == delimiter:
+        # Epilogue after the closing boundary, up to the enclosing part's next boundary
+        return _copy_body(fp, delimiters, _DiscardSink())
+    # End of file, or a malformed part closed by an outer boundary
+    return ended
+
+
+def safe_attachment_name(filename):
+    """Strip any directory parts from an attachment filename."""
+    name = os.path.basename(filename.replace("\\", "/")).strip()
+    return name or "attachment"
+
+
+def ingest_eml(eml_path, attachment_dir):
+    """
+    Extract the plain-text body and save the attachments of an .eml file in one pass.
+
+    Attachments (Content-Disposition: attachment with a filename) are decoded
+    while they are read and written to attachment_dir under their filename;
+    memory use does not depend on their size. The body is the first
+    text/plain part that is not an attachment, or the whole body of a
+    single-part text message.
+
+    Args:
+        eml_path (str): Path to the .eml file.
+        attachment_dir (str): Directory the attachments are saved in.
+
+    Returns:
+        dict: {"subject": str, "body": str or None, "attachments": [saved paths]}
+    """
+    os.makedirs(attachment_dir, exist_ok=True)
+    result = {"subject": None, "body": None, "attachments": []}
+    body_sink = []
+
+    def open_sink(headers):
+        filename = headers.get_filename()
+        if headers.get_content_disposition() == "attachment" and filename:
+            name = safe_attachment_name(filename)
+            path = os.path.join(attachment_dir, name)
+            # Two attachments with the same name in one message are both kept
+            base, ext = os.path.splitext(name)
+            counter = 2
+            while path in result["attachments"]:
+                path = os.path.join(attachment_dir, f"{base} ({counter}){ext}")
+                counter += 1
+            result["attachments"].append(path)
+            return _FileSink(path)
+        if headers.get_content_type() == "text/plain" and not body_sink:
+            sink = _BytesSink()
+            body_sink.append((sink, headers.get_content_charset() or "utf-8"))
+            return sink
+        return _DiscardSink()
+
+    with open(eml_path, "rb") as fp:
+        headers = _read_headers(fp)
+        result["subject"] = headers.get("Subject")
+        if headers.get_content_maintype() == "text" and headers.get_content_type() != "text/plain":
+            # Single-part HTML or other text: keep it as the body like get_content() would
+            sink = _BytesSink()
+            body_sink.append((sink, headers.get_content_charset() or "utf-8"))
+            _copy_body(fp, [], _decoder(headers, sink))
+        else:
+            _walk(fp, headers, [], open_sink)
+
+    if body_sink:
+        sink, charset = body_sink[0]
+        try:
+            text = sink.getvalue().decode(charset, errors="replace")
+        except LookupError:
+            text = sink.getvalue().decode("utf-8", errors="replace")
+        # Normalize line endings like the email package does
+        result["body"] = text.replace("\r\n", "\n")
+    return result
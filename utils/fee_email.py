@@ -0,0 +1,150 @@
+"""
+Rule-based extraction of standard fee emails.
+
+Our fee emails list one invoice per line, e.g.
+
+    Radio spot production - $1,250.00 - Job: TTC-380
+    Billboard design $450.00 (Job #212)
+    Total: $1,700.00
+
+Lines like these are read with precompiled patterns into the same
+Description / Amount / JobNumber dicts the DSPy invoice_extractor returns.
+The result is only trusted when the whole email fits the layout: short
+item lines that end with the amount or carry a job label, job numbers on
+the items, little prose. Anything else is reported as a problem so the
+caller falls back to DSPy.
+"""
+import re
+
+from utils.job_numbers import extract_job_number
+
+# "$1,250.00", "$ 450", "$1250.5"; credits "-$100.00", "$-100.00" and "($200.00)"
+DOLLAR_AMOUNT_RE = re.compile(
+    r"(?:(?P<open>\()\s*|(?P<minus>[-−])(?=\$))?"
+    r"\$\s*(?P<inner_minus>[-−])?\s*(?P<whole>\d{1,3}(?:,\d{3})+|\d+)(?P<fraction>\.\d{1,2})?(?![\d,])"
+    r"(?(open)\s*\))"
+)
+# A money-looking number without a dollar sign: "1,250.00"
+BARE_AMOUNT_RE = re.compile(r"(?<![\d$.,])\d{1,3}(?:,\d{3})*\.\d{2}(?![\d.])")
+JOB_LABEL_RE = re.compile(r"\bjob\s*(?:[:;#]|number|no\b)", re.IGNORECASE)
+TOTAL_RE = re.compile(r"^(?:grand\s+|sub\s*)?total\b", re.IGNORECASE)
+LEADING_BULLET_RE = re.compile(r"^\s*(?:[-*•·]+|\d{1,2}[.)])\s+")
+# "Amount:" style labels and the separators left around a removed amount
+AMOUNT_LABEL_RE = re.compile(r"\b(?:amount|amt)\s*[:=]?\s*$", re.IGNORECASE)
+SEPARATORS = " \t-–—:|=@.,;"
+MIN_DESCRIPTION_LETTERS = 3
+# Item lines are short labels, not sentences: "Attached is the statement. The balance due is $4,500.00"
+MAX_DESCRIPTION_WORDS = 8
+SENTENCE_RE = re.compile(r"[.!?]\s+\S|\b(?:is|are|was|were|been|will|would|should|please|attached|see)\b", re.IGNORECASE)
+# What may follow the amount on an item line: separators, a job label and number, brackets
+AMOUNT_TAIL_RE = re.compile(r"^[\s\-–—:|,;()\[\]]*(?:job\s*(?:[:;#]|number|no\b)?\s*[#:]?\s*[\w-]+)?[\s)\]]*\.?$", re.IGNORECASE)
+# Lines of prose (no amount, more than PROSE_WORDS words) a fee email may have
+PROSE_WORDS = 6
+MAX_PROSE_LINES = 3
+# Share of the non-blank lines that must be item or total lines
+MIN_ITEM_LINE_SHARE = 0.3
+
+
+def _cents(match):
+    whole = match.group("whole").replace(",", "")
+    fraction = (match.group("fraction") or ".00")[1:].ljust(2, "0")
+    cents = int(whole) * 100 + int(fraction)
+    negative = match.group("open") or match.group("minus") or match.group("inner_minus")
+    return -cents if negative else cents
+
+
+def _format_amount(cents):
+    sign = "-" if cents < 0 else ""
+    return f"{sign}${abs(cents) // 100:,}.{abs(cents) % 100:02d}"
+
+
+def _clean_description(text):
+    text = LEADING_BULLET_RE.sub("", text)
+    text = " ".join(text.split()).strip(SEPARATORS)
+    text = AMOUNT_LABEL_RE.sub("", text)
+    # Empty brackets left by a removed job number, e.g. "()"
+    text = re.sub(r"\(\s*\)|\[\s*\]", "", text)
+    return " ".join(text.split()).strip(SEPARATORS)
+
+
+def parse_fee_email(text):
+    """
+    Extract the invoice lines of a standard fee email.
+
+    Args:
+        text (str): Plain-text email body.
+
+    Returns:
+        tuple: (invoices, problems). invoices is a list of dicts with
+            Description, Amount and JobNumber, like the DSPy extractor's
+            output. problems lists the reasons the email does not fit the
+            standard layout; use the invoices only if it is empty.
+    """
+    invoices = []
+    problems = []
+    totals = []
+    lines = 0
+    prose_lines = 0
+
+    for number, raw_line in enumerate((text or "").splitlines(), start=1):
+        line = raw_line.strip()
+        if not line or line.startswith(">"):
+            # Quoted reply history is never billed
+            continue
+        lines += 1
+
+        amounts = list(DOLLAR_AMOUNT_RE.finditer(line))
+        if not amounts:
+            if BARE_AMOUNT_RE.search(line):
+                problems.append(f"line {number}: amount without a dollar sign")
+            elif JOB_LABEL_RE.search(line):
+                problems.append(f"line {number}: job number on a line without an amount")
+            elif len(line.split()) > PROSE_WORDS:
+                prose_lines += 1
+            continue
+        if len(amounts) > 1:
+            problems.append(f"line {number}: more than one amount")
+            continue
+
+        amount = amounts[0]
+        rest = line[:amount.start()] + " " + line[amount.end():]
+        if BARE_AMOUNT_RE.search(rest):
+            problems.append(f"line {number}: more than one amount")
+            continue
+
+        job_number, description = extract_job_number(_clean_description(line[:amount.start()]) + " " + line[amount.end():])
+        description = _clean_description(description)
+        if TOTAL_RE.match(description):
+            totals.append(_cents(amount))
+            continue
+        if sum(char.isalpha() for char in description) < MIN_DESCRIPTION_LETTERS:
+            problems.append(f"line {number}: no description next to the amount")
+            continue
+        # Positive evidence of an item line: the amount ends the line (bar a job
+        # number) or sits next to a job label, after a short label-like description
+        if not (AMOUNT_TAIL_RE.match(line[amount.end():]) or job_number):
+            problems.append(f"line {number}: text after the amount")
+            continue
+        if len(description.split()) > MAX_DESCRIPTION_WORDS or SENTENCE_RE.search(description):
+            problems.append(f"line {number}: reads like a sentence, not an invoice line")
+            continue
+
+        invoices.append({
+            "Description": description,
+            "Amount": _format_amount(_cents(amount)),
+            "JobNumber": job_number,
+            "_cents": _cents(amount),
+        })
+
+    if not invoices and not problems:
+        problems.append("no invoice lines found")
+    if invoices and not any(invoice["JobNumber"] for invoice in invoices):
+        problems.append("no job numbers on the invoice lines")
+    if prose_lines > MAX_PROSE_LINES:
+        problems.append(f"{prose_lines} lines of prose")
+    if lines and (len(invoices) + len(totals)) / lines < MIN_ITEM_LINE_SHARE:
+        problems.append(f"only {len(invoices) + len(totals)} of {lines} lines are invoice lines")
+    item_total = sum(invoice.pop("_cents") for invoice in invoices)
+    if totals and totals[-1] != item_total:
+        problems.append(f"lines add up to {_format_amount(item_total)}, email total is {_format_amount(totals[-1])}")
+    return invoices, problems
@@ -0,0 +1,22 @@
+"""
+File hashing helpers for the Billing PDF Automation project.
+"""
+import hashlib
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """
+    Return the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path (str): File to hash.
+        chunk_size (int, optional): Read size in bytes. Defaults to 1 MiB.
+
+    Returns:
+        str: Hex digest.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
@@ -0,0 +1,73 @@
+"""
+Job number extraction for invoice descriptions.
+
+All job number formats are matched by one precompiled alternation, so a
+description is scanned once and the job number and the cleaned description
+come out of the same pass.
+"""
+import re
+
+# One alternation with named groups. The group that matched tells which format
+# was found; when several formats occur in a description the priority is
+# labeled > bare > numeric:
+#   labeled: "JOB: TTC-380", "Job; TTC 380"
+#   numeric: "Job #380"
+#   bare:    "TTC-380", "TTC 380" standalone
+# The shared "\b" and "job" prefixes are factored out and the case folding is
+# spelled out in the character classes, which keeps the scan cheap at the
+# positions where nothing can match.
+JOB_NUMBER_RE = re.compile(
+    r"\b(?:"
+    r"[Jj][Oo][Bb]\s*[:;#]\s*(?:(?P<labeled>[A-Za-z]{2,4}[-\s]*\d{2,4})|(?P<numeric>\d{2,4}))"
+    r"|(?P<bare>[A-Za-z]{2,4}[-\s]*\d{2,4})"
+    r")\b"
+)
+GROUP_PRIORITY = ("labeled", "bare", "numeric")
+
+# Rare fallback when nothing above matched, e.g. "(JOB:-12)"
+PARENS_JOB_RE = re.compile(r"\(\s*JOB\s*[:;#]?\s*([A-Za-z]{0,4}[-\s]*\d{2,4})\s*\)", re.IGNORECASE)
+PARENS_SECTION_RE = re.compile(r"\(\s*JOB.*?\)", re.IGNORECASE)
+
+
+def extract_job_number(description):
+    """
+    Extract the job number from a description and remove it from the text.
+
+    The first match of the highest-priority format is the job number, and every
+    match of that format is removed from the description.
+
+    Args:
+        description (str): Invoice description.
+
+    Returns:
+        tuple: (job_number, cleaned_description). job_number is "" if none was found.
+    """
+    if not description:
+        return "", description
+
+    matches = [*JOB_NUMBER_RE.finditer(description)]
+    if matches:
+        group = matches[0].lastgroup
+        if any(match.lastgroup != group for match in matches):
+            group = min({match.lastgroup for match in matches}, key=GROUP_PRIORITY.index)
+            matches = [match for match in matches if match.lastgroup == group]
+
+        job_number = matches[0].group(group)
+        pieces = []
+        last_end = 0
+        for match in matches:
+            pieces.append(description[last_end:match.start()])
+            last_end = match.end()
+        pieces.append(description[last_end:])
+        clean_desc = "".join(pieces)
+    else:
+        job_number = ""
+        clean_desc = description
+        parens_match = PARENS_JOB_RE.search(description)
+        if parens_match:
+            job_number = parens_match.group(1)
+            clean_desc = PARENS_SECTION_RE.sub("", description)
+
+    # Collapse whitespace left behind by the removed job numbers
+    return job_number, " ".join(clean_desc.split())
+
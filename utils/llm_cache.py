@@ -0,0 +1,297 @@
+"""
+Persistent cache for LLM responses, shared by every DSPy and OpenAI call site.
+
+Responses are stored in a SQLite file keyed by a hash of (model, prompt,
+inputs), so re-running a batch, or processing the same email or PDF
+again, does not pay for the same call twice. Entries expire after a TTL,
+the least recently used entries are evicted once the cache grows past a
+size limit, and hits and misses are counted per call site.
+
+Settings (environment):
+    LLM_CACHE_PATH      cache file (default: cache/llm_cache.db)
+    LLM_CACHE_TTL       entry lifetime in seconds (default: 30 days)
+    LLM_CACHE_MAX_MB    size limit of the stored responses (default: 100)
+    LLM_CACHE_DISABLED  set to 1 to always call the model
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+DEFAULT_CACHE_PATH = os.path.join(os.getcwd(), "cache", "llm_cache.db")
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at);
+CREATE TABLE IF NOT EXISTS llm_cache_stats (
+    name TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def make_key(model, prompt, inputs):
+    """SHA-256 of the model, the prompt and the JSON-serialized inputs."""
+    payload = json.dumps([model, prompt, inputs], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed response cache; safe to share between threads.
+
+    Args:
+        path (str): Cache database file.
+        ttl_seconds (float): Entries older than this are recomputed.
+        max_bytes (int): Stored responses are kept below this total size.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self._conn.executescript(SCHEMA)
+
+    def _count(self, name, hit):
+        column = "hits" if hit else "misses"
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._conn.execute(
+            f"INSERT INTO llm_cache_stats (name, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(name) DO UPDATE SET {column} = {column} + 1",
+            (name,)
+        )
+
+    def get(self, key, name="llm"):
+        """
+        Return (True, value) for a fresh entry, else (False, None). Counts a hit or a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] < self.ttl_seconds:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._count(name, True)
+                return True, json.loads(row[0])
+            self._count(name, False)
+            return False, None
+
+    def set(self, key, value, name="llm", model=""):
+        """Store a JSON-serializable value, then evict to stay within max_bytes."""
+        response = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, name, model, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, name, model, response, len(response.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop the least recently used entries until the rest fits
+        excess = total - self.max_bytes
+        keys = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", keys)
+        logging.debug(f"LLM cache: evicted {len(keys)} least recently used entr(ies)")
+
+    def cached(self, name, model, prompt, inputs, compute):
+        """
+        Return the cached response for (model, prompt, inputs), calling compute() on a miss.
+
+        Args:
+            name (str): Call site, for the hit-rate statistics.
+            model (str): Model identifier.
+            prompt: Prompt text or template; a change invalidates the entries.
+            inputs: JSON-serializable call inputs.
+            compute (callable): Makes the call; its result must be JSON-serializable.
+        """
+        key = make_key(model, prompt, inputs)
+        found, value = self.get(key, name)
+        if found:
+            logging.debug(f"LLM cache hit for {name}")
+            return value
+        value = compute()
+        self.set(key, value, name, model)
+        return value
+
+    def stats(self):
+        """Hit/miss counts per call site and in total, with hit rates and the cache size."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, hits, misses FROM llm_cache_stats ORDER BY name").fetchall()
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+
+        def rate(hits, misses):
+            return round(hits / (hits + misses), 3) if hits + misses else 0.0
+
+        sites = {name: {"hits": hits, "misses": misses, "hit_rate": rate(hits, misses)} for name, hits, misses in rows}
+        hits = sum(site["hits"] for site in sites.values())
+        misses = sum(site["misses"] for site in sites.values())
+        return {
+            "hits": hits, "misses": misses, "hit_rate": rate(hits, misses),
+            "session_hit_rate": rate(self.hits, self.misses),
+            "entries": entries, "bytes": size, "sites": sites,
+        }
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.execute("DELETE FROM llm_cache_stats")
+
+    def close(self):
+        self._conn.close()
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """The process-wide cache configured from the environment, or None if disabled."""
+    global _shared_cache
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache(
+                os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                int(float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024),
+            )
+        return _shared_cache
+
+
+def _signature_prompt(predictor):
+    signature = getattr(predictor, "signature", None)
+    if signature is None:
+        return repr(predictor)
+    fields = {
+        name: getattr(field, "json_schema_extra", None) or str(field)
+        for name, field in getattr(signature, "fields", {}).items()
+    }
+    return {"signature": getattr(signature, "__name__", ""), "instructions": getattr(signature, "instructions", ""),
+            "fields": fields}
+
+
+class CachedPredictor:
+    """
+    Wrap a DSPy predictor (e.g. dspy.Predict(ExtractInvoiceInfo)) with the persistent cache.
+
+    Calls take the same keyword inputs and return an object with the same
+    output attributes (response.invoices, response.city, ...).
+
+    Args:
+        predictor: The DSPy module to call on a miss.
+        name (str): Call site name for the statistics.
+        model (str): Model identifier, part of the cache key.
+        outputs (iterable): Output field names to cache.
+        cache (LLMCache, optional): Defaults to get_llm_cache().
+    """
+
+    def __init__(self, predictor, name, model, outputs, cache=None):
+        self.predictor = predictor
+        self.name = name
+        self.model = model
+        self.outputs = tuple(outputs)
+        self.cache = cache
+        self.prompt = _signature_prompt(predictor)
+
+    def __call__(self, **inputs):
+        cache = self.cache or get_llm_cache()
+
+        def compute():
+            response = self.predictor(**inputs)
+            return {field: getattr(response, field) for field in self.outputs}
+
+        if cache is None:
+            return SimpleNamespace(**compute())
+        return SimpleNamespace(**cache.cached(self.name, self.model, self.prompt, inputs, compute))
+
+
+def cached_chat_completion(client, name, cache=None, **request):
+    """
+    client.chat.completions.create(**request) through the cache; returns the message content.
+
+    The whole request (model, messages including any images, max_tokens, ...)
+    is the cache key, so a different prompt or image is a different entry.
+    """
+    cache = cache or get_llm_cache()
+
+    def compute():
+        response = client.chat.completions.create(**request)
+        return response.choices[0].message.content
+
+    if cache is None:
+        return compute()
+    model = request.get("model", "")
+    prompt = {key: value for key, value in request.items() if key not in ("model", "messages")}
+    return cache.cached(name, model, prompt, request.get("messages"), compute)
+
+
+def log_cache_stats(cache=None):
+    """Log the hit rate of this run and of the cache's lifetime."""
+    cache = cache or get_llm_cache()
+    if cache is None:
+        return
+    stats = cache.stats()
+    logging.info(
+        f"LLM cache: {cache.hits} hit(s), {cache.misses} miss(es) this run "
+        f"(hit rate {stats['session_hit_rate']:.0%}); lifetime hit rate {stats['hit_rate']:.0%}, "
+        f"{stats['entries']} entr(ies), {stats['bytes'] / 1024:.0f} KB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or clear the persistent LLM response cache.")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached responses and statistics.")
+    args = parser.parse_args()
+
+    cache = LLMCache(os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH))
+    if args.clear:
+        cache.clear()
+        print("LLM cache cleared.")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Bulk ingestion of a billing inbox: an mbox file, a Maildir or a folder of .eml files.
+
+Messages are parsed in a process pool with utils.eml_stream.ingest_eml, each
+into its own incoming directory. The attachments then go through the
+content-addressed AttachmentStore, which places each distinct file in the
+working directory once, so a PDF that was sent in several emails is
+processed once.
+"""
+import glob
+import logging
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.attachment_store import AttachmentStore
+from utils.eml_stream import ingest_eml
+
+INCOMING_SUBDIR = ".incoming"
+STORE_SUBDIR = ".attachment_store"
+
+# mboxrd escaping: a body line "From ..." is stored as ">From ...", ">From" as ">>From", ...
+MBOX_ESCAPED_FROM_RE = re.compile(rb"^>(>*From )")
+
+
+def split_mbox(mbox_path, spool_dir):
+    """
+    Split an mbox file into one .eml file per message, streaming line by line.
+
+    Like the mailbox module, every line starting with "From " begins a new
+    message; escaped ">From " lines in the bodies are unescaped.
+
+    Returns:
+        list: Paths of the .eml files, in mailbox order.
+    """
+    paths = []
+    out = None
+    with open(mbox_path, "rb") as mbox:
+        for line in mbox:
+            if line.startswith(b"From "):
+                if out:
+                    out.close()
+                path = os.path.join(spool_dir, f"message_{len(paths) + 1:05d}.eml")
+                paths.append(path)
+                out = open(path, "wb")
+                continue
+            if out:
+                out.write(MBOX_ESCAPED_FROM_RE.sub(rb"\1", line))
+    if out:
+        out.close()
+    return paths
+
+
+def is_mbox(path):
+    """True if the file starts like an mbox: a "From " separator line before any header."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                return line.startswith(b"From ")
+    return False
+
+
+def find_message_files(source, spool_dir):
+    """
+    Message files of a mailbox source, in a stable order.
+
+    Args:
+        source (str): An mbox file, a Maildir (directory with cur/ and new/),
+            a directory of .eml files, or a single message file (any name).
+        spool_dir (str): Where an mbox is split into .eml files.
+    """
+    if os.path.isdir(source):
+        if os.path.isdir(os.path.join(source, "cur")) and os.path.isdir(os.path.join(source, "new")):
+            return sorted(
+                path
+                for subdir in ("new", "cur")
+                for path in glob.glob(os.path.join(source, subdir, "*"))
+                if os.path.isfile(path) and not os.path.basename(path).startswith(".")
+            )
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(".eml") and os.path.isfile(os.path.join(source, name))
+        )
+    if source.lower().endswith(".eml") or not is_mbox(source):
+        return [source]
+    return split_mbox(source, spool_dir)
+
+
+def _ingest_message(task):
+    # Runs in a worker process
+    eml_path, incoming_dir = task
+    try:
+        result = ingest_eml(eml_path, incoming_dir)
+    except Exception as e:
+        logging.error(f"Could not parse {eml_path}: {e}")
+        result = {"subject": None, "body": None, "attachments": [], "error": str(e)}
+    result["source"] = eml_path
+    return result
+
+
+def collect_attachments(results, attachment_dir, store):
+    """
+    Move the attachments of parsed messages into the store and attachment_dir.
+
+    Each distinct content is placed in attachment_dir once (see
+    AttachmentStore.collect); result["attachments"] is updated in place to
+    the placed files.
+
+    Returns:
+        int: Number of duplicate attachments dropped.
+    """
+    duplicates_before = store.duplicates
+    for result in results:
+        result["attachments"] = store.collect(result["attachments"], attachment_dir)
+    return store.duplicates - duplicates_before
+
+
+def get_attachment_store(attachment_dir):
+    """The attachment store kept inside the working directory."""
+    return AttachmentStore(os.path.join(attachment_dir, STORE_SUBDIR))
+
+
+def ingest_mailbox(source, attachment_dir, workers=None):
+    """
+    Parse every message of a mailbox and collect the attachments, deduplicated.
+
+    Args:
+        source (str): mbox file, Maildir, directory of .eml files or one .eml file.
+        attachment_dir (str): Working directory the attachments end up in.
+        workers (int, optional): Worker processes; defaults to the CPU count.
+            1 parses in this process.
+
+    Returns:
+        list: One dict per message, in mailbox order, with the keys of
+            ingest_eml() plus "source" (the message file).
+    """
+    os.makedirs(attachment_dir, exist_ok=True)
+    incoming_root = os.path.join(attachment_dir, INCOMING_SUBDIR)
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        message_files = find_message_files(source, spool_dir)
+        split_from_mbox = os.path.isfile(source) and message_files != [source]
+        logging.info(f"Ingesting {len(message_files)} message(s) from {source}")
+        tasks = [
+            (path, os.path.join(incoming_root, f"{index:05d}"))
+            for index, path in enumerate(message_files)
+        ]
+        try:
+            if workers == 1 or len(tasks) <= 1:
+                results = [_ingest_message(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(_ingest_message, tasks))
+            duplicates = collect_attachments(results, attachment_dir, get_attachment_store(attachment_dir))
+        finally:
+            shutil.rmtree(incoming_root, ignore_errors=True)
+
+    if split_from_mbox:
+        # Spooled mbox messages are gone with the temporary directory
+        for index, result in enumerate(results):
+            result["source"] = f"{source}#{index + 1}"
+
+    attachments = sum(len(result["attachments"]) for result in results)
+    logging.info(f"Ingested {len(results)} message(s): {attachments} attachment(s) kept, "
+                 f"{duplicates} duplicate(s) dropped")
+    return results
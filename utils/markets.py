@@ -0,0 +1,81 @@
+"""
+Market name canonicalization.
+
+Known spellings of each market are expanded once, at import, into an alias
+dictionary keyed by a normalized form of the name. Resolving a market is a
+dictionary lookup on that key, and the canonical name is what gets stored in
+the database, so later lookups can compare names exactly.
+"""
+import re
+
+FORT_PAYNE = "Fort Payne"
+
+# Canonical market name -> spellings seen on invoices, PDFs and emails
+MARKET_SPELLINGS = {
+    FORT_PAYNE: ("Fort Payne", "Ft. Payne", "Ft Payne", "FortPayne", "FtPayne"),
+}
+
+# Punctuation and runs of whitespace do not distinguish markets:
+# "Ft. Payne", "ft payne" and "FT  PAYNE" share the key "ft payne"
+NON_WORD_RE = re.compile(r"[^\w\s]+")
+
+
+def market_key(name):
+    """Normalized lookup key of a market name: lowercase words separated by single spaces."""
+    if not name:
+        return ""
+    return " ".join(NON_WORD_RE.sub(" ", str(name).lower()).split())
+
+
+def _build_alias_index(spellings):
+    aliases = {}
+    for canonical, names in spellings.items():
+        for name in (canonical, *names):
+            key = market_key(name)
+            aliases[key] = canonical
+            # "FortPayne" style spellings without the space
+            aliases[key.replace(" ", "")] = canonical
+    return aliases
+
+
+MARKET_ALIASES = _build_alias_index(MARKET_SPELLINGS)
+MAX_ALIAS_WORDS = max(len(key.split()) for key in MARKET_ALIASES)
+
+
+def canonical_market(name, contains=True):
+    """
+    Return the canonical spelling of a market name.
+
+    A name that is, or contains as whole words, a known alias resolves to that
+    market: "Ft. Payne" and "Ft Payne - Hwy 35" both give "Fort Payne".
+    Unknown names are returned stripped but otherwise unchanged.
+
+    Args:
+        name (str): Market name as written on the invoice.
+        contains (bool): Also resolve names that contain an alias. Pass False
+            for free-text descriptions, which must only change on an exact match.
+
+    Returns:
+        str: Canonical market name.
+    """
+    if not name:
+        return name
+    key = market_key(name)
+    canonical = MARKET_ALIASES.get(key) or MARKET_ALIASES.get(key.replace(" ", ""))
+    if canonical:
+        return canonical
+    if not contains:
+        return name.strip() if isinstance(name, str) else name
+
+    words = key.split()
+    for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+        for start in range(len(words) - size + 1):
+            canonical = MARKET_ALIASES.get(" ".join(words[start:start + size]))
+            if canonical:
+                return canonical
+    return name.strip() if isinstance(name, str) else name
+
+
+def is_fort_payne(market_desc):
+    """Check if a market description refers to Fort Payne using any of its known spellings."""
+    return canonical_market(market_desc) == FORT_PAYNE
@@ -0,0 +1,171 @@
+"""
+Direct PDF output for the final billing package.
+
+PdfBillingDocument mirrors the small part of the python-docx Document API that
+create_word_document uses (add_paragraph, add_page_break, add_picture, save),
+so the same assembly loop can write the package straight to PDF with PyMuPDF
+instead of going through a DOCX and a Word conversion.
+"""
+import logging
+import os
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from utils.file_hash import file_digest
+
+# US Letter with the default margins of the python-docx template
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN_TOP = 72
+MARGIN_BOTTOM = 72
+MARGIN_LEFT = 90
+MARGIN_RIGHT = 90
+
+# python-docx lengths are stored in EMU; 12700 EMU == 1 point
+EMU_PER_POINT = 12700
+
+FONT_NAME = "cour"  # Built-in Courier, matches the DOCX output
+DEFAULT_FONT_SIZE = 9
+LINE_HEIGHT_FACTOR = 1.2
+
+
+class PdfBillingDocument:
+    """
+    Lays out invoice text and backup images directly into a PDF.
+
+    Page breaks behave like they do in Word: content after a break starts on a
+    new page, and two breaks in a row leave a blank page. A trailing break at
+    the end of the document does not add an empty last page.
+
+    Identical images (by content hash) are embedded once and every further
+    occurrence references the same image XObject.
+    """
+
+    def __init__(self):
+        self.doc = fitz.open()
+        self.page = None
+        self.cursor_y = MARGIN_TOP
+        self.pending_breaks = 0
+        # sha256 -> (xref, (width_px, height_px))
+        self.image_xrefs = {}
+        self.images_embedded = 0
+        self.images_reused = 0
+
+    @property
+    def usable_width(self):
+        return PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+
+    @property
+    def usable_height(self):
+        return PAGE_HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+
+    def _new_page(self):
+        self.page = self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        self.cursor_y = MARGIN_TOP
+
+    def _ensure_page(self, needed_height):
+        """Apply pending page breaks and make sure needed_height fits on the page."""
+        if self.page is None:
+            self._new_page()
+            # A break before any content does not produce a blank first page
+            self.pending_breaks = max(0, self.pending_breaks - 1)
+        while self.pending_breaks:
+            self._new_page()
+            self.pending_breaks -= 1
+        at_top = self.cursor_y == MARGIN_TOP
+        if not at_top and self.cursor_y + needed_height > PAGE_HEIGHT - MARGIN_BOTTOM:
+            self._new_page()
+
+    def add_paragraph(self, text="", alignment="left", font_size=DEFAULT_FONT_SIZE):
+        """
+        Write one line of text at the current position.
+
+        Args:
+            text (str): Line to write. An empty string just advances one line.
+            alignment (str): "left", "center" or "right".
+            font_size (float): Font size in points.
+        """
+        line_height = font_size * LINE_HEIGHT_FACTOR
+        self._ensure_page(line_height)
+
+        if text:
+            text_width = fitz.get_text_length(text, fontname=FONT_NAME, fontsize=font_size)
+            if alignment == "center":
+                x = MARGIN_LEFT + (self.usable_width - text_width) / 2
+            elif alignment == "right":
+                x = PAGE_WIDTH - MARGIN_RIGHT - text_width
+            else:
+                x = MARGIN_LEFT
+            # insert_text positions the baseline, so drop by the font size
+            self.page.insert_text(
+                (max(x, MARGIN_LEFT), self.cursor_y + font_size),
+                text,
+                fontname=FONT_NAME,
+                fontsize=font_size,
+            )
+
+        self.cursor_y += line_height
+
+    def add_page_break(self):
+        self.pending_breaks += 1
+
+    def add_picture(self, image_path, width=None):
+        """
+        Place an image at the current position, scaled to width.
+
+        Args:
+            image_path (str): Path of the PNG/JPEG to insert.
+            width (int, optional): python-docx style length in EMU (e.g.
+                Inches(6)) so call sites shared with the DOCX backend can pass
+                the same value. Defaults to the full usable width.
+        """
+        digest = file_digest(image_path)
+        cached = self.image_xrefs.get(digest)
+        if cached:
+            xref, (px_width, px_height) = cached
+        else:
+            with Image.open(image_path) as img:
+                px_width, px_height = img.size
+            xref = 0
+
+        target_width = width / EMU_PER_POINT if width else self.usable_width
+        target_width = min(target_width, self.usable_width)
+        target_height = target_width * px_height / px_width
+        if target_height > self.usable_height:
+            target_width *= self.usable_height / target_height
+            target_height = self.usable_height
+
+        self._ensure_page(target_height)
+        rect = fitz.Rect(
+            MARGIN_LEFT,
+            self.cursor_y,
+            MARGIN_LEFT + target_width,
+            self.cursor_y + target_height,
+        )
+
+        if xref:
+            self.page.insert_image(rect, xref=xref)
+            self.images_reused += 1
+            logging.debug(f"Reused embedded image xref {xref} for {image_path}")
+        else:
+            xref = self.page.insert_image(rect, filename=image_path)
+            self.image_xrefs[digest] = (xref, (px_width, px_height))
+            self.images_embedded += 1
+            logging.debug(f"Embedded image {image_path} as xref {xref}")
+
+        self.cursor_y += target_height
+
+    def save(self, output_path):
+        """Write the PDF to output_path, dropping unused objects and compressing streams."""
+        if self.page is None:
+            self._new_page()
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        self.doc.save(output_path, garbage=3, deflate=True)
+        logging.info(
+            f"Saved PDF {output_path}: {self.doc.page_count} pages, "
+            f"{self.images_embedded} images embedded, {self.images_reused} reused"
+        )
+
+    def close(self):
+        self.doc.close()
@@ -0,0 +1,374 @@
+"""
+Deterministic matching of invoice DataFrame records to database records.
+
+Each DataFrame record is compared only with the database records whose
+amount is close to its own (blocking), and each candidate pair is scored on
+market-name similarity and amount proximity. Pairs are assigned one-to-one,
+best score first. A record is confidently matched only when its best pair
+clearly beats every competing pair; everything else is the ambiguous
+residue, which is left for the LLM matcher.
+
+The residue is sent to the LLM in chunks of records that can match each
+other (same market or nearby amount), several chunks at a time, and the
+partial results are merged back into one one-to-one assignment.
+"""
+import difflib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.amount_index import AmountIndex
+from utils.amounts import parse_amount_cents
+from utils.markets import canonical_market, market_key
+
+# Amounts within max(DEFAULT_TOLERANCE_CENTS, DEFAULT_TOLERANCE_RATIO * amount) are candidates
+DEFAULT_TOLERANCE_CENTS = 100
+DEFAULT_TOLERANCE_RATIO = 0.02
+# Share of the pair score that comes from the market name; the rest is amount proximity
+MARKET_WEIGHT = 0.7
+# A pair needs at least ACCEPT_SCORE, and a lead of AMBIGUITY_MARGIN over any
+# competing pair for the same records, to be matched without the LLM
+ACCEPT_SCORE = 0.8
+AMBIGUITY_MARGIN = 0.02
+# The LLM also sees database records this far off in amount (same market: any amount)
+LLM_TOLERANCE_RATIO = 0.10
+# DataFrame records per LLM call, and LLM calls in flight at once
+DEFAULT_CHUNK_SIZE = 20
+DEFAULT_LLM_WORKERS = 4
+# Key added to the DataFrame records sent to the LLM, to trace matches back to them
+RECORD_ID_FIELD = "record_id"
+
+
+def market_similarity(a, b):
+    """
+    Similarity of two market names between 0.0 and 1.0.
+
+    Spellings of the same market (utils.markets) score 1.0; other names are
+    compared on their normalized market_key with difflib's ratio.
+    """
+    if not a or not b:
+        return 0.0
+    canonical_a, canonical_b = canonical_market(a), canonical_market(b)
+    key_a, key_b = market_key(canonical_a), market_key(canonical_b)
+    if key_a == key_b:
+        return 1.0
+    return difflib.SequenceMatcher(None, key_a, key_b).ratio()
+
+
+def amount_tolerance(cents, tolerance_cents=DEFAULT_TOLERANCE_CENTS, tolerance_ratio=DEFAULT_TOLERANCE_RATIO):
+    """Largest amount difference, in cents, for which two amounts are candidates."""
+    return max(tolerance_cents, int(abs(cents) * tolerance_ratio))
+
+
+def pair_score(market_score, difference, tolerance):
+    """Combine market similarity and amount proximity into one score between 0.0 and 1.0."""
+    amount_score = max(0.0, 1.0 - difference / (tolerance + 1))
+    return round(MARKET_WEIGHT * market_score + (1 - MARKET_WEIGHT) * amount_score, 6)
+
+
+def candidate_pairs(dataframe_records, database_records, market_field="Market", amount_field="Amount",
+                    tolerance_cents=DEFAULT_TOLERANCE_CENTS, tolerance_ratio=DEFAULT_TOLERANCE_RATIO):
+    """
+    Score every (DataFrame record, database record) pair whose amounts are close.
+
+    Database amounts go into an AmountIndex and the windows of all DataFrame
+    amounts are looked up in one vectorized searchsorted, so only nearby
+    amounts are ever compared.
+
+    Returns:
+        list: (score, dataframe index, database index) tuples.
+    """
+    index = AmountIndex.from_records(database_records, "amount")
+    queries = [
+        (df_index, cents, amount_tolerance(cents, tolerance_cents, tolerance_ratio))
+        for df_index, cents in (
+            (df_index, parse_amount_cents(record.get(amount_field))) for df_index, record in enumerate(dataframe_records)
+        )
+        if cents is not None
+    ]
+    if not queries:
+        return []
+    starts, ends = index.bounds(
+        [cents - tolerance for _, cents, tolerance in queries],
+        [cents + tolerance for _, cents, tolerance in queries]
+    )
+
+    pairs = []
+    for (df_index, cents, tolerance), start, end in zip(queries, starts, ends):
+        market = dataframe_records[df_index].get(market_field)
+        for db_cents, db_index in zip(index.cents[start:end].tolist(), index.ids[start:end].tolist()):
+            market_score = market_similarity(market, database_records[db_index].get("market"))
+            pairs.append((pair_score(market_score, abs(cents - db_cents), tolerance), df_index, db_index))
+    return pairs
+
+
+def build_match(dataframe_record, database_record, score, market_field="Market", amount_field="Amount"):
+    """
+    The matches entry for a pair: the DataFrame record with the database market
+    and amount taking precedence, plus the database invoice number and id.
+    All values are strings, like the LLM matcher's output.
+    """
+    match = {key: "" if value is None else str(value) for key, value in dataframe_record.items()}
+    match[market_field] = str(database_record.get("market") or "")
+    match[amount_field] = str(database_record.get("amount") or "")
+    match["invoice_no"] = str(database_record.get("invoice_no") or "")
+    match["database_id"] = str(database_record.get("id") or "")
+    match["score"] = f"{score:.3f}"
+    return match
+
+
+def match_records(dataframe_records, database_records, market_field="Market", amount_field="Amount",
+                  tolerance_cents=DEFAULT_TOLERANCE_CENTS, tolerance_ratio=DEFAULT_TOLERANCE_RATIO,
+                  accept_score=ACCEPT_SCORE, margin=AMBIGUITY_MARGIN):
+    """
+    Match DataFrame records to database records without the LLM.
+
+    Candidate pairs are assigned one-to-one, highest score first (ties by
+    record order, so the result is deterministic). An assigned pair is
+    accepted when it scores at least accept_score and no other pair of
+    either of its records comes within margin of it.
+
+    Args:
+        dataframe_records (list): Dicts with market_field and amount_field, e.g.
+            df.to_dict(orient="records").
+        database_records (list): Invoice rows as dicts with market, amount,
+            invoice_no and id.
+        market_field, amount_field (str): Keys of the DataFrame records.
+        tolerance_cents, tolerance_ratio: Amount blocking window, see amount_tolerance.
+        accept_score (float): Minimum score of an accepted pair.
+        margin (float): Required lead over competing pairs.
+
+    Returns:
+        tuple: (matches, unmatched DataFrame records, unmatched database records).
+            matches has one entry per accepted pair, see build_match; the
+            unmatched records are the residue to escalate to the LLM.
+    """
+    pairs = sorted(
+        candidate_pairs(dataframe_records, database_records, market_field, amount_field,
+                        tolerance_cents, tolerance_ratio),
+        key=lambda pair: (-pair[0], pair[1], pair[2])
+    )
+
+    # Best competing score of each record, to judge how clear a win is
+    best_by_df = {}
+    best_by_db = {}
+    for score, df_index, db_index in pairs:
+        best_by_df.setdefault(df_index, []).append(score)
+        best_by_db.setdefault(db_index, []).append(score)
+
+    def runner_up(scores, score):
+        # Pairs are sorted by score, so the chosen pair is the first one with this score
+        others = list(scores)
+        others.remove(score)
+        return others[0] if others else None
+
+    assigned_df = set()
+    assigned_db = set()
+    accepted = []
+    for score, df_index, db_index in pairs:
+        if df_index in assigned_df or db_index in assigned_db:
+            continue
+        assigned_df.add(df_index)
+        assigned_db.add(db_index)
+        if score < accept_score:
+            continue
+        competitors = [
+            other for other in (runner_up(best_by_df[df_index], score), runner_up(best_by_db[db_index], score))
+            if other is not None
+        ]
+        if competitors and score - max(competitors) < margin:
+            continue
+        accepted.append((df_index, db_index, score))
+
+    accepted.sort()
+    matched_df = {df_index for df_index, _, _ in accepted}
+    matched_db = {db_index for _, db_index, _ in accepted}
+    matches = [
+        build_match(dataframe_records[df_index], database_records[db_index], score, market_field, amount_field)
+        for df_index, db_index, score in accepted
+    ]
+    unmatched_dataframe = [record for index, record in enumerate(dataframe_records) if index not in matched_df]
+    unmatched_database = [record for index, record in enumerate(database_records) if index not in matched_db]
+    return matches, unmatched_dataframe, unmatched_database
+
+
+def plan_chunks(dataframe_records, database_records, market_field="Market", amount_field="Amount",
+                chunk_size=DEFAULT_CHUNK_SIZE, tolerance_cents=DEFAULT_TOLERANCE_CENTS,
+                tolerance_ratio=LLM_TOLERANCE_RATIO):
+    """
+    Partition records into LLM-sized chunks of records that can match each other.
+
+    DataFrame records are grouped by canonical market and ordered by amount;
+    groups are packed into chunks of at most chunk_size records (a larger
+    group is split). Each chunk gets the database records of its markets and
+    those within the amount window of one of its records. A database record
+    can be in several chunks; merge_chunk_matches resolves double claims.
+
+    Returns:
+        list: (dataframe indices, database indices) per chunk.
+    """
+    db_by_market = {}
+    for db_index, record in enumerate(database_records):
+        db_by_market.setdefault(market_key(canonical_market(record.get("market"))), []).append(db_index)
+    index = AmountIndex.from_records(database_records, "amount")
+
+    groups = {}
+    for df_index, record in enumerate(dataframe_records):
+        cents = parse_amount_cents(record.get(amount_field))
+        key = market_key(canonical_market(record.get(market_field)))
+        groups.setdefault(key, []).append((cents if cents is not None else 0, df_index))
+
+    chunks = []
+    current = []
+    for key in sorted(groups):
+        members = [df_index for _, df_index in sorted(groups[key])]
+        for start in range(0, len(members), chunk_size):
+            piece = members[start:start + chunk_size]
+            if len(current) + len(piece) > chunk_size:
+                chunks.append(current)
+                current = []
+            current.extend(piece)
+    if current:
+        chunks.append(current)
+
+    planned = []
+    for df_indices in chunks:
+        db_indices = set()
+        for df_index in df_indices:
+            record = dataframe_records[df_index]
+            db_indices.update(db_by_market.get(market_key(canonical_market(record.get(market_field))), []))
+            cents = parse_amount_cents(record.get(amount_field))
+            if cents is not None:
+                db_indices.update(index.within(cents, amount_tolerance(cents, tolerance_cents, tolerance_ratio)).tolist())
+        planned.append((df_indices, sorted(db_indices)))
+    return planned
+
+
+def match_key(match, amount_field="Amount"):
+    """(description, amount in cents, job number) of an LLM match, to recognise the same line twice."""
+    description = match.get("Description") or match.get("description") or ""
+    amount = match.get(amount_field) if match.get(amount_field) is not None else match.get("amount")
+    job_number = match.get("job_number") or match.get("Job Number") or ""
+    return (" ".join(str(description).lower().split()), parse_amount_cents(amount), str(job_number).strip().upper())
+
+
+def merge_chunk_matches(chunk_matches, dataframe_records, database_records, market_field="Market",
+                        amount_field="Amount", tolerance_cents=DEFAULT_TOLERANCE_CENTS,
+                        tolerance_ratio=LLM_TOLERANCE_RATIO):
+    """
+    Merge the matches of all chunks into one one-to-one assignment.
+
+    Each match is traced to its DataFrame record (RECORD_ID_FIELD) and its
+    database record (invoice_no). When several matches claim the same
+    DataFrame or database record, the pair with the best local pair_score
+    wins, ties going to the earlier DataFrame record. Matches that cannot be
+    traced are kept as returned, once per (description, amount, job number).
+
+    Args:
+        chunk_matches (list): One list of LLM matches per chunk.
+
+    Returns:
+        tuple: (matches, indices of the DataFrame records left unmatched).
+    """
+    db_by_invoice_no = {str(record.get("invoice_no")): record for record in database_records}
+
+    claims = []
+    untraced = []
+    for matches in chunk_matches:
+        for match in matches:
+            try:
+                df_index = int(match.get(RECORD_ID_FIELD))
+            except (TypeError, ValueError):
+                df_index = None
+            invoice_no = str(match.get("invoice_no") or "")
+            if df_index is None or not 0 <= df_index < len(dataframe_records) or invoice_no not in db_by_invoice_no:
+                untraced.append(match)
+                continue
+
+            record = dataframe_records[df_index]
+            db_record = db_by_invoice_no[invoice_no]
+            cents = parse_amount_cents(record.get(amount_field)) or 0
+            db_cents = parse_amount_cents(db_record.get("amount")) or 0
+            score = pair_score(
+                market_similarity(record.get(market_field), db_record.get("market")),
+                abs(cents - db_cents),
+                amount_tolerance(cents, tolerance_cents, tolerance_ratio)
+            )
+            claims.append((score, df_index, invoice_no, match))
+
+    matched_df = set()
+    claimed = set()
+    merged = []
+    for score, df_index, invoice_no, match in sorted(claims, key=lambda claim: (-claim[0], claim[1], claim[2])):
+        if df_index in matched_df or invoice_no in claimed:
+            logging.info(f"Dropping conflicting match of record {df_index} to invoice {invoice_no} (score {score:.3f})")
+            continue
+        matched_df.add(df_index)
+        claimed.add(invoice_no)
+        merged.append((df_index, {key: value for key, value in match.items() if key != RECORD_ID_FIELD}))
+
+    matches = [match for _, match in sorted(merged, key=lambda item: item[0])]
+    seen = {match_key(match, amount_field) for match in matches}
+    for match in untraced:
+        try:
+            df_index = int(match.get(RECORD_ID_FIELD))
+        except (TypeError, ValueError):
+            df_index = None
+        if df_index in matched_df:
+            continue
+        # Without a record id, the same line returned by two chunks is only recognisable by its content
+        content = match_key(match, amount_field)
+        if content in seen and any(content):
+            logging.info(f"Dropping duplicate untraced match {content}")
+            continue
+        seen.add(content)
+        if df_index is not None:
+            matched_df.add(df_index)
+        matches.append({key: value for key, value in match.items() if key != RECORD_ID_FIELD})
+    unmatched = [df_index for df_index in range(len(dataframe_records)) if df_index not in matched_df]
+    return matches, unmatched
+
+
+def reconcile_with_llm(dataframe_records, database_records, match_chunk, market_field="Market",
+                       amount_field="Amount", chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_LLM_WORKERS):
+    """
+    Run the LLM matcher over chunks of the records concurrently and merge the results.
+
+    Latency follows the chunk size rather than the batch size, and no prompt
+    grows past chunk_size DataFrame records. A chunk whose call fails is
+    logged and its records are left unmatched.
+
+    Args:
+        dataframe_records, database_records (list): Records to match, usually
+            the residue of match_records.
+        match_chunk (callable): match_chunk(dataframe_records, database_records)
+            returns the LLM's list of match dicts. The DataFrame records it
+            receives carry RECORD_ID_FIELD, which the matches should keep.
+        chunk_size (int): Maximum DataFrame records per call.
+        max_workers (int): Maximum calls in flight at once.
+
+    Returns:
+        tuple: (matches, unmatched DataFrame records).
+    """
+    if not dataframe_records or not database_records:
+        return [], list(dataframe_records)
+
+    chunks = plan_chunks(dataframe_records, database_records, market_field, amount_field, chunk_size)
+
+    def run(chunk):
+        df_indices, db_indices = chunk
+        chunk_records = [
+            {**dataframe_records[df_index], RECORD_ID_FIELD: str(df_index)} for df_index in df_indices
+        ]
+        try:
+            return match_chunk(chunk_records, [database_records[db_index] for db_index in db_indices]) or []
+        except Exception as e:
+            logging.error(f"LLM matching failed for a chunk of {len(df_indices)} record(s): {e}")
+            return []
+
+    logging.info(f"Matching {len(dataframe_records)} record(s) with the LLM in {len(chunks)} chunk(s)")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        chunk_matches = list(executor.map(run, chunks))
+
+    matches, unmatched = merge_chunk_matches(chunk_matches, dataframe_records, database_records,
+                                             market_field, amount_field)
+    return matches, [dataframe_records[df_index] for df_index in unmatched]
@@ -0,0 +1,179 @@
+"""
+Section cache for incremental regeneration of the final invoice document.
+
+Each invoice section (its template page plus the backup images placed after
+it) is fingerprinted from its database row and the content hashes of its
+images. The fingerprints live in a JSON manifest next to the output document
+and the section's body XML is kept as a fragment file. On the next run,
+sections whose fingerprint is unchanged are spliced back in from the fragment
+instead of being rebuilt.
+"""
+import hashlib
+import json
+import logging
+import os
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from utils.file_hash import file_digest
+
+MANIFEST_VERSION = 1
+
+
+def fingerprint_section(payload, image_paths):
+    """
+    Fingerprint one document section.
+
+    Args:
+        payload (iterable): Values that determine the section's text, e.g. the
+            invoice row from the database.
+        image_paths (list): Images embedded in the section, in order.
+
+    Returns:
+        str: SHA-256 hex digest over the payload and each image's path and content hash.
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps(list(payload), default=str).encode("utf-8"))
+    for path in image_paths:
+        sha.update(path.encode("utf-8"))
+        sha.update(file_digest(path).encode("ascii"))
+    return sha.hexdigest()
+
+
+def content_children(doc):
+    """Body elements of a python-docx document, excluding the trailing sectPr."""
+    return [child for child in doc.element.body.iterchildren() if child.tag != qn("w:sectPr")]
+
+
+def append_fragment(doc, fragment):
+    """
+    Append a cached section to doc.
+
+    Image relationships are per package, so each picture's r:embed is
+    re-pointed at an image part of the new document (python-docx shares one
+    part per identical image), and drawing ids are renumbered to stay unique.
+    All elements are prepared before the first one is inserted, so a fragment
+    that fails partway leaves doc unchanged for the rebuild.
+    """
+    body = doc.element.body
+    images = iter(fragment["images"])
+    elements = []
+    for xml in fragment["elements"]:
+        element = parse_xml(xml)
+        for blip in element.iter(qn("a:blip")):
+            r_id, _ = doc.part.get_or_add_image(next(images))
+            blip.set(qn("r:embed"), r_id)
+        elements.append(element)
+
+    # Ids are handed out at insertion, as next_id only sees elements already in the document
+    for element in elements:
+        for doc_pr in element.iter(qn("wp:docPr")):
+            doc_pr.set("id", str(doc.part.next_id))
+        body.insert_element_before(element, "w:sectPr")
+
+
+class SectionCache:
+    """
+    Manifest of section fingerprints plus the cached XML fragment of each section.
+
+    Args:
+        manifest_path (str): Sidecar JSON manifest, stored next to the output document.
+        fragment_dir (str): Directory holding one fragment file per section.
+        template (iterable): Values shared by every page (header lines, invoice
+            template). A change invalidates the whole cache.
+    """
+
+    def __init__(self, manifest_path, fragment_dir, template):
+        self.manifest_path = manifest_path
+        self.fragment_dir = fragment_dir
+        self.template_key = fingerprint_section(template, [])
+        self.previous = self._load_manifest()
+        self.sections = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable section manifest {self.manifest_path}: {e}")
+            return {}
+
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("template") != self.template_key:
+            logging.info("Invoice template or manifest version changed, rebuilding all sections")
+            return {}
+        return manifest.get("sections", {})
+
+    def _fragment_filename(self, key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+
+    def append_cached(self, doc, key, fingerprint):
+        """
+        Append the cached section for key if its fingerprint is unchanged.
+
+        Returns:
+            bool: True if the section was reused, False if it must be rebuilt.
+        """
+        entry = self.previous.get(key)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            self.misses += 1
+            return False
+
+        fragment_path = os.path.join(self.fragment_dir, entry["fragment"])
+        try:
+            with open(fragment_path, "r", encoding="utf-8") as f:
+                fragment = json.load(f)
+            append_fragment(doc, fragment)
+        except (OSError, ValueError, StopIteration, etree.XMLSyntaxError) as e:
+            logging.warning(f"Cached section {key} is unusable, rebuilding: {e}")
+            self.misses += 1
+            return False
+
+        self.sections[key] = entry
+        self.hits += 1
+        return True
+
+    def start_section(self, doc):
+        """Mark where a section being rebuilt starts in doc."""
+        return len(content_children(doc))
+
+    def store(self, doc, key, fingerprint, start, images):
+        """
+        Cache the body elements added to doc since start as the fragment for key.
+
+        Args:
+            images (list): Paths of the pictures in the section, in document order.
+        """
+        elements = content_children(doc)[start:]
+        fragment = {
+            "elements": [etree.tostring(element, encoding="unicode") for element in elements],
+            "images": list(images),
+        }
+        os.makedirs(self.fragment_dir, exist_ok=True)
+        filename = self._fragment_filename(key)
+        with open(os.path.join(self.fragment_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(fragment, f)
+        self.sections[key] = {"fingerprint": fingerprint, "fragment": filename}
+
+    def save(self):
+        """Write the manifest for this run and delete fragments no longer referenced."""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "template": self.template_key,
+            "sections": self.sections,
+        }
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        referenced = {entry["fragment"] for entry in self.sections.values()}
+        if os.path.isdir(self.fragment_dir):
+            for filename in os.listdir(self.fragment_dir):
+                if filename.endswith(".json") and filename not in referenced:
+                    os.remove(os.path.join(self.fragment_dir, filename))
+
+        logging.info(f"Section cache: {self.hits} sections reused, {self.misses} rebuilt")